@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+SecurityWatch Pro - Brute Force Detection Benchmark
+Compares the per-IP dictionary tally against the sliding-window batch and streaming engines
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+# Add the securitywatch package to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from securitywatch.core.bruteforce import BRUTE_FORCE_EVENT_TYPES, BruteForceDetector, StreamingBruteForceDetector
+from securitywatch.models.batch import EventBatch
+
+
+def make_rows(count: int, days: int, seed: int = 7):
+    """Failed logins spread over the window, with repeated short bursts from a few IPs"""
+    rng = np.random.default_rng(seed)
+    start = datetime.now() - timedelta(days=days)
+    offsets = np.sort(rng.integers(0, days * 86400, count))
+    ips = rng.integers(0, 20000, count)
+    burst_every = 5000
+    rows = []
+    for i, (offset, ip) in enumerate(zip(offsets.tolist(), ips.tolist())):
+        if i % burst_every < 30:
+            ip = 100000 + (i // burst_every) % 100  # 30 attempts from one of 100 campaign IPs
+        rows.append((start + timedelta(seconds=offset), "ssh_failed_login", f"10.{ip >> 16}.{(ip >> 8) & 255}.{ip & 255}",
+                     f"user{i % 300}", "bastion", "Failed password", "medium", "/var/log/auth.log"))
+    return rows
+
+
+def dictionary_tally(events):
+    """The previous detection: first-to-last span of all attempts per IP"""
+    tally = {}
+    for event in events:
+        if not event.source_ip or event.event_type not in BRUTE_FORCE_EVENT_TYPES:
+            continue
+        entry = tally.setdefault(event.source_ip, {'count': 0, 'first': event.timestamp,
+                                                   'last': event.timestamp, 'usernames': set()})
+        entry['count'] += 1
+        entry['first'] = min(entry['first'], event.timestamp)
+        entry['last'] = max(entry['last'], event.timestamp)
+        if event.username:
+            entry['usernames'].add(event.username)
+    return [ip for ip, entry in tally.items()
+            if entry['count'] >= 5 and (entry['last'] - entry['first']).total_seconds() <= 600]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark brute force detection")
+    parser.add_argument('--events', type=int, default=2_000_000, help='Failed logins (default: 2000000)')
+    parser.add_argument('--days', type=int, default=30, help='Window length in days (default: 30)')
+    args = parser.parse_args()
+
+    print("📊 SecurityWatch Pro - Brute Force Detection Benchmark")
+    print(f"{args.events:,} failed logins over {args.days} days")
+    print("=" * 60)
+
+    batch = EventBatch.from_rows(make_rows(args.events, args.days))
+    events = batch.to_events()
+
+    start = time.perf_counter()
+    old = dictionary_tally(events)
+    old_time = time.perf_counter() - start
+    print(f"{'dictionary tally':<24} {old_time:8.2f}s  {len(old):>6} attackers")
+
+    start = time.perf_counter()
+    new = BruteForceDetector().detect(batch)
+    new_time = time.perf_counter() - start
+    print(f"{'sliding window (batch)':<24} {new_time:8.2f}s  {len(new):>6} attackers")
+
+    detector = StreamingBruteForceDetector()
+    start = time.perf_counter()
+    findings = detector.observe_events(events)
+    stream_time = time.perf_counter() - start
+    print(f"{'streaming (per event)':<24} {stream_time:8.2f}s  {len({a['source_ip'] for a, _ in findings}):>6} attackers"
+          f"  {stream_time / len(events) * 1e6:.2f} us/event, {len(detector):,} IPs tracked")
+
+    print("=" * 60)
+    print(f"🚀 {old_time / new_time:.1f}x faster, {len(new) - len(old)} more attackers found")
+
+
+if __name__ == "__main__":
+    main()
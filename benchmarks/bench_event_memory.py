@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+SecurityWatch Pro - Event Memory Benchmark
+Measures bytes per event held in memory for a large analysis window
+"""
+
+import argparse
+import gc
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the securitywatch package to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from securitywatch.models.batch import EventBatch
+from securitywatch.models.events import SecurityEvent
+
+
+@dataclass
+class DictSecurityEvent:
+    """The previous SecurityEvent layout: a plain dataclass with a __dict__"""
+    timestamp: datetime
+    event_type: str
+    source_ip: str
+    username: str
+    hostname: str
+    details: str
+    severity: str
+    log_source: str
+
+
+def fresh(value: str) -> str:
+    """Copy a string the way sqlite3 and log parsing hand out a new object per row"""
+    return value.encode().decode()
+
+
+def make_rows(count: int):
+    """Rows shaped like security_events with realistic cardinalities"""
+    base_time = datetime.now() - timedelta(days=30)
+    severities = ('low', 'medium', 'high', 'critical')
+    for i in range(count):
+        yield (
+            base_time + timedelta(seconds=i * 2),
+            fresh("ssh_failed_login" if i % 4 else "sql_injection_attempt"),
+            fresh(f"203.0.{(i // 256) % 64}.{i % 256}"),
+            fresh(f"user{i % 500}"),
+            fresh(f"web-{i % 8:02d}"),
+            fresh(f"Failed password for user{i % 500} from 203.0.{(i // 256) % 64}.{i % 256} port 22 ssh2"),
+            fresh(severities[i % 4]),
+            fresh("/var/log/auth.log")
+        )
+
+
+def measure(label: str, count: int, build):
+    """Report the traced memory retained by one in-memory representation"""
+    gc.collect()
+    tracemalloc.start()
+    window = build(make_rows(count))
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{label:<28} {retained / 2**20:10.1f} MiB  {retained / count:8.1f} bytes/event")
+    del window
+    return retained / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark in-memory event footprint")
+    parser.add_argument('--events', type=int, default=1_000_000, help='Events in the window (default: 1000000)')
+    args = parser.parse_args()
+
+    print("📊 SecurityWatch Pro - Event Memory Benchmark")
+    print(f"Window: {args.events:,} events")
+    print("=" * 68)
+
+    before = measure("dataclass with __dict__", args.events,
+                     lambda rows: [DictSecurityEvent(*row) for row in rows])
+    after = measure("SecurityEvent (slots)", args.events,
+                    lambda rows: [SecurityEvent(*row) for row in rows])
+    columnar = measure("EventBatch (columnar)", args.events,
+                       lambda rows: EventBatch.from_rows(list(rows)))
+
+    print("=" * 68)
+    print(f"🚀 SecurityEvent saves {before - after:.0f} bytes/event ({before / after:.2f}x smaller)")
+    print(f"🚀 EventBatch saves {before - columnar:.0f} bytes/event ({before / columnar:.2f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+SecurityWatch Pro - Event Ingestion Benchmark
+Compares per-event inserts against batched inserts into SecurityDatabase
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the securitywatch package to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from securitywatch.core.database import SecurityDatabase
+from securitywatch.models.events import SecurityEvent
+
+
+def make_events(count: int):
+    """Build a brute-force storm worth of events"""
+    base_time = datetime.now() - timedelta(minutes=5)
+    return [
+        SecurityEvent(
+            timestamp=base_time + timedelta(milliseconds=i),
+            event_type="ssh_failed_login",
+            source_ip=f"203.0.113.{i % 50}",
+            username=f"user{i % 200}",
+            hostname="bastion-01",
+            details=f"Failed password for user{i % 200} from 203.0.113.{i % 50} port 22 ssh2",
+            severity="medium",
+            log_source="/var/log/auth.log"
+        )
+        for i in range(count)
+    ]
+
+
+def run(label: str, count: int, ingest):
+    """Time one ingestion strategy against a fresh database"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        database = SecurityDatabase(str(Path(temp_dir) / "bench.db"))
+        events = make_events(count)
+
+        start = time.perf_counter()
+        ingest(database, events)
+        elapsed = time.perf_counter() - start
+        database.close()
+
+    print(f"{label:<12} {count:>8} events  {elapsed:8.3f}s  {count / elapsed:>12,.0f} events/sec")
+    return count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SecurityDatabase ingestion")
+    parser.add_argument('--events', type=int, default=2000, help='Events per run (default: 2000)')
+    args = parser.parse_args()
+
+    print("📊 SecurityWatch Pro - Ingestion Benchmark")
+    print("=" * 60)
+
+    def per_event(database, events):
+        for event in events:
+            database.add_event(event)
+
+    def batched(database, events):
+        database.add_events(events)
+
+    before = run("add_event", args.events, per_event)
+    after = run("add_events", args.events, batched)
+
+    print("=" * 60)
+    print(f"🚀 Speedup: {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
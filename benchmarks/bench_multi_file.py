@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+SecurityWatch Pro - Multi-File Monitoring Benchmark
+Compares one monitoring cycle over several busy logs read sequentially,
+by the reader thread pool, and with matching offloaded to processes
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from itertools import islice
+from pathlib import Path
+
+# Add the securitywatch package to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from securitywatch.core.checkpoints import LogTracker
+from securitywatch.core.patterns import LogPatternMatcher
+from securitywatch.core.workers import LogWorkerPool, MATCH_BATCH_SIZE
+
+
+def write_logs(directory: Path, files: int, lines: int):
+    """One busy access log per file, with an attack every 500 lines"""
+    paths = []
+    for n in range(files):
+        path = directory / f"access-{n}.log"
+        with open(path, 'w') as f:
+            for i in range(lines):
+                if i % 500 == 0:
+                    f.write(f"203.0.113.{i % 250} GET /item?id=1 UNION SELECT password FROM users--\n")
+                else:
+                    f.write(f"198.51.100.{i % 250} - - [01/Jan/2026:00:00:00 +0000] "
+                            f"\"GET /static/app.{i}.js HTTP/1.1\" 200 5123 \"-\" \"Mozilla/5.0\"\n")
+        paths.append(str(path))
+    return paths
+
+
+def check_file(pool: LogWorkerPool, matcher: LogPatternMatcher, path: str):
+    """Read and match one file the way SecurityWatchMonitor.monitor_log_file does"""
+    lines = (line.strip() for line in LogTracker(path).iter_lines())
+    lines = (line for line in lines if line)
+    batches = iter(lambda: list(islice(lines, MATCH_BATCH_SIZE)), [])
+    return pool.match_batches(matcher, batches, path)
+
+
+def run(label: str, paths, threads: int, processes: int, sequential: bool = False):
+    """Time one full cycle over every path"""
+    pool = LogWorkerPool(threads, processes)
+    matcher = LogPatternMatcher()
+    if processes:
+        # Start the match processes outside the timed region
+        pool.match_batches(matcher, [[b"warm up"]] * processes, "warm-up")
+
+    start = time.perf_counter()
+    if sequential:
+        results = [check_file(pool, matcher, path) for path in paths]
+    else:
+        results = pool.map(lambda path: check_file(pool, matcher, path), paths)
+    elapsed = time.perf_counter() - start
+    pool.close()
+
+    events = sum(len(events) for events in results)
+    print(f"{label:<32} {elapsed:8.2f}s  {events:>7} events")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel multi-file monitoring")
+    parser.add_argument('--files', type=int, default=4, help='Log files (default: 4)')
+    parser.add_argument('--lines', type=int, default=250_000, help='Lines per file (default: 250000)')
+    parser.add_argument('--processes', type=int, default=4, help='Match processes (default: 4)')
+    args = parser.parse_args()
+
+    print("📊 SecurityWatch Pro - Multi-File Monitoring Benchmark")
+    print(f"{args.files} files x {args.lines:,} lines")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        paths = write_logs(Path(temp_dir), args.files, args.lines)
+        sequential = run("sequential", paths, 1, 0, sequential=True)
+        threaded = run(f"{args.files} reader threads", paths, args.files, 0)
+        processes = run(f"threads + {args.processes} match processes", paths, args.files, args.processes)
+
+    print("=" * 60)
+    print(f"🚀 Threads: {sequential / threaded:.2f}x   Processes: {sequential / processes:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+SecurityWatch Pro - Sharded Scan Benchmark
+Measures whole-file scan throughput as the number of match processes grows
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the securitywatch package to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from securitywatch.core.patterns import LogPatternMatcher
+from securitywatch.core.workers import LogWorkerPool
+
+
+def write_log(path: Path, lines: int):
+    """A historical auth/access log with an attack every 1000 lines"""
+    with open(path, 'w') as f:
+        for i in range(lines):
+            if i % 1000 == 0:
+                f.write(f"Jan  1 00:00:00 web sshd[{i}]: Failed password for root from 203.0.113.{i % 250} port 22 ssh2\n")
+            else:
+                f.write(f"198.51.100.{i % 250} - - [01/Jan/2026:00:00:00 +0000] "
+                        f"\"GET /static/app.{i}.js HTTP/1.1\" 200 5123 \"-\" \"Mozilla/5.0\"\n")
+
+
+def run(label: str, path: str, processes: int):
+    """Time one full scan of the file"""
+    pool = LogWorkerPool(1, processes)
+    matcher = LogPatternMatcher()
+    if processes:
+        # Start the match processes outside the timed region
+        pool.match_batches(matcher, [[b"warm up"]] * processes, "warm-up")
+
+    start = time.perf_counter()
+    [events] = pool.scan_files(matcher, [path])
+    elapsed = time.perf_counter() - start
+    pool.close()
+
+    megabytes = os.path.getsize(path) / 2**20
+    print(f"{label:<24} {elapsed:8.2f}s  {megabytes / elapsed:8.1f} MB/s  {len(events):>7} events")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sharded whole-file scanning")
+    parser.add_argument('--lines', type=int, default=1_000_000, help='Lines in the log (default: 1000000)')
+    parser.add_argument('--processes', default="1,2,4,8",
+                        help='Comma-separated match process counts (default: 1,2,4,8)')
+    args = parser.parse_args()
+
+    print("📊 SecurityWatch Pro - Sharded Scan Benchmark")
+    print(f"{args.lines:,} lines, {os.cpu_count()} CPUs")
+    print("=" * 64)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "history.log"
+        write_log(path, args.lines)
+
+        baseline = run("in-process", str(path), 0)
+        for count in (int(n) for n in args.processes.split(',')):
+            elapsed = run(f"{count} match processes", str(path), count)
+            print(f"{'':<24} {baseline / elapsed:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+SecurityWatch Pro - Timeline Analysis Benchmark
+Compares per-event hour and strftime tallies with the np.bincount timeline
+"""
+
+import argparse
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+# Add the securitywatch package to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from securitywatch.core.timeline import Timeline, timeline_summary
+
+
+def make_timestamps(count: int, days: int, seed: int = 3) -> np.ndarray:
+    """Event times spread over the last days, as datetime64[us]"""
+    rng = np.random.default_rng(seed)
+    end = np.datetime64('2025-06-01T00:00:00', 'us')
+    return np.sort(end - rng.integers(0, days * 86400 * 10**6, count).astype('timedelta64[us]'))
+
+
+def per_event_timeline(timestamps):
+    """The previous timeline: timestamp.hour and strftime per event into dicts"""
+    hourly_events = defaultdict(int)
+    daily_events = defaultdict(int)
+    for timestamp in timestamps:
+        hourly_events[timestamp.hour] += 1
+        daily_events[timestamp.strftime('%Y-%m-%d')] += 1
+    return timeline_summary(hourly_events, daily_events)
+
+
+def per_event_baseline(timestamps):
+    """The previous system baseline inputs: hour and weekday lists and a per-date tally"""
+    hours = [timestamp.hour for timestamp in timestamps]
+    days = [timestamp.weekday() for timestamp in timestamps]
+    daily_counts = defaultdict(int)
+    for timestamp in timestamps:
+        daily_counts[timestamp.date()] += 1
+    return np.histogram(hours, bins=24)[0], np.histogram(days, bins=7)[0], daily_counts
+
+
+def timed(label: str, function, count: int):
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:8.2f}s  {elapsed / count * 1e9:8.1f} ns/event")
+    return elapsed, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark timeline histograms")
+    parser.add_argument('--events', type=int, default=5_000_000, help='Events (default: 5000000)')
+    parser.add_argument('--days', type=int, default=30, help='Days covered (default: 30)')
+    args = parser.parse_args()
+
+    print("📊 SecurityWatch Pro - Timeline Analysis Benchmark")
+    print(f"{args.events:,} events over {args.days} days")
+    print("=" * 60)
+
+    times = make_timestamps(args.events, args.days)
+    timestamps = times.tolist()
+    seconds = times.astype('datetime64[s]').astype(np.int64)
+
+    old_time, old = timed("per-event hour/strftime", lambda: per_event_timeline(timestamps), args.events)
+    baseline_time, _ = timed("per-event baseline tallies", lambda: per_event_baseline(timestamps), args.events)
+    datetime_time, from_datetimes = timed("timeline from datetimes", lambda: Timeline.from_timestamps(timestamps).summary(),
+                                          args.events)
+    array_time, from_array = timed("timeline from epoch seconds", lambda: Timeline.from_seconds(seconds).summary(),
+                                   args.events)
+
+    assert from_datetimes == old and from_array == old
+
+    print("=" * 60)
+    print(f"🚀 {old_time / datetime_time:.1f}x faster from SecurityEvent datetimes "
+          f"({baseline_time / datetime_time:.1f}x for baselines), {old_time / array_time:.0f}x from epoch seconds")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ Advanced behavioral analysis and anomaly detection using machine learning
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Union
 from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler
 from sklearn.cluster import DBSCAN
@@ -15,6 +15,7 @@ import logging
 from pathlib import Path
 
 from ..models.events import SecurityEvent
+from ..models.batch import EventBatch
 from ..core.database import SecurityDatabase
 
 
@@ -39,21 +40,15 @@ class AnomalyDetector:
         # Load existing models if available
         self._load_models()
     
-    def extract_features(self, events: List[SecurityEvent]) -> pd.DataFrame:
+    def extract_features(self, events: Union[EventBatch, List[SecurityEvent]]) -> pd.DataFrame:
         """Extract features from security events for ML analysis"""
-        if not events:
+        if not len(events):
             return pd.DataFrame()
         
         features = []
         
         # Group events by time windows and IPs
-        df = pd.DataFrame([{
-            'timestamp': event.timestamp,
-            'source_ip': event.source_ip,
-            'event_type': event.event_type,
-            'severity': event.severity,
-            'username': event.username
-        } for event in events])
+        df = EventBatch.of(events).to_frame(['timestamp', 'source_ip', 'event_type', 'severity', 'username'])
         
         # Convert timestamp to datetime if needed
         df['timestamp'] = pd.to_datetime(df['timestamp'])
@@ -120,7 +115,7 @@ class AnomalyDetector:
         
         # Get training data
         cutoff_date = datetime.now() - timedelta(days=training_days)
-        events = self.database.get_recent_events(training_days * 24)
+        events = self.database.get_event_batch(hours=training_days * 24)
         
         if len(events) < 100:
             self.logger.warning("Insufficient training data. Need at least 100 events.")
@@ -169,7 +164,7 @@ class AnomalyDetector:
         self.logger.info("Anomaly detection models trained successfully")
         return True
     
-    def detect_anomalies(self, events: List[SecurityEvent]) -> List[Dict]:
+    def detect_anomalies(self, events: Union[EventBatch, List[SecurityEvent]]) -> List[Dict]:
         """Detect anomalies in security events"""
         if not self.is_trained:
             self.logger.warning("Models not trained. Training on available data...")
@@ -12,6 +12,7 @@ import logging
 
 from ..models.events import SecurityEvent
 from ..core.database import SecurityDatabase
+from ..core.timeline import Timeline
 
 
 class BehavioralAnalyzer:
@@ -79,25 +80,21 @@ class BehavioralAnalyzer:
     def _calculate_user_baseline(self, events: List[SecurityEvent]) -> Dict:
         """Calculate behavioral baseline for a specific user"""
         # Time patterns
-        hours = [event.timestamp.hour for event in events]
-        days = [event.timestamp.weekday() for event in events]
+        timeline = Timeline.from_timestamps([event.timestamp for event in events])
         
         # Access patterns
         event_types = [event.event_type for event in events]
         source_ips = [event.source_ip for event in events if event.source_ip]
         
         # Frequency patterns
-        daily_counts = defaultdict(int)
-        for event in events:
-            day_key = event.timestamp.date()
-            daily_counts[day_key] += 1
+        daily_counts = timeline.active_days()
         
         return {
             'time_patterns': {
-                'typical_hours': self._get_typical_hours(hours),
-                'typical_days': self._get_typical_days(days),
-                'hour_distribution': np.histogram(hours, bins=24)[0].tolist(),
-                'day_distribution': np.histogram(days, bins=7)[0].tolist()
+                'typical_hours': self._get_typical_hours(timeline.hourly),
+                'typical_days': self._get_typical_days(timeline.weekdays),
+                'hour_distribution': timeline.hourly.tolist(),
+                'day_distribution': timeline.weekdays.tolist()
             },
             'access_patterns': {
                 'common_event_types': self._get_common_items(event_types, top_n=5),
@@ -106,9 +103,9 @@ class BehavioralAnalyzer:
                 'ip_diversity': len(set(source_ips))
             },
             'frequency_patterns': {
-                'avg_daily_events': np.mean(list(daily_counts.values())),
-                'std_daily_events': np.std(list(daily_counts.values())),
-                'max_daily_events': max(daily_counts.values()) if daily_counts else 0,
+                'avg_daily_events': np.mean(daily_counts),
+                'std_daily_events': np.std(daily_counts),
+                'max_daily_events': int(daily_counts.max()) if len(daily_counts) else 0,
                 'total_events': len(events)
             },
             'baseline_period': {
@@ -134,7 +131,7 @@ class BehavioralAnalyzer:
     def _calculate_ip_baseline(self, events: List[SecurityEvent]) -> Dict:
         """Calculate behavioral baseline for a specific IP"""
         # Time patterns
-        hours = [event.timestamp.hour for event in events]
+        hour_counts = Timeline.from_timestamps([event.timestamp for event in events]).hourly
         
         # User patterns
         usernames = [event.username for event in events if event.username]
@@ -152,8 +149,8 @@ class BehavioralAnalyzer:
         
         return {
             'time_patterns': {
-                'typical_hours': self._get_typical_hours(hours),
-                'hour_distribution': np.histogram(hours, bins=24)[0].tolist()
+                'typical_hours': self._get_typical_hours(hour_counts),
+                'hour_distribution': hour_counts.tolist()
             },
             'user_patterns': {
                 'unique_users': len(set(usernames)),
@@ -181,23 +178,19 @@ class BehavioralAnalyzer:
     def _build_system_baseline(self, events: List[SecurityEvent]):
         """Build system-wide behavioral baseline"""
         # Overall system patterns
-        hours = [event.timestamp.hour for event in events]
-        days = [event.timestamp.weekday() for event in events]
+        timeline = Timeline.from_timestamps([event.timestamp for event in events])
         event_types = [event.event_type for event in events]
         severities = [event.severity for event in events]
         
         # Daily event counts
-        daily_counts = defaultdict(int)
-        for event in events:
-            day_key = event.timestamp.date()
-            daily_counts[day_key] += 1
+        daily_counts = timeline.active_days()
         
         self.system_baseline = {
             'time_patterns': {
-                'peak_hours': self._get_peak_hours(hours),
-                'quiet_hours': self._get_quiet_hours(hours),
-                'business_hours_ratio': self._calculate_business_hours_ratio(hours),
-                'weekend_ratio': self._calculate_weekend_ratio(days)
+                'peak_hours': self._get_peak_hours(timeline.hourly),
+                'quiet_hours': self._get_quiet_hours(timeline.hourly),
+                'business_hours_ratio': self._calculate_business_hours_ratio(timeline.hourly),
+                'weekend_ratio': self._calculate_weekend_ratio(timeline.weekdays)
             },
             'event_patterns': {
                 'common_event_types': self._get_common_items(event_types, top_n=10),
@@ -205,9 +198,9 @@ class BehavioralAnalyzer:
                 'total_event_types': len(set(event_types))
             },
             'volume_patterns': {
-                'avg_daily_events': np.mean(list(daily_counts.values())),
-                'std_daily_events': np.std(list(daily_counts.values())),
-                'peak_daily_events': max(daily_counts.values()) if daily_counts else 0,
+                'avg_daily_events': np.mean(daily_counts),
+                'std_daily_events': np.std(daily_counts),
+                'peak_daily_events': int(daily_counts.max()) if len(daily_counts) else 0,
                 'baseline_period_days': len(daily_counts)
             }
         }
@@ -255,11 +248,12 @@ class BehavioralAnalyzer:
         baseline = self.user_baselines[username]
         
         # Time-based anomalies
-        current_hours = [event.timestamp.hour for event in events]
-        typical_hours = set(baseline['time_patterns']['typical_hours'])
+        hour_counts = Timeline.from_timestamps([event.timestamp for event in events]).hourly
+        unusual = np.ones(24, dtype=bool)
+        unusual[baseline['time_patterns']['typical_hours']] = False
         
-        unusual_hours = [h for h in current_hours if h not in typical_hours]
-        if len(unusual_hours) > len(current_hours) * 0.5:  # More than 50% unusual hours
+        unusual_hours = np.flatnonzero(unusual & (hour_counts > 0)).tolist()
+        if hour_counts[unusual].sum() > len(events) * 0.5:  # More than 50% unusual hours
             anomalies.append({
                 'type': 'unusual_time_pattern',
                 'entity': username,
@@ -268,7 +262,7 @@ class BehavioralAnalyzer:
                 'description': f"User {username} active during unusual hours: {set(unusual_hours)}",
                 'confidence': 0.7,
                 'details': {
-                    'unusual_hours': list(set(unusual_hours)),
+                    'unusual_hours': unusual_hours,
                     'typical_hours': baseline['time_patterns']['typical_hours']
                 }
             })
@@ -475,27 +469,23 @@ class BehavioralAnalyzer:
             'event_rate_per_minute': len(events) / max((timestamps[-1] - timestamps[0]).total_seconds() / 60, 1) if len(timestamps) > 1 else 0
         }
     
-    def _get_typical_hours(self, hours: List[int]) -> List[int]:
+    def _get_typical_hours(self, hour_counts: np.ndarray) -> List[int]:
         """Get typical hours of activity (hours with >10% of activity)"""
-        if not hours:
+        total_events = hour_counts.sum()
+        if not total_events:
             return []
         
-        hour_counts = np.histogram(hours, bins=24)[0]
-        total_events = sum(hour_counts)
         threshold = total_events * 0.1  # 10% threshold
-        
-        return [i for i, count in enumerate(hour_counts) if count >= threshold]
+        return np.flatnonzero(hour_counts >= threshold).tolist()
     
-    def _get_typical_days(self, days: List[int]) -> List[int]:
+    def _get_typical_days(self, day_counts: np.ndarray) -> List[int]:
         """Get typical days of activity"""
-        if not days:
+        total_events = day_counts.sum()
+        if not total_events:
             return []
         
-        day_counts = np.histogram(days, bins=7)[0]
-        total_events = sum(day_counts)
         threshold = total_events * 0.1
-        
-        return [i for i, count in enumerate(day_counts) if count >= threshold]
+        return np.flatnonzero(day_counts >= threshold).tolist()
     
     def _get_common_items(self, items: List, top_n: int = 5) -> List:
         """Get most common items from a list"""
@@ -506,43 +496,37 @@ class BehavioralAnalyzer:
         counter = Counter(items)
         return [item for item, count in counter.most_common(top_n)]
     
-    def _get_peak_hours(self, hours: List[int]) -> List[int]:
+    def _get_peak_hours(self, hour_counts: np.ndarray) -> List[int]:
         """Get peak activity hours"""
-        if not hours:
+        if not hour_counts.any():
             return []
         
-        hour_counts = np.histogram(hours, bins=24)[0]
-        max_count = max(hour_counts)
-        threshold = max_count * 0.8  # 80% of peak
-        
-        return [i for i, count in enumerate(hour_counts) if count >= threshold]
+        threshold = hour_counts.max() * 0.8  # 80% of peak
+        return np.flatnonzero(hour_counts >= threshold).tolist()
     
-    def _get_quiet_hours(self, hours: List[int]) -> List[int]:
+    def _get_quiet_hours(self, hour_counts: np.ndarray) -> List[int]:
         """Get quiet activity hours"""
-        if not hours:
+        if not hour_counts.any():
             return []
         
-        hour_counts = np.histogram(hours, bins=24)[0]
-        avg_count = np.mean(hour_counts)
-        threshold = avg_count * 0.3  # 30% of average
-        
-        return [i for i, count in enumerate(hour_counts) if count <= threshold]
+        threshold = hour_counts.mean() * 0.3  # 30% of average
+        return np.flatnonzero(hour_counts <= threshold).tolist()
     
-    def _calculate_business_hours_ratio(self, hours: List[int]) -> float:
+    def _calculate_business_hours_ratio(self, hour_counts: np.ndarray) -> float:
         """Calculate ratio of events during business hours (9-17)"""
-        if not hours:
+        total_events = hour_counts.sum()
+        if not total_events:
             return 0.0
         
-        business_hours_events = sum(1 for hour in hours if 9 <= hour <= 17)
-        return business_hours_events / len(hours)
+        return float(hour_counts[9:18].sum() / total_events)
     
-    def _calculate_weekend_ratio(self, days: List[int]) -> float:
+    def _calculate_weekend_ratio(self, day_counts: np.ndarray) -> float:
         """Calculate ratio of events during weekends"""
-        if not days:
+        total_events = day_counts.sum()
+        if not total_events:
             return 0.0
         
-        weekend_events = sum(1 for day in days if day >= 5)  # Saturday=5, Sunday=6
-        return weekend_events / len(days)
+        return float(day_counts[5:].sum() / total_events)  # Saturday=5, Sunday=6
     
     def _is_rhythmic_pattern(self, intervals: List[float]) -> bool:
         """Check if timing intervals show rhythmic pattern"""
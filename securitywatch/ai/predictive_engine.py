@@ -6,7 +6,7 @@ Predictive analytics for forecasting security threats and attack patterns
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Union
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.linear_model import LinearRegression
 from sklearn.preprocessing import StandardScaler
@@ -16,6 +16,7 @@ import logging
 from pathlib import Path
 
 from ..models.events import SecurityEvent
+from ..models.batch import EventBatch
 from ..core.database import SecurityDatabase
 
 
@@ -46,19 +47,14 @@ class PredictiveEngine:
         # Load existing models
         self._load_models()
     
-    def prepare_time_series_features(self, events: List[SecurityEvent], 
+    def prepare_time_series_features(self, events: Union[EventBatch, List[SecurityEvent]], 
                                    window_hours: int = 1) -> pd.DataFrame:
         """Prepare time series features for prediction models"""
-        if not events:
+        if not len(events):
             return pd.DataFrame()
         
         # Create time series dataframe
-        df = pd.DataFrame([{
-            'timestamp': event.timestamp,
-            'severity': event.severity,
-            'event_type': event.event_type,
-            'source_ip': event.source_ip
-        } for event in events])
+        df = EventBatch.of(events).to_frame(['timestamp', 'severity', 'event_type', 'source_ip'])
         
         df['timestamp'] = pd.to_datetime(df['timestamp'])
         df = df.sort_values('timestamp')
@@ -147,7 +143,7 @@ class PredictiveEngine:
         self.logger.info(f"Training predictive models on {training_days} days of data...")
         
         # Get training data
-        events = self.database.get_recent_events(training_days * 24)
+        events = self.database.get_event_batch(hours=training_days * 24)
         
         if len(events) < self.min_training_samples:
             self.logger.warning(f"Insufficient training data. Need at least {self.min_training_samples} events.")
@@ -342,7 +338,7 @@ class PredictiveEngine:
             hours_ahead = self.prediction_horizon_hours
         
         # Get recent data for context
-        recent_events = self.database.get_recent_events(48)  # Last 48 hours for context
+        recent_events = self.database.get_event_batch(hours=48)  # Last 48 hours for context
         features_df = self.prepare_time_series_features(recent_events, window_hours=1)
         
         if features_df.empty:
@@ -7,6 +7,7 @@ import json
 import base64
 import hashlib
 import platform
+import shutil
 from pathlib import Path
 from dataclasses import asdict
 from cryptography.fernet import Fernet
@@ -79,6 +80,7 @@ class SecurityWatchConfig:
         
         # Auto-detect log paths based on OS
         self.monitoring.log_paths = self._detect_log_paths()
+        self.monitoring.input_sources = self._detect_input_sources(self.monitoring.log_paths)
         
         self.save_config()
     
@@ -128,6 +130,15 @@ class SecurityWatchConfig:
         
         return log_paths
     
+    def _detect_input_sources(self, log_paths: List[str]) -> List[str]:
+        """Follow the systemd journal when no authentication log reaches the disk"""
+        auth_logs = ("/var/log/auth.log", "/var/log/secure")
+        if platform.system().lower() != "linux" or any(path in log_paths for path in auth_logs):
+            return []
+        if Path("/run/systemd/journal").is_dir() and shutil.which("journalctl"):
+            return ["journal"]
+        return []
+    
     def _parse_config(self, config_data: dict):
         """Parse configuration from JSON"""
         # Parse email config
@@ -192,6 +203,7 @@ class SecurityWatchConfig:
         return {
             'email_configured': self.email.enabled,
             'log_paths_count': len(self.monitoring.log_paths),
+            'input_sources': list(self.monitoring.input_sources),
             'check_interval': self.monitoring.check_interval,
             'alert_frequency': self.alerts.alert_frequency,
             'severity_threshold': self.alerts.severity_threshold,
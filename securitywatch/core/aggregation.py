@@ -0,0 +1,132 @@
+"""
+SecurityWatch Pro - Windowed Event Aggregation
+"""
+
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+from ..models.events import SecurityEvent, ThreatPattern
+
+
+# Buckets a pattern's time window is divided into; counts are exact to one bucket's width
+AGGREGATION_BUCKETS = 10
+
+# (pattern, key) counters kept before the least recently active are evicted
+MAX_AGGREGATION_KEYS = 100_000
+
+
+class _WindowCounter:
+    """Matches of one (pattern, key) in time buckets, oldest first"""
+    
+    def __init__(self):
+        self.buckets: Deque[list] = deque()  # [bucket index, count, first match time]
+        self.total = 0
+        self.reported_until: Optional[datetime] = None
+    
+    def add(self, bucket: int, horizon: int, timestamp: datetime):
+        """Count a match in a bucket, dropping buckets at or before horizon"""
+        buckets = self.buckets
+        while buckets and buckets[0][0] <= horizon:
+            self.total -= buckets.popleft()[1]
+        if buckets and buckets[-1][0] >= bucket:
+            buckets[-1][1] += 1  # Same bucket, or a late match folded into the newest
+        else:
+            buckets.append([bucket, 1, timestamp])
+        self.total += 1
+    
+    @property
+    def first_seen(self) -> datetime:
+        """Time of the oldest match still counted"""
+        return self.buckets[0][2]
+    
+    def reset(self):
+        self.buckets.clear()
+        self.total = 0
+
+
+class EventAggregator:
+    """Fold repeated matches of thresholded patterns into one event.
+    
+    Patterns marked aggregate only matter in volume, so instead of storing
+    a row per matching line their matches are counted per (pattern, source
+    IP or username) in time buckets covering the pattern's time_window. One
+    event is emitted when threshold_count is reached; further matches of
+    that key within the window are absorbed, and counting starts afresh
+    after it. Other events pass through unchanged. Counters are kept in
+    LRU order and the least recently active are evicted past max_keys.
+    """
+    
+    def __init__(self, max_keys: int = MAX_AGGREGATION_KEYS):
+        self.max_keys = max_keys
+        self.absorbed = 0
+        self.evicted = 0
+        self._counters: Dict[Tuple[str, str], _WindowCounter] = OrderedDict()
+    
+    def __len__(self) -> int:
+        return len(self._counters)
+    
+    @staticmethod
+    def rules(patterns: Iterable[ThreatPattern]) -> Dict[str, Tuple[int, int]]:
+        """(threshold_count, time_window) of every aggregated pattern, by event type"""
+        return {
+            pattern.name.lower().replace(' ', '_'): (max(1, pattern.threshold_count), max(1, pattern.time_window))
+            for pattern in patterns if pattern.aggregate
+        }
+    
+    def aggregate(self, events: Iterable[SecurityEvent], patterns: Iterable[ThreatPattern]) -> List[SecurityEvent]:
+        """Events to store for a time-ordered run of matches"""
+        rules = self.rules(patterns)
+        if not rules:
+            return list(events)
+        
+        kept = []
+        for event in events:
+            rule = rules.get(event.event_type)
+            if rule is None:
+                kept.append(event)
+                continue
+            
+            aggregated = self._count(event, *rule)
+            if aggregated is None:
+                self.absorbed += 1
+            else:
+                kept.append(aggregated)
+        return kept
+    
+    def _count(self, event: SecurityEvent, threshold: int, window: int) -> Optional[SecurityEvent]:
+        """Count a match, returning the aggregated event when it reaches the threshold"""
+        key = (event.event_type, event.source_ip or event.username)
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters[key] = _WindowCounter()
+            if len(self._counters) > self.max_keys:
+                self._counters.popitem(last=False)
+                self.evicted += 1
+        else:
+            self._counters.move_to_end(key)
+        
+        if counter.reported_until is not None:
+            if event.timestamp < counter.reported_until:
+                return None
+            counter.reported_until = None
+        
+        width = window / AGGREGATION_BUCKETS
+        bucket = int(event.timestamp.timestamp() // width)
+        counter.add(bucket, bucket - AGGREGATION_BUCKETS, event.timestamp)
+        if counter.total < threshold:
+            return None
+        
+        count, span = counter.total, (event.timestamp - counter.first_seen).total_seconds()
+        counter.reset()
+        counter.reported_until = event.timestamp + timedelta(seconds=window)
+        return SecurityEvent(
+            timestamp=event.timestamp,
+            event_type=event.event_type,
+            source_ip=event.source_ip,
+            username=event.username,
+            hostname=event.hostname,
+            details=f"{count} matches in {span:.0f}s (threshold {threshold} in {window}s); last: {event.details}",
+            severity=event.severity,
+            log_source=event.log_source
+        )
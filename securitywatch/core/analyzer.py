@@ -5,19 +5,33 @@ Enhanced with AI/ML capabilities for advanced threat detection
 
 from collections import defaultdict, Counter
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterable, List, Any, Optional
 import logging
 
 from ..models.events import SecurityEvent
+from ..models.batch import EventBatch
+from .bruteforce import BRUTE_FORCE_EVENT_TYPES, BruteForceDetector
 from .database import SecurityDatabase
+from .sketches import HEAVY_HITTER_ERROR, HeavyHitterCounter
+from .timeline import Timeline, TimelineBuilder
+
+
+# Events kept for AI analysis when analyzing a streamed window
+AI_SAMPLE_SIZE = 100
+
+# Entries reported in top_source_ips and top_usernames
+TOP_ENTRIES = 10
 
 
 class ThreatAnalyzer:
     """Advanced threat analysis and correlation with AI/ML capabilities"""
 
-    def __init__(self, database: SecurityDatabase, enable_ai: bool = True):
+    def __init__(self, database: SecurityDatabase, enable_ai: bool = True,
+                 heavy_hitter_error: float = HEAVY_HITTER_ERROR):
         self.database = database
+        self.heavy_hitter_error = heavy_hitter_error
         self.event_cache = defaultdict(list)
+        self.brute_force_detector = BruteForceDetector()
         self.enable_ai = enable_ai
         self.logger = logging.getLogger('SecurityWatch.ThreatAnalyzer')
 
@@ -35,13 +49,28 @@ class ThreatAnalyzer:
                 self.logger.error(f"Failed to initialize AI components: {e}")
                 self.enable_ai = False
     
-    def analyze_events(self, events: List[SecurityEvent]) -> Dict[str, Any]:
-        """Perform comprehensive threat analysis with AI enhancement"""
+    def analyze_events(self, events: Iterable[SecurityEvent]) -> Dict[str, Any]:
+        """Perform comprehensive threat analysis with AI enhancement.
+        
+        Events are consumed in a single pass, so a streaming iterator such as
+        SecurityDatabase.iter_events() can be analyzed without holding the
+        whole window in memory. In that case only the first AI_SAMPLE_SIZE
+        events are kept for the AI analysis. Source IPs and usernames of a
+        stream are counted exactly until more distinct ones appear than the
+        sketches track, then through Space-Saving and HyperLogLog, so memory
+        stays bounded however many distinct attackers appear; the top
+        entries are then overcounted by at most heavy_hitter_error of the
+        events. Lists are already in memory and are always counted exactly.
+        An EventBatch is summarized column-wise, and exactly, without
+        building SecurityEvent objects.
+        """
         analysis = {
-            'total_events': len(events),
+            'total_events': 0,
             'severity_breakdown': Counter(),
             'top_source_ips': Counter(),
             'top_usernames': Counter(),
+            'distinct_source_ips': 0,
+            'distinct_usernames': 0,
             'attack_patterns': [],
             'brute_force_attempts': [],
             'geographic_analysis': {},
@@ -51,20 +80,16 @@ class ThreatAnalyzer:
             'threat_score': 0
         }
         
-        # Basic statistics
-        for event in events:
-            analysis['severity_breakdown'][event.severity] += 1
-            if event.source_ip:
-                analysis['top_source_ips'][event.source_ip] += 1
-            if event.username:
-                analysis['top_usernames'][event.username] += 1
-        
-        # Detect brute force attacks
-        analysis['brute_force_attempts'] = self._detect_brute_force(events)
-        
-        # Analyze timeline patterns
-        analysis['timeline_analysis'] = self._analyze_timeline(events)
+        # Basic statistics, brute force detection and timeline
+        if isinstance(events, EventBatch):
+            ai_events = self._summarize_batch(events, analysis)
+        else:
+            ai_events = self._summarize_events(events, analysis)
         
+        return self.finish_analysis(analysis, ai_events)
+    
+    def finish_analysis(self, analysis: Dict[str, Any], ai_events) -> Dict[str, Any]:
+        """Add the threat score, recommendations and AI analysis to summarized statistics"""
         # Calculate threat score
         analysis['threat_score'] = self._calculate_threat_score(analysis)
         
@@ -72,9 +97,9 @@ class ThreatAnalyzer:
         analysis['recommendations'] = self._generate_recommendations(analysis)
 
         # AI-Enhanced Analysis
-        if self.enable_ai and self.ml_manager and events:
+        if self.enable_ai and self.ml_manager and ai_events:
             try:
-                ai_analysis = self.ml_manager.quick_analysis(events)
+                ai_analysis = self.ml_manager.quick_analysis(ai_events)
                 analysis['ai_analysis'] = ai_analysis
 
                 # Enhance threat score with AI insights
@@ -93,71 +118,59 @@ class ThreatAnalyzer:
 
         return analysis
     
-    def _detect_brute_force(self, events: List[SecurityEvent]) -> List[Dict]:
-        """Detect brute force attack patterns"""
-        brute_force_attacks = []
+    def _summarize_events(self, events: Iterable[SecurityEvent], analysis: Dict[str, Any]):
+        """Fill the basic statistics from events in one pass, returning the AI sample"""
+        sample_events = isinstance(events, list)
+        ai_events = events if sample_events else []
+        attempts = []  # Only failed logins are kept for the sliding-window detection
+        timeline = TimelineBuilder()
+        error = None if sample_events else self.heavy_hitter_error
+        ip_counts, user_counts = HeavyHitterCounter(error), HeavyHitterCounter(error)
         
-        # Group events by IP and time window
-        ip_events = defaultdict(list)
         for event in events:
-            if event.source_ip and event.event_type in [
-                'ssh_failed_login', 'windows_failed_login', 'failed_root_login',
-                'multiple_authentication_failures'
-            ]:
-                ip_events[event.source_ip].append(event)
+            analysis['total_events'] += 1
+            analysis['severity_breakdown'][event.severity] += 1
+            if event.source_ip:
+                ip_counts.add(event.source_ip)
+            if event.username:
+                user_counts.add(event.username)
+            
+            if event.source_ip and event.event_type in BRUTE_FORCE_EVENT_TYPES:
+                attempts.append(event)
+            timeline.add(event.timestamp)
+            
+            if not sample_events and len(ai_events) < AI_SAMPLE_SIZE:
+                ai_events.append(event)
         
-        # Analyze each IP for brute force patterns
-        for ip, ip_event_list in ip_events.items():
-            if len(ip_event_list) >= 5:  # Threshold for brute force
-                # Check if events are within time window
-                timestamps = [e.timestamp for e in ip_event_list]
-                timestamps.sort()
-                
-                time_span = (timestamps[-1] - timestamps[0]).total_seconds()
-                if time_span <= 600:  # 10 minutes
-                    severity = 'critical' if len(ip_event_list) > 20 else 'high'
-                    if len(ip_event_list) > 50:
-                        severity = 'critical'
-                    
-                    brute_force_attacks.append({
-                        'source_ip': ip,
-                        'attempt_count': len(ip_event_list),
-                        'time_span_seconds': time_span,
-                        'usernames_targeted': list(set(e.username for e in ip_event_list if e.username)),
-                        'first_attempt': timestamps[0],
-                        'last_attempt': timestamps[-1],
-                        'severity': severity,
-                        'attack_rate': len(ip_event_list) / (time_span / 60) if time_span > 0 else 0  # attempts per minute
-                    })
+        analysis['top_source_ips'].update(dict(ip_counts.most_common(TOP_ENTRIES)))
+        analysis['top_usernames'].update(dict(user_counts.most_common(TOP_ENTRIES)))
+        analysis['distinct_source_ips'] = ip_counts.distinct()
+        analysis['distinct_usernames'] = user_counts.distinct()
+        analysis['brute_force_attempts'] = self.brute_force_detector.detect(EventBatch.from_events(attempts))
+        analysis['timeline_analysis'] = timeline.finish().summary()
+        return ai_events
+    
+    def _summarize_batch(self, batch: EventBatch, analysis: Dict[str, Any]) -> EventBatch:
+        """Fill the basic statistics from a columnar batch, returning the AI sample"""
+        analysis['total_events'] = len(batch)
+        analysis['severity_breakdown'].update(batch.counts('severity'))
+        for column, key in (('source_ip', 'source_ips'), ('username', 'usernames')):
+            counts = Counter(batch.counts(column))
+            counts.pop("", None)
+            analysis[f'top_{key}'].update(dict(counts.most_common(TOP_ENTRIES)))
+            analysis[f'distinct_{key}'] = len(counts)
         
-        return sorted(brute_force_attacks, key=lambda x: x['attempt_count'], reverse=True)
+        analysis['brute_force_attempts'] = self.brute_force_detector.detect(batch)
+        analysis['timeline_analysis'] = Timeline.from_batch(batch).summary()
+        return batch
+    
+    def _detect_brute_force(self, events: List[SecurityEvent]) -> List[Dict]:
+        """Detect brute force attack patterns"""
+        return self.brute_force_detector.detect_events(events)
     
     def _analyze_timeline(self, events: List[SecurityEvent]) -> Dict:
         """Analyze event timeline patterns"""
-        if not events:
-            return {}
-        
-        # Group events by hour
-        hourly_events = defaultdict(int)
-        daily_events = defaultdict(int)
-        
-        for event in events:
-            hour = event.timestamp.hour
-            day = event.timestamp.strftime('%Y-%m-%d')
-            hourly_events[hour] += 1
-            daily_events[day] += 1
-        
-        # Find peak hours and days
-        peak_hour = max(hourly_events.items(), key=lambda x: x[1]) if hourly_events else (0, 0)
-        peak_day = max(daily_events.items(), key=lambda x: x[1]) if daily_events else ('', 0)
-        
-        return {
-            'hourly_distribution': dict(hourly_events),
-            'daily_distribution': dict(daily_events),
-            'peak_hour': {'hour': peak_hour[0], 'events': peak_hour[1]},
-            'peak_day': {'date': peak_day[0], 'events': peak_day[1]},
-            'total_days_with_events': len(daily_events)
-        }
+        return Timeline.from_timestamps([event.timestamp for event in events]).summary()
     
     def _calculate_threat_score(self, analysis: Dict) -> int:
         """Calculate overall threat score (0-100)"""
@@ -243,8 +256,7 @@ class ThreatAnalyzer:
     
     def get_ip_analysis(self, ip_address: str, hours: int = 24) -> Dict:
         """Get detailed analysis for a specific IP address"""
-        events = self.database.get_recent_events(hours)
-        ip_events = [e for e in events if e.source_ip == ip_address]
+        ip_events = self.database.get_ip_events(ip_address, hours)
         
         if not ip_events:
             return {'ip': ip_address, 'events': [], 'analysis': 'No recent activity'}
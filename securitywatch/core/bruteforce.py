@@ -0,0 +1,255 @@
+"""
+SecurityWatch Pro - Brute Force Detection
+"""
+
+import bisect
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ..models.batch import EventBatch
+from ..models.events import SecurityEvent, ThreatPattern
+
+
+# Event types that count as failed authentication attempts
+BRUTE_FORCE_EVENT_TYPES = frozenset([
+    'ssh_failed_login', 'windows_failed_login', 'failed_root_login',
+    'multiple_authentication_failures'
+])
+
+# Failed attempts from one IP within the window that make an attack
+BRUTE_FORCE_THRESHOLD = 5
+BRUTE_FORCE_WINDOW = 600  # seconds
+
+# Event type of the findings the streaming detector reports
+BRUTE_FORCE_ATTACK_EVENT_TYPE = 'brute_force_attack'
+
+# Source IPs whose recent attempts the streaming detector keeps
+MAX_TRACKED_IPS = 100_000
+
+
+def brute_force_severity(count: int) -> str:
+    """Severity of an attack with the given number of attempts"""
+    return 'critical' if count > 20 else 'high'
+
+
+class BruteForceDetector:
+    """Sliding-window brute force detection over a batch of events.
+    
+    Failed authentication attempts are sorted by (source IP, time) into
+    arrays, and one searchsorted call finds how many attempts fall in the
+    window starting at every attempt. An IP is reported when any window
+    reaches the threshold, however long its campaign lasts, with the
+    figures of its busiest window.
+    """
+    
+    def __init__(self, threshold: int = BRUTE_FORCE_THRESHOLD, window_seconds: int = BRUTE_FORCE_WINDOW):
+        self.threshold = threshold
+        self.window_seconds = window_seconds
+    
+    @staticmethod
+    def attempts(batch: EventBatch) -> EventBatch:
+        """Failed authentication events that carry a source IP"""
+        brute_force_codes = [code for code, event_type in enumerate(batch.categories['event_type'])
+                             if event_type in BRUTE_FORCE_EVENT_TYPES]
+        mask = np.isin(batch.codes['event_type'], brute_force_codes)
+        mask &= batch.codes['source_ip'] != batch.code_of('source_ip', "")
+        return batch.take(mask)
+    
+    def detect_events(self, events: Iterable[SecurityEvent]) -> List[Dict]:
+        """Detect attacks in SecurityEvent objects, keeping only the attempts in memory"""
+        attempts = [event for event in events
+                    if event.source_ip and event.event_type in BRUTE_FORCE_EVENT_TYPES]
+        return self.detect(EventBatch.from_events(attempts))
+    
+    def detect(self, batch: EventBatch) -> List[Dict]:
+        """Detect attacks in a batch, busiest first"""
+        attempts = self.attempts(batch)
+        if len(attempts) < self.threshold:
+            return []
+        
+        # Sort attempts by IP, then time
+        times = attempts.timestamps.view(np.int64)
+        ips = attempts.codes['source_ip']
+        order = np.lexsort((times, ips))
+        times, ips = times[order], ips[order]
+        users = attempts.codes['username'][order]
+        
+        # Monotonic key whose differences equal time differences within an IP
+        # and always exceed the window between IPs; gaps longer than the
+        # window are capped, so it cannot overflow on long histories
+        window = self.window_seconds * 1_000_000
+        gaps = np.diff(times)
+        gaps = np.where(ips[1:] == ips[:-1], np.minimum(gaps, window + 1), window + 1)
+        key = np.concatenate(([0], np.cumsum(gaps)))
+        
+        # Attempts in the window starting at each attempt: [i, ends[i])
+        starts = np.arange(len(key))
+        ends = np.searchsorted(key, key + window, side='right')
+        counts = ends - starts
+        qualifying = np.flatnonzero(counts >= self.threshold)
+        if not len(qualifying):
+            return []
+        
+        # Busiest window per IP: highest count, earliest start
+        best = qualifying[np.lexsort((qualifying, -counts[qualifying], ips[qualifying]))]
+        attacker_ips, first_of_ip = np.unique(ips[best], return_index=True)
+        peaks = best[first_of_ip]
+        
+        # Overlapping qualifying windows form one burst; count separate bursts
+        qualifying_ips = ips[qualifying]
+        new_burst = np.ones(len(qualifying), dtype=bool)
+        new_burst[1:] = (qualifying_ips[1:] != qualifying_ips[:-1]) | (ends[qualifying[:-1]] <= qualifying[1:])
+        ip_count = len(attempts.categories['source_ip'])
+        bursts = np.bincount(qualifying_ips[new_burst], minlength=ip_count)
+        totals = np.bincount(ips, minlength=ip_count)
+        
+        ip_names = attempts.categories['source_ip']
+        user_names = attempts.categories['username']
+        attacks = []
+        for ip, start in zip(attacker_ips.tolist(), peaks.tolist()):
+            end = int(ends[start])
+            count = end - start
+            first = np.datetime64(int(times[start]), 'us').item()
+            last = np.datetime64(int(times[end - 1]), 'us').item()
+            time_span = (last - first).total_seconds()
+            attacks.append({
+                'source_ip': ip_names[ip],
+                'attempt_count': count,
+                'time_span_seconds': time_span,
+                'usernames_targeted': sorted({user_names[code] for code in users[start:end].tolist()} - {""}),
+                'first_attempt': first,
+                'last_attempt': last,
+                'severity': brute_force_severity(count),
+                'attack_rate': count / (time_span / 60) if time_span > 0 else 0,  # attempts per minute
+                'total_attempts': int(totals[ip]),
+                'burst_count': int(bursts[ip])
+            })
+        
+        return sorted(attacks, key=lambda x: (-x['attempt_count'], x['first_attempt'], x['source_ip']))
+
+
+def attack_event(attack: Dict, trigger: SecurityEvent) -> SecurityEvent:
+    """Event recording a streaming brute force finding, raised by its triggering attempt.
+    
+    The username is left empty, since the attempts already count towards
+    the usernames they targeted; those are listed in the details instead.
+    """
+    targeted = ', '.join(attack['usernames_targeted']) or 'none'
+    return SecurityEvent(
+        timestamp=attack['last_attempt'],
+        event_type=BRUTE_FORCE_ATTACK_EVENT_TYPE,
+        source_ip=attack['source_ip'],
+        username="",
+        hostname=trigger.hostname,
+        details=(f"{attack['attempt_count']} failed logins in {attack['time_span_seconds']:.0f}s "
+                 f"(burst {attack['burst_count']}, {attack['total_attempts']} attempts seen); "
+                 f"usernames targeted: {targeted}"),
+        severity=attack['severity'],
+        log_source=trigger.log_source
+    )
+
+
+class _AttemptRing:
+    """Times and usernames of an IP's latest failed attempts, oldest first"""
+    
+    def __init__(self):
+        self.times: Deque[datetime] = deque()
+        self.usernames: Deque[str] = deque()
+        self.total = 0
+        self.bursts = 0
+        self.in_burst = False
+    
+    def add(self, timestamp: datetime, username: str, size: int):
+        """Record an attempt, keeping only the latest size"""
+        times = self.times
+        # Attempts normally arrive in order; a late one is slotted in place
+        position = len(times) if not times or timestamp >= times[-1] else bisect.bisect_right(times, timestamp)
+        times.insert(position, timestamp)
+        self.usernames.insert(position, username)
+        if len(times) > size:
+            times.popleft()
+            self.usernames.popleft()
+        self.total += 1
+
+
+class StreamingBruteForceDetector:
+    """Brute force detection as events arrive.
+    
+    Each source IP keeps a ring buffer of its latest failed attempts, as
+    many as the threshold: the IP is attacking once the oldest of them lies
+    within the window of the newest, so every attempt is checked in O(1).
+    A finding is reported when a burst starts, not for each attempt in it.
+    The threshold and window of an event type come from its ThreatPattern,
+    unless the pattern is aggregated; event types sharing a rule share the
+    buffer. IPs are kept in LRU order and the least recently active are
+    evicted past max_ips.
+    """
+    
+    def __init__(self, patterns: Iterable[ThreatPattern] = (), threshold: int = BRUTE_FORCE_THRESHOLD,
+                 window_seconds: int = BRUTE_FORCE_WINDOW, max_ips: int = MAX_TRACKED_IPS):
+        self.rules: Dict[str, Tuple[int, int]] = {event_type: (threshold, window_seconds)
+                                                  for event_type in BRUTE_FORCE_EVENT_TYPES}
+        for pattern in patterns:
+            event_type = pattern.name.lower().replace(' ', '_')
+            # An aggregated pattern's threshold and window say when to store an event
+            if event_type in self.rules and not pattern.aggregate:
+                self.rules[event_type] = (max(1, pattern.threshold_count), pattern.time_window)
+        self.max_ips = max_ips
+        self.evicted = 0
+        self._rings: Dict[Tuple[str, int, int], _AttemptRing] = OrderedDict()
+    
+    def __len__(self) -> int:
+        return len(self._rings)
+    
+    def observe(self, event: SecurityEvent) -> Optional[Dict]:
+        """Record one event, returning a finding when it starts a brute force burst"""
+        rule = self.rules.get(event.event_type)
+        if rule is None or not event.source_ip:
+            return None
+        
+        threshold, window = rule
+        key = (event.source_ip, threshold, window)
+        ring = self._rings.get(key)
+        if ring is None:
+            ring = self._rings[key] = _AttemptRing()
+            if len(self._rings) > self.max_ips:
+                self._rings.popitem(last=False)
+                self.evicted += 1
+        else:
+            self._rings.move_to_end(key)
+        ring.add(event.timestamp, event.username, threshold)
+        
+        times = ring.times
+        if len(times) < threshold or (times[-1] - times[0]).total_seconds() > window:
+            ring.in_burst = False
+            return None
+        if ring.in_burst:
+            return None
+        
+        ring.in_burst = True
+        ring.bursts += 1
+        time_span = (times[-1] - times[0]).total_seconds()
+        return {
+            'source_ip': event.source_ip,
+            'attempt_count': len(times),
+            'time_span_seconds': time_span,
+            'usernames_targeted': sorted(set(ring.usernames) - {""}),
+            'first_attempt': times[0],
+            'last_attempt': times[-1],
+            'severity': brute_force_severity(len(times)),
+            'attack_rate': len(times) / (time_span / 60) if time_span > 0 else 0,  # attempts per minute
+            'total_attempts': ring.total,
+            'burst_count': ring.bursts
+        }
+    
+    def observe_events(self, events: Iterable[SecurityEvent]) -> List[Tuple[Dict, SecurityEvent]]:
+        """Record events in order, returning each finding with the event that triggered it"""
+        findings = []
+        for event in events:
+            attack = self.observe(event)
+            if attack is not None:
+                findings.append((attack, event))
+        return findings
@@ -0,0 +1,237 @@
+"""
+SecurityWatch Pro - Rotation-Aware Log Checkpoints
+"""
+
+import glob
+import hashlib
+import logging
+import os
+from dataclasses import replace
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..models.events import LogCheckpoint
+from .readers import ChunkedLineReader
+
+
+# Bytes at the head of a file hashed to recognise it after copytruncate or inode reuse
+FINGERPRINT_SIZE = 1024
+
+# Suffixes of rotated files that cannot be drained as plain text
+COMPRESSED_SUFFIXES = ('.gz', '.bz2', '.xz', '.zst', '.lz4', '.Z')
+
+
+def head_fingerprint(f, size: int) -> str:
+    """Hash of the first size bytes of an open binary file"""
+    f.seek(0)
+    return hashlib.sha1(f.read(size)).hexdigest()
+
+
+def rotation_candidates(log_path: str) -> List[str]:
+    """Uncompressed files a rotated log may have been moved or copied to, newest first"""
+    candidates = [f"{log_path}.1", f"{log_path}.0"]
+    dated = [path for path in glob.glob(glob.escape(log_path) + '-*')
+             if not path.endswith(COMPRESSED_SUFFIXES)]
+    candidates.extend(sorted(dated, key=lambda path: os.stat(path).st_mtime, reverse=True))
+    return [path for path in candidates if os.path.isfile(path)]
+
+
+def rotation_set(patterns: Iterable[str]) -> List[str]:
+    """Files matched by glob patterns, oldest first by modification time.
+    
+    Rotation keeps each file's modification time, so this orders a set
+    such as auth.log.14.gz ... auth.log.1 auth.log whatever the naming.
+    """
+    paths = set()
+    for pattern in patterns:
+        paths.update(path for path in glob.glob(pattern) if os.path.isfile(path))
+    return sorted(paths, key=lambda path: (os.stat(path).st_mtime, path))
+
+
+class LogTracker:
+    """Follow one monitored log path across restarts and rotations.
+    
+    Each file is remembered by (device, inode) with its read offset and a
+    head-of-file fingerprint. A file renamed away by rotation is drained
+    from its rotated name before the new file is read, and a file truncated
+    in place by copytruncate is drained from the copy whose head matches.
+    Changes since the last save can be rolled back when the lines read
+    could not be processed, so they are read again rather than skipped.
+    """
+    
+    def __init__(self, log_path: str, checkpoints: Iterable[LogCheckpoint] = ()):
+        self.log_path = log_path
+        self.logger = logging.getLogger('SecurityWatchPro')
+        self.checkpoints: Dict[Tuple[int, int], LogCheckpoint] = {
+            (checkpoint.device, checkpoint.inode): checkpoint for checkpoint in checkpoints
+        }
+        self.dirty: Dict[Tuple[int, int], LogCheckpoint] = {}
+        self.retired: List[Tuple[int, int]] = []
+        self.backlog = False  # More of the live file remains beyond the last read budget
+        self._unsaved = None  # State as of the last save, while reads since are pending
+    
+    def start_at_end(self):
+        """Skip existing content of a file that has never been checkpointed"""
+        if self.checkpoints:
+            return
+        
+        try:
+            with open(self.log_path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                checkpoint = LogCheckpoint(self.log_path, stat.st_dev, stat.st_ino, 0)
+                checkpoint.offset = self._line_boundary(f, stat.st_size)
+                self._refresh_fingerprint(f, checkpoint)
+        except OSError:
+            return
+        self._remember(checkpoint)
+    
+    def iter_lines(self, max_bytes: Optional[int] = None) -> Iterator[bytes]:
+        """Stream every complete line written since the last call as raw bytes.
+        
+        At most max_bytes of the live file are read per call; `backlog` is
+        set when more remains. Rotated files are always drained completely.
+        The checkpoint advances as lines are consumed; rollback() undoes
+        that if the lines are not processed.
+        """
+        if self._unsaved is None:
+            self._unsaved = self._state()
+        self.backlog = False
+        try:
+            f = open(self.log_path, 'rb')
+        except OSError:
+            return
+        
+        with f:
+            stat = os.fstat(f.fileno())
+            key = (stat.st_dev, stat.st_ino)
+            current = self.checkpoints.pop(key, None)
+            
+            if current is not None and not self._same_content(f, stat.st_size, current):
+                # Truncated or replaced in place: drain the copy logrotate made
+                self.logger.info(f"Log rotation (copytruncate) detected for {self.log_path}")
+                yield from self._drain_copy(current)
+                current = None
+            
+            # Files no longer linked at log_path were renamed away by rotation
+            for old_key, checkpoint in list(self.checkpoints.items()):
+                self.logger.info(f"Log rotation detected for {self.log_path}")
+                yield from self._drain_renamed(checkpoint)
+                self._retire(old_key)
+            
+            if current is None:
+                current = LogCheckpoint(self.log_path, stat.st_dev, stat.st_ino, 0)
+            self._remember(current)
+            
+            reader = ChunkedLineReader(f, current.offset, max_bytes=max_bytes)
+            for line in reader:
+                current.offset = reader.offset
+                yield line
+            current.offset = reader.offset
+            self.backlog = reader.budget_exhausted
+            self._refresh_fingerprint(f, current)
+    
+    def read_lines(self, max_bytes: Optional[int] = None) -> List[str]:
+        """Read every complete line written since the last call"""
+        return [line.decode('utf-8', errors='ignore') for line in self.iter_lines(max_bytes)]
+    
+    def pending(self) -> Tuple[List[LogCheckpoint], List[Tuple[int, int]]]:
+        """Checkpoints to save and (device, inode) keys to delete"""
+        return list(self.dirty.values()), list(self.retired)
+    
+    def mark_saved(self):
+        """Forget pending changes once they have been persisted"""
+        self.dirty.clear()
+        self.retired.clear()
+        self._unsaved = None
+    
+    def rollback(self):
+        """Return to the positions of the last save, so lines read since are read again"""
+        if self._unsaved is None:
+            return
+        checkpoints, dirty, retired = self._unsaved
+        self.checkpoints = {key: replace(checkpoint) for key, checkpoint in checkpoints.items()}
+        self.dirty = {key: self.checkpoints.get(key, checkpoint) for key, checkpoint in dirty.items()}
+        self.retired = list(retired)
+        self.backlog = False
+        self._unsaved = None
+    
+    def _state(self):
+        """Copy of the checkpoints and pending changes, for rollback()"""
+        return ({key: replace(checkpoint) for key, checkpoint in self.checkpoints.items()},
+                {key: replace(checkpoint) for key, checkpoint in self.dirty.items()}, list(self.retired))
+    
+    def _remember(self, checkpoint: LogCheckpoint):
+        key = (checkpoint.device, checkpoint.inode)
+        self.checkpoints[key] = checkpoint
+        self.dirty[key] = checkpoint
+    
+    def _retire(self, key: Tuple[int, int]):
+        self.checkpoints.pop(key, None)
+        self.dirty.pop(key, None)
+        self.retired.append(key)
+    
+    @staticmethod
+    def _same_content(f, size: int, checkpoint: LogCheckpoint) -> bool:
+        """Whether an open file still holds the content a checkpoint was taken on"""
+        if size < checkpoint.offset:
+            return False
+        if not checkpoint.fingerprint_size:
+            return True
+        return head_fingerprint(f, checkpoint.fingerprint_size) == checkpoint.fingerprint
+    
+    @staticmethod
+    def _refresh_fingerprint(f, checkpoint: LogCheckpoint):
+        """Extend the fingerprint while the file is shorter than FINGERPRINT_SIZE"""
+        size = min(checkpoint.offset, FINGERPRINT_SIZE)
+        if size > checkpoint.fingerprint_size:
+            checkpoint.fingerprint = head_fingerprint(f, size)
+            checkpoint.fingerprint_size = size
+    
+    @staticmethod
+    def _line_boundary(f, offset: int) -> int:
+        """Largest offset at or before the given one that ends a line"""
+        if offset == 0:
+            return 0
+        window = min(offset, 64 * 1024)
+        f.seek(offset - window)
+        newline = f.read(window).rfind(b'\n')
+        return offset - window + newline + 1 if newline >= 0 else 0
+    
+    def _drain(self, path: str, checkpoint: LogCheckpoint) -> Iterator[bytes]:
+        """Stream the rest of a rotated file from a checkpoint's offset"""
+        with open(path, 'rb') as f:
+            yield from ChunkedLineReader(f, checkpoint.offset, final=True)
+    
+    def _drain_renamed(self, checkpoint: LogCheckpoint) -> Iterator[bytes]:
+        """Drain a file renamed away from log_path, found by its (device, inode)"""
+        for path in rotation_candidates(self.log_path):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if (stat.st_dev, stat.st_ino) == (checkpoint.device, checkpoint.inode):
+                with open(path, 'rb') as f:
+                    if not self._same_content(f, stat.st_size, checkpoint):
+                        break
+                yield from self._drain(path, checkpoint)
+                return
+        
+        self.logger.warning(f"Rotated file for {self.log_path} not found; "
+                            f"unread lines after offset {checkpoint.offset} are lost")
+    
+    def _drain_copy(self, checkpoint: LogCheckpoint) -> Iterator[bytes]:
+        """Drain the copy made by copytruncate, found by its head fingerprint"""
+        if checkpoint.fingerprint_size:
+            for path in rotation_candidates(self.log_path):
+                try:
+                    with open(path, 'rb') as f:
+                        size = os.fstat(f.fileno()).st_size
+                        matched = self._same_content(f, size, checkpoint)
+                except OSError:
+                    continue
+                if matched:
+                    yield from self._drain(path, checkpoint)
+                    return
+        
+        if checkpoint.offset:
+            self.logger.warning(f"Copy of truncated {self.log_path} not found; "
+                                f"unread lines after offset {checkpoint.offset} may be lost")
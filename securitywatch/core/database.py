@@ -3,11 +3,154 @@ SecurityWatch Pro - Database Management
 """
 
 import sqlite3
+import threading
+import time
+from collections import Counter
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
-from ..models.events import SecurityEvent
+from ..models.events import SecurityEvent, LogCheckpoint
+from ..models.batch import EventBatch
+
+
+# Tuning applied to every pooled connection
+SQLITE_PRAGMAS = (
+    ('journal_mode', 'WAL'),     # readers no longer block the writer
+    ('synchronous', 'NORMAL'),   # fsync at checkpoints only, safe under WAL
+    ('busy_timeout', 5000),      # wait up to 5s for a lock instead of failing
+    ('mmap_size', 268435456),    # read up to 256MB of the file through mmap
+    ('temp_store', 'MEMORY'),
+)
+
+
+# Longest a process waits for another one to finish migrating the schema, in seconds
+MIGRATION_LOCK_TIMEOUT = 600
+
+
+# Reputation points added per event, by severity
+REPUTATION_SCORES = {"low": 1, "medium": 5, "high": 10, "critical": 20}
+
+# IPs whose reputation score exceeds this are flagged as blocked
+BLOCK_THRESHOLD = 50
+
+
+# Rollup bucket sizes, as the length of the ISO timestamp prefix they keep
+# ("2025-01-01T12:34" for minutes, "2025-01-01T12" for hours)
+ROLLUP_GRANULARITIES = (('minute', 16), ('hour', 13))
+
+# Event columns counted in the rollups
+ROLLUP_DIMENSIONS = ('severity', 'event_type', 'source_ip')
+
+
+def _rollup_backfill_statements() -> List[str]:
+    """Statements that rebuild event_rollups from security_events"""
+    return [
+        f'''
+            INSERT INTO event_rollups (granularity, dimension, bucket, value, count)
+            SELECT '{granularity}', '{dimension}', substr(timestamp, 1, {length}), {dimension}, COUNT(*)
+            FROM security_events
+            WHERE {dimension} IS NOT NULL AND {dimension} != ''
+            GROUP BY substr(timestamp, 1, {length}), {dimension}
+        '''
+        for granularity, length in ROLLUP_GRANULARITIES
+        for dimension in ROLLUP_DIMENSIONS
+    ]
+
+
+# Schema migrations applied in order on top of the base tables; the database
+# records the last applied version in PRAGMA user_version
+SCHEMA_MIGRATIONS = [
+    (1, "Index security_events for time-range, IP, severity and type queries", [
+        'CREATE INDEX IF NOT EXISTS idx_events_timestamp ON security_events(timestamp)',
+        'CREATE INDEX IF NOT EXISTS idx_events_ip_timestamp ON security_events(source_ip, timestamp)',
+        'CREATE INDEX IF NOT EXISTS idx_events_severity ON security_events(severity)',
+        'CREATE INDEX IF NOT EXISTS idx_events_type_timestamp ON security_events(event_type, timestamp)',
+    ]),
+    (2, "Per-minute and per-hour event count rollups for dashboard statistics", [
+        '''
+            CREATE TABLE IF NOT EXISTS event_rollups (
+                granularity TEXT NOT NULL,
+                dimension TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                value TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (granularity, dimension, bucket, value)
+            ) WITHOUT ROWID
+        ''',
+        *_rollup_backfill_statements(),
+    ]),
+    (3, "Order severity-filtered event pages by timestamp from the index", [
+        'DROP INDEX IF EXISTS idx_events_severity',
+        'CREATE INDEX IF NOT EXISTS idx_events_severity_timestamp ON security_events(severity, timestamp)',
+    ]),
+    (4, "Persist log read positions across restarts and rotations", [
+        '''
+            CREATE TABLE IF NOT EXISTS log_checkpoints (
+                device INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                log_path TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                fingerprint TEXT NOT NULL,
+                fingerprint_size INTEGER NOT NULL,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (device, inode)
+            )
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_checkpoints_log_path ON log_checkpoints(log_path)',
+    ]),
+]
+
+
+class ConnectionPool:
+    """Thread-aware SQLite connection pool (one reusable connection per thread)"""
+    
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: Dict[int, sqlite3.Connection] = {}
+    
+    def connection(self) -> sqlite3.Connection:
+        """Get the calling thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'connection', None)
+        if conn is None:
+            conn = self._open()
+            self._local.connection = conn
+            self._register(conn)
+        return conn
+    
+    def _open(self) -> sqlite3.Connection:
+        """Open and tune a new connection"""
+        # check_same_thread is off so connections of finished threads can be
+        # closed from whichever thread prunes them; each connection is still
+        # only ever used by the thread that opened it
+        conn = sqlite3.connect(self.db_path, timeout=5.0, check_same_thread=False)
+        for pragma, value in SQLITE_PRAGMAS:
+            conn.execute(f'PRAGMA {pragma}={value}')
+        return conn
+    
+    def _register(self, conn: sqlite3.Connection):
+        """Track a new connection and close those left behind by finished threads"""
+        alive = {thread.ident for thread in threading.enumerate()}
+        with self._lock:
+            for ident in list(self._connections):
+                if ident not in alive:
+                    self._connections.pop(ident).close()
+            
+            # Thread identifiers can be recycled once a thread exits
+            previous = self._connections.get(threading.get_ident())
+            if previous is not None and previous is not conn:
+                previous.close()
+            self._connections[threading.get_ident()] = conn
+    
+    def close_all(self):
+        """Close every pooled connection"""
+        with self._lock:
+            for conn in self._connections.values():
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
 
 
 class SecurityDatabase:
@@ -15,11 +158,20 @@ class SecurityDatabase:
     
     def __init__(self, db_path: str = "securitywatch.db"):
         self.db_path = Path(db_path)
+        self._pool = ConnectionPool(self.db_path)
         self.init_database()
     
+    def _connection(self) -> sqlite3.Connection:
+        """Pooled connection for the calling thread"""
+        return self._pool.connection()
+    
+    def close(self):
+        """Close all pooled connections"""
+        self._pool.close_all()
+    
     def init_database(self):
         """Initialize database with required tables"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connection()
         cursor = conn.cursor()
         
         # Events table
@@ -65,18 +217,54 @@ class SecurityDatabase:
         ''')
         
         conn.commit()
-        conn.close()
+        
+        self._apply_migrations(conn)
     
-    def add_event(self, event: SecurityEvent):
-        """Add security event to database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def _apply_migrations(self, conn: sqlite3.Connection):
+        """Bring an existing database up to the current schema version.
         
-        cursor.execute('''
-            INSERT INTO security_events 
-            (timestamp, event_type, source_ip, username, hostname, details, severity, log_source)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        Each migration runs in a write transaction that re-reads the version
+        first, so processes opening the database at once apply it only once;
+        the others wait for it and then find it applied.
+        """
+        current = conn.execute('PRAGMA user_version').fetchone()[0]
+        
+        for version, description, statements in SCHEMA_MIGRATIONS:
+            if version <= current:
+                continue
+            self._begin_immediate(conn)
+            try:
+                current = conn.execute('PRAGMA user_version').fetchone()[0]
+                if version > current:
+                    for statement in statements:
+                        conn.execute(statement)
+                    conn.execute(f'PRAGMA user_version = {version}')
+                    current = version
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+    
+    @staticmethod
+    def _begin_immediate(conn: sqlite3.Connection):
+        """Take the write lock, waiting out another process's migration"""
+        deadline = time.monotonic() + MIGRATION_LOCK_TIMEOUT
+        while True:
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                return
+            except sqlite3.OperationalError as e:
+                if 'locked' not in str(e) or time.monotonic() >= deadline:
+                    raise
+    
+    def get_schema_version(self) -> int:
+        """Schema version recorded in the database file"""
+        return self._connection().execute('PRAGMA user_version').fetchone()[0]
+    
+    @staticmethod
+    def _event_row(event: SecurityEvent) -> tuple:
+        """Convert an event into a security_events row"""
+        return (
             event.timestamp.isoformat(),
             event.event_type,
             event.source_ip,
@@ -85,104 +273,349 @@ class SecurityDatabase:
             event.details,
             event.severity,
             event.log_source
-        ))
+        )
+    
+    @staticmethod
+    def _row_to_event(row: tuple) -> SecurityEvent:
+        """Convert a security_events row back into an event"""
+        return SecurityEvent(
+            timestamp=datetime.fromisoformat(row[0]),
+            event_type=row[1],
+            source_ip=row[2] or "",
+            username=row[3] or "",
+            hostname=row[4] or "",
+            details=row[5] or "",
+            severity=row[6],
+            log_source=row[7] or ""
+        )
+    
+    def add_event(self, event: SecurityEvent):
+        """Add security event to database"""
+        self.add_events([event])
+    
+    def add_events(self, events: List[SecurityEvent], checkpoints: Iterable[LogCheckpoint] = (),
+                   retired_checkpoints: Iterable[Tuple[int, int]] = ()) -> int:
+        """Add a batch of security events in a single transaction.
         
-        conn.commit()
-        conn.close()
+        Log checkpoints passed alongside are saved in the same transaction,
+        so a crash can never record a read position without the events read
+        up to it (or the other way round).
+        """
+        checkpoints = list(checkpoints)
+        retired_checkpoints = list(retired_checkpoints)
+        if not events and not checkpoints and not retired_checkpoints:
+            return 0
+        
+        rows = [self._event_row(event) for event in events]
+        
+        conn = self._connection()
+        with conn:
+            if rows:
+                conn.executemany('''
+                    INSERT INTO security_events 
+                    (timestamp, event_type, source_ip, username, hostname, details, severity, log_source)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', rows)
+                conn.executemany('''
+                    INSERT INTO event_rollups (granularity, dimension, bucket, value, count)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(granularity, dimension, bucket, value) DO UPDATE SET
+                        count = count + excluded.count
+                ''', self._rollup_counts(rows))
+            self._write_checkpoints(conn, checkpoints, retired_checkpoints)
+        
+        return len(events)
+    
+    @staticmethod
+    def _write_checkpoints(conn: sqlite3.Connection, checkpoints: List[LogCheckpoint],
+                           retired_checkpoints: List[Tuple[int, int]]):
+        """Upsert and delete log checkpoints inside the caller's transaction"""
+        if retired_checkpoints:
+            conn.executemany('DELETE FROM log_checkpoints WHERE device = ? AND inode = ?',
+                             retired_checkpoints)
+        if checkpoints:
+            now = datetime.now().isoformat()
+            conn.executemany('''
+                INSERT INTO log_checkpoints
+                (device, inode, log_path, offset, fingerprint, fingerprint_size, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(device, inode) DO UPDATE SET
+                    log_path = excluded.log_path,
+                    offset = excluded.offset,
+                    fingerprint = excluded.fingerprint,
+                    fingerprint_size = excluded.fingerprint_size,
+                    updated_at = excluded.updated_at
+            ''', [(c.device, c.inode, c.log_path, c.offset, c.fingerprint, c.fingerprint_size, now)
+                  for c in checkpoints])
+    
+    def save_log_checkpoints(self, checkpoints: Iterable[LogCheckpoint],
+                             retired_checkpoints: Iterable[Tuple[int, int]] = ()):
+        """Save log checkpoints without adding events"""
+        self.add_events([], checkpoints, retired_checkpoints)
+    
+    def get_log_checkpoints(self, log_path: str) -> List[LogCheckpoint]:
+        """Get every saved checkpoint for files linked at a monitored path"""
+        rows = self._connection().execute('''
+            SELECT log_path, device, inode, offset, fingerprint, fingerprint_size
+            FROM log_checkpoints WHERE log_path = ?
+        ''', (log_path,)).fetchall()
+        return [LogCheckpoint(*row) for row in rows]
+    
+    @staticmethod
+    def _rollup_counts(rows: List[tuple]) -> List[tuple]:
+        """Count security_events rows per rollup bucket"""
+        # Positions of the rolled-up dimensions in an event row
+        columns = (('severity', 6), ('event_type', 1), ('source_ip', 2))
+        counts = Counter()
+        for row in rows:
+            timestamp = row[0]
+            for granularity, length in ROLLUP_GRANULARITIES:
+                bucket = timestamp[:length]
+                for dimension, position in columns:
+                    if row[position]:
+                        counts[(granularity, dimension, bucket, row[position])] += 1
+        
+        return [key + (count,) for key, count in counts.items()]
     
     def get_recent_events(self, hours: int = 24) -> List[SecurityEvent]:
         """Get events from the last N hours"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        return list(self.iter_events(hours=hours))
+    
+    def get_ip_events(self, ip: str, hours: int = 24) -> List[SecurityEvent]:
+        """Get events from one source IP in the last N hours"""
+        return list(self.iter_events(hours=hours, source_ip=ip))
+    
+    @staticmethod
+    def _event_filters(hours: Optional[int], severity: Optional[str], source_ip: Optional[str],
+                       event_type: Optional[str]) -> Tuple[List[str], List]:
+        """Build WHERE clauses and parameters for the event filters"""
+        clauses, params = [], []
+        if hours is not None:
+            clauses.append('timestamp > ?')
+            params.append((datetime.now() - timedelta(hours=hours)).isoformat())
+        for column, value in (('severity', severity), ('source_ip', source_ip),
+                              ('event_type', event_type)):
+            if value is not None:
+                clauses.append(f'{column} = ?')
+                params.append(value)
+        return clauses, params
+    
+    @staticmethod
+    def encode_cursor(timestamp: str, event_id: int) -> str:
+        """Opaque keyset cursor pointing just past an event"""
+        return f"{timestamp}|{event_id}"
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[str, int]:
+        """Parse a cursor produced by encode_cursor"""
+        timestamp, _, event_id = cursor.rpartition('|')
+        if not timestamp:
+            raise ValueError(f"Invalid event cursor: {cursor!r}")
+        return timestamp, int(event_id)
+    
+    def get_events_page(self, limit: int = 50, cursor: Optional[str] = None,
+                        hours: Optional[int] = None, severity: Optional[str] = None,
+                        source_ip: Optional[str] = None,
+                        event_type: Optional[str] = None) -> Tuple[List[SecurityEvent], Optional[str]]:
+        """Get one page of events, newest first, and the cursor of the next page.
         
-        since = datetime.now() - timedelta(hours=hours)
-        cursor.execute('''
+        Pages are keyed on (timestamp, id) rather than OFFSET, so each page
+        is an index range search no matter how deep the caller pages.
+        """
+        if limit < 1:
+            raise ValueError(f"Event page limit must be positive, got {limit}")
+        
+        clauses, params = self._event_filters(hours, severity, source_ip, event_type)
+        if cursor is not None:
+            after_timestamp, after_id = self.decode_cursor(cursor)
+            # A row value keeps this a single index range with no sort step;
+            # the equivalent OR expression makes SQLite re-sort every page
+            clauses.append('(timestamp, id) < (?, ?)')
+            params.extend([after_timestamp, after_id])
+        
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        rows = self._connection().execute(f'''
+            SELECT timestamp, event_type, source_ip, username, hostname, details, severity, log_source, id
+            FROM security_events 
+            {where}
+            ORDER BY timestamp DESC, id DESC
+            LIMIT ?
+        ''', params + [limit]).fetchall()
+        
+        events = [self._row_to_event(row) for row in rows]
+        next_cursor = None
+        if rows and len(rows) == limit:
+            next_cursor = self.encode_cursor(rows[-1][0], rows[-1][8])
+        return events, next_cursor
+    
+    def iter_events(self, hours: Optional[int] = None, severity: Optional[str] = None,
+                    source_ip: Optional[str] = None, event_type: Optional[str] = None,
+                    limit: Optional[int] = None, page_size: int = 500) -> Iterator[SecurityEvent]:
+        """Stream matching events newest first, one page in memory at a time"""
+        cursor = None
+        remaining = limit
+        
+        while remaining is None or remaining > 0:
+            size = page_size if remaining is None else min(page_size, remaining)
+            events, cursor = self.get_events_page(size, cursor, hours, severity, source_ip, event_type)
+            yield from events
+            
+            if remaining is not None:
+                remaining -= len(events)
+            if cursor is None:
+                break
+    
+    def get_event_batch(self, hours: Optional[int] = None, severity: Optional[str] = None,
+                        source_ip: Optional[str] = None,
+                        event_type: Optional[str] = None) -> EventBatch:
+        """Load matching events, newest first, straight into a columnar EventBatch"""
+        clauses, params = self._event_filters(hours, severity, source_ip, event_type)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        rows = self._connection().execute(f'''
             SELECT timestamp, event_type, source_ip, username, hostname, details, severity, log_source
             FROM security_events 
-            WHERE timestamp > ?
-            ORDER BY timestamp DESC
-        ''', (since.isoformat(),))
-        
-        events = []
-        for row in cursor.fetchall():
-            events.append(SecurityEvent(
-                timestamp=datetime.fromisoformat(row[0]),
-                event_type=row[1],
-                source_ip=row[2] or "",
-                username=row[3] or "",
-                hostname=row[4] or "",
-                details=row[5] or "",
-                severity=row[6],
-                log_source=row[7] or ""
-            ))
-        
-        conn.close()
-        return events
+            {where}
+            ORDER BY timestamp DESC, id DESC
+        ''', params).fetchall()
+        return EventBatch.from_rows(rows)
+    
+    def count_events(self, hours: Optional[int] = None, severity: Optional[str] = None,
+                     source_ip: Optional[str] = None, event_type: Optional[str] = None) -> int:
+        """Count events matching the same filters as iter_events"""
+        clauses, params = self._event_filters(hours, severity, source_ip, event_type)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        return self._connection().execute(
+            f'SELECT COUNT(*) FROM security_events {where}', params).fetchone()[0]
+    
+    def last_event_id(self) -> int:
+        """Id of the most recently stored event, or 0 when there are none"""
+        return self._connection().execute('SELECT MAX(id) FROM security_events').fetchone()[0] or 0
+    
+    def get_events_after(self, after_id: int, hours: Optional[int] = None,
+                         limit: int = 5000) -> Tuple[List[SecurityEvent], int]:
+        """Get up to limit events stored after an event id, in insertion order.
+        
+        Returns the events and the id to pass as after_id for the next call,
+        so readers in other processes can follow new events as they are
+        stored with a primary key range search.
+        """
+        clauses, params = self._event_filters(hours, None, None, None)
+        clauses.insert(0, 'id > ?')
+        params.insert(0, after_id)
+        rows = self._connection().execute(f'''
+            SELECT timestamp, event_type, source_ip, username, hostname, details, severity, log_source, id
+            FROM security_events
+            WHERE {' AND '.join(clauses)}
+            ORDER BY id
+            LIMIT ?
+        ''', params + [limit]).fetchall()
+        
+        last_id = rows[-1][8] if rows else after_id
+        return [self._row_to_event(row) for row in rows], last_id
     
     def update_ip_reputation(self, ip: str, severity: str):
         """Update IP reputation based on events"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        now = datetime.now().isoformat()
+        self.apply_ip_reputation_deltas({
+            ip: {
+                'score': REPUTATION_SCORES.get(severity, 1),
+                'count': 1,
+                'first_seen': now,
+                'last_seen': now
+            }
+        })
+    
+    def apply_ip_reputation_deltas(self, deltas: Dict[str, Dict]) -> int:
+        """Apply aggregated per-IP reputation deltas with one upsert per IP"""
+        if not deltas:
+            return 0
         
-        # Score mapping
-        score_map = {"low": 1, "medium": 5, "high": 10, "critical": 20}
-        score = score_map.get(severity, 1)
+        rows = [
+            (ip, delta['score'], delta['first_seen'], delta['last_seen'], delta['count'],
+             int(delta['score'] > BLOCK_THRESHOLD))
+            for ip, delta in deltas.items()
+        ]
         
-        cursor.execute('''
-            INSERT OR REPLACE INTO ip_reputation 
-            (ip_address, reputation_score, first_seen, last_seen, event_count, is_blocked)
-            VALUES (
-                ?, 
-                COALESCE((SELECT reputation_score FROM ip_reputation WHERE ip_address = ?), 0) + ?,
-                COALESCE((SELECT first_seen FROM ip_reputation WHERE ip_address = ?), ?),
-                ?,
-                COALESCE((SELECT event_count FROM ip_reputation WHERE ip_address = ?), 0) + 1,
-                CASE WHEN COALESCE((SELECT reputation_score FROM ip_reputation WHERE ip_address = ?), 0) + ? > 50 THEN 1 ELSE 0 END
-            )
-        ''', (ip, ip, score, ip, datetime.now().isoformat(), datetime.now().isoformat(), ip, ip, score))
+        conn = self._connection()
+        with conn:
+            conn.executemany(f'''
+                INSERT INTO ip_reputation 
+                (ip_address, reputation_score, first_seen, last_seen, event_count, is_blocked)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(ip_address) DO UPDATE SET
+                    reputation_score = reputation_score + excluded.reputation_score,
+                    first_seen = MIN(COALESCE(first_seen, excluded.first_seen), excluded.first_seen),
+                    last_seen = MAX(COALESCE(last_seen, excluded.last_seen), excluded.last_seen),
+                    event_count = event_count + excluded.event_count,
+                    is_blocked = CASE WHEN reputation_score + excluded.reputation_score > {BLOCK_THRESHOLD}
+                                      THEN 1 ELSE 0 END
+            ''', rows)
         
-        conn.commit()
-        conn.close()
+        return len(rows)
     
     def cleanup_old_events(self, days: int):
         """Remove events older than specified days"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        conn = self._connection()
+        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
         
-        cutoff = datetime.now() - timedelta(days=days)
-        cursor.execute('DELETE FROM security_events WHERE timestamp < ?', (cutoff.isoformat(),))
-        
-        deleted = cursor.rowcount
-        conn.commit()
-        conn.close()
+        with conn:
+            # Take the deleted events back out of the rollups
+            for granularity, length in ROLLUP_GRANULARITIES:
+                for dimension in ROLLUP_DIMENSIONS:
+                    expired = conn.execute(f'''
+                        SELECT COUNT(*), substr(timestamp, 1, {length}), {dimension}
+                        FROM security_events
+                        WHERE timestamp < ? AND {dimension} IS NOT NULL AND {dimension} != ''
+                        GROUP BY 2, 3
+                    ''', (cutoff,)).fetchall()
+                    conn.executemany('''
+                        UPDATE event_rollups SET count = count - ?
+                        WHERE granularity = ? AND dimension = ? AND bucket = ? AND value = ?
+                    ''', [(count, granularity, dimension, bucket, value)
+                          for count, bucket, value in expired])
+                    conn.executemany('''
+                        DELETE FROM event_rollups
+                        WHERE granularity = ? AND dimension = ? AND bucket = ? AND value = ?
+                          AND count <= 0
+                    ''', [(granularity, dimension, bucket, value) for _, bucket, value in expired])
+            
+            cursor = conn.execute('DELETE FROM security_events WHERE timestamp < ?', (cutoff,))
+            deleted = cursor.rowcount
         
         return deleted
     
-    def get_statistics(self) -> dict:
-        """Get database statistics"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def _rollup_totals(self, dimension: str, hours: Optional[int] = None,
+                       limit: Optional[int] = None) -> List[tuple]:
+        """Sum rollup counts per value, over all time or the last N hours"""
+        if hours is None:
+            granularity, condition, params = 'hour', '', ()
+        else:
+            since = (datetime.now() - timedelta(hours=hours)).isoformat()
+            granularity, condition, params = 'minute', 'AND bucket >= ?', (since[:16],)
         
-        stats = {}
+        query = f'''
+            SELECT value, SUM(count) AS total
+            FROM event_rollups
+            WHERE granularity = ? AND dimension = ? {condition}
+            GROUP BY value
+            ORDER BY total DESC
+        '''
+        if limit is not None:
+            query += f' LIMIT {int(limit)}'
         
-        # Total events
-        cursor.execute('SELECT COUNT(*) FROM security_events')
-        stats['total_events'] = cursor.fetchone()[0]
-        
-        # Events by severity
-        cursor.execute('SELECT severity, COUNT(*) FROM security_events GROUP BY severity')
-        stats['by_severity'] = dict(cursor.fetchall())
+        return self._connection().execute(query, (granularity, dimension) + params).fetchall()
+    
+    def get_statistics(self, hours: Optional[int] = None) -> dict:
+        """Get database statistics from the rollup tables.
         
-        # Top IPs
-        cursor.execute('''
-            SELECT source_ip, COUNT(*) as count 
-            FROM security_events 
-            WHERE source_ip != "" 
-            GROUP BY source_ip 
-            ORDER BY count DESC 
-            LIMIT 10
-        ''')
-        stats['top_ips'] = cursor.fetchall()
+        Covers every stored event by default, or roughly the last N hours
+        (to minute resolution) when hours is given.
+        """
+        by_severity = dict(self._rollup_totals('severity', hours))
         
-        conn.close()
-        return stats
+        return {
+            'total_events': sum(by_severity.values()),
+            'by_severity': by_severity,
+            'by_event_type': dict(self._rollup_totals('event_type', hours)),
+            'top_ips': self._rollup_totals('source_ip', hours, limit=10)
+        }
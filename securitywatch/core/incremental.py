@@ -0,0 +1,315 @@
+"""
+SecurityWatch Pro - Incremental Threat Analysis
+"""
+
+import bisect
+import threading
+from collections import Counter, deque
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, Iterable, List, Optional, Sequence
+
+from ..models.batch import EventBatch
+from ..models.events import SecurityEvent
+from .analyzer import AI_SAMPLE_SIZE, TOP_ENTRIES, ThreatAnalyzer
+from .bruteforce import BRUTE_FORCE_EVENT_TYPES
+from .timeline import timeline_summary
+
+
+# Width of the time buckets windows slide by; it must divide an hour so a
+# bucket never spans two hours of the timeline
+INCREMENTAL_BUCKET_SECONDS = 60
+
+# Sliding windows maintained by default, in hours
+DEFAULT_WINDOW_HOURS = (1, 24)
+
+# Events read from the database per query while catching up
+INGEST_PAGE_SIZE = 5000
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _apply(totals: Counter, counts: Dict, sign: int):
+    """Add or subtract counts, dropping keys that fall to zero"""
+    for key, count in counts.items():
+        value = totals[key] + sign * count
+        if value:
+            totals[key] = value
+        else:
+            del totals[key]
+
+
+class _Bucket:
+    """Counts of the events in one time bucket"""
+    
+    def __init__(self, timestamp: datetime):
+        self.total = 0
+        self.hour = timestamp.hour
+        self.day = timestamp.strftime('%Y-%m-%d')
+        self.severities = Counter()
+        self.source_ips = Counter()
+        self.usernames = Counter()
+        self.attackers = Counter()  # IPs whose brute force window starts in this bucket
+        self.attempt_ips = set()  # IPs with failed attempts in this bucket
+
+
+class _Attempts:
+    """Failed attempts of one source IP, in time order"""
+    
+    def __init__(self):
+        self.times: List[datetime] = []
+        self.events: List[SecurityEvent] = []
+    
+    def add(self, event: SecurityEvent) -> int:
+        """Insert an attempt, returning its position"""
+        position = bisect.bisect_right(self.times, event.timestamp)
+        self.times.insert(position, event.timestamp)
+        self.events.insert(position, event)
+        return position
+    
+    def prune(self, before: datetime):
+        """Drop attempts older than a time"""
+        count = bisect.bisect_left(self.times, before)
+        del self.times[:count]
+        del self.events[:count]
+
+
+class _SlidingWindow:
+    """Running totals over the buckets of the last few hours"""
+    
+    def __init__(self, hours: int, start: int):
+        self.hours = hours
+        self.start = start  # Oldest bucket counted
+        self.version = 0  # Bumped on every change, to invalidate the cached analysis
+        self.total = 0
+        self.severities = Counter()
+        self.source_ips = Counter()
+        self.usernames = Counter()
+        self.attackers = Counter()
+        self.hourly = Counter()
+        self.daily = Counter()
+    
+    def add_event(self, bucket: _Bucket, event: SecurityEvent):
+        """Count one event stored in a counted bucket"""
+        self.total += 1
+        self.severities[event.severity] += 1
+        if event.source_ip:
+            self.source_ips[event.source_ip] += 1
+        if event.username:
+            self.usernames[event.username] += 1
+        self.hourly[bucket.hour] += 1
+        self.daily[bucket.day] += 1
+        self.version += 1
+    
+    def remove_bucket(self, bucket: _Bucket):
+        """Subtract every count of a bucket sliding out of the window"""
+        self.total -= bucket.total
+        _apply(self.severities, bucket.severities, -1)
+        _apply(self.source_ips, bucket.source_ips, -1)
+        _apply(self.usernames, bucket.usernames, -1)
+        _apply(self.attackers, bucket.attackers, -1)
+        _apply(self.hourly, {bucket.hour: bucket.total}, -1)
+        _apply(self.daily, {bucket.day: bucket.total}, -1)
+        self.version += 1
+
+
+class IncrementalAnalyzer:
+    """Sliding-window threat analysis maintained as events are stored.
+    
+    New events are read from the database by id, so the analyzer follows
+    events stored by any process. Each is counted once into a time bucket
+    and into the running totals of every window covering it; buckets are
+    subtracted again as they slide out, so keeping the severity breakdown,
+    top IPs and usernames, timeline and threat score current costs O(1)
+    per event rather than a rescan of the window per query. Window edges
+    are exact to one bucket. Failed logins are kept per IP, and an IP is
+    marked in the bucket where one of its threshold-sized bursts begins;
+    the brute force detector then only runs over the attempts of marked
+    IPs. Analyses are cached until their window changes.
+    """
+    
+    def __init__(self, analyzer: ThreatAnalyzer, window_hours: Sequence[int] = DEFAULT_WINDOW_HOURS,
+                 bucket_seconds: int = INCREMENTAL_BUCKET_SECONDS, top_entries: int = TOP_ENTRIES):
+        if 3600 % bucket_seconds:
+            raise ValueError(f"Bucket width must divide an hour, got {bucket_seconds}s")
+        self.analyzer = analyzer
+        self.database = analyzer.database
+        self.bucket_seconds = bucket_seconds
+        self.top_entries = top_entries
+        self.last_event_id: Optional[int] = None
+        
+        now = self._bucket_of(datetime.now())
+        self._windows = {hours: _SlidingWindow(hours, now - hours * 3600 // bucket_seconds)
+                         for hours in sorted(set(window_hours))}
+        self._buckets: Dict[int, _Bucket] = {}
+        self._attempts: Dict[str, _Attempts] = {}
+        self._recent: Deque[SecurityEvent] = deque(maxlen=AI_SAMPLE_SIZE)
+        self._cache: Dict[int, tuple] = {}
+        self._lock = threading.Lock()
+    
+    @property
+    def window_hours(self) -> List[int]:
+        return list(self._windows)
+    
+    def _bucket_of(self, timestamp: datetime) -> int:
+        return int((timestamp - _EPOCH).total_seconds() // self.bucket_seconds)
+    
+    def _bucket_start(self, index: int) -> datetime:
+        return _EPOCH + timedelta(seconds=index * self.bucket_seconds)
+    
+    @property
+    def _oldest(self) -> int:
+        """Oldest bucket any window still counts"""
+        return min(window.start for window in self._windows.values())
+    
+    def refresh(self) -> int:
+        """Read and count events stored since the last refresh, returning how many"""
+        with self._lock:
+            return self._refresh()
+    
+    def _refresh(self) -> int:
+        hours = None
+        ceiling = 0
+        if self.last_event_id is None:
+            # The first read only needs the longest window; ids stored meanwhile are read too
+            hours = max(self._windows)
+            ceiling = self.database.last_event_id()
+            self.last_event_id = 0
+        
+        count = 0
+        while True:
+            events, self.last_event_id = self.database.get_events_after(
+                self.last_event_id, hours=hours, limit=INGEST_PAGE_SIZE)
+            self._ingest(events)
+            count += len(events)
+            if len(events) < INGEST_PAGE_SIZE:
+                break
+        self.last_event_id = max(self.last_event_id, ceiling)
+        return count
+    
+    def _ingest(self, events: Iterable[SecurityEvent]):
+        oldest = self._oldest
+        windows = self._windows.values()
+        for event in events:
+            index = self._bucket_of(event.timestamp)
+            if index < oldest:
+                continue  # Too old for any window
+            
+            bucket = self._buckets.get(index)
+            if bucket is None:
+                bucket = self._buckets[index] = _Bucket(event.timestamp)
+            bucket.total += 1
+            bucket.severities[event.severity] += 1
+            if event.source_ip:
+                bucket.source_ips[event.source_ip] += 1
+            if event.username:
+                bucket.usernames[event.username] += 1
+            for window in windows:
+                if index >= window.start:
+                    window.add_event(bucket, event)
+            
+            if event.source_ip and event.event_type in BRUTE_FORCE_EVENT_TYPES:
+                bucket.attempt_ips.add(event.source_ip)
+                self._add_attempt(event)
+            if not self._recent or event.timestamp >= self._recent[-1].timestamp:
+                self._recent.append(event)
+    
+    def _add_attempt(self, event: SecurityEvent):
+        """Keep a failed attempt and mark the brute force bursts it completes"""
+        attempts = self._attempts.get(event.source_ip)
+        if attempts is None:
+            attempts = self._attempts[event.source_ip] = _Attempts()
+        position = attempts.add(event)
+        
+        # Attempts normally arrive in order and only the burst ending at the
+        # new one is checked; a late attempt may complete those after it too
+        detector = self.analyzer.brute_force_detector
+        threshold, window_seconds = max(1, detector.threshold), detector.window_seconds
+        times = attempts.times
+        for end in range(position, min(position + threshold, len(times))):
+            begin = end - threshold + 1
+            if begin >= 0 and (times[end] - times[begin]).total_seconds() <= window_seconds:
+                self._mark_attacker(event.source_ip, self._bucket_of(times[begin]))
+    
+    def _mark_attacker(self, ip: str, index: int):
+        self._buckets[index].attackers[ip] += 1
+        for window in self._windows.values():
+            if index >= window.start:
+                window.attackers[ip] += 1
+                window.version += 1
+    
+    def _existing_buckets(self, low: int, high: int) -> List[int]:
+        """Indexes of the stored buckets in [low, high), oldest first"""
+        if high - low <= len(self._buckets):
+            return [index for index in range(low, high) if index in self._buckets]
+        return sorted(index for index in self._buckets if low <= index < high)
+    
+    def _advance(self, now: datetime):
+        """Slide every window up to now, dropping buckets none of them counts"""
+        oldest = self._oldest
+        current = self._bucket_of(now)
+        for window in self._windows.values():
+            start = current - window.hours * 3600 // self.bucket_seconds
+            if start <= window.start:
+                continue
+            for index in self._existing_buckets(window.start, start):
+                window.remove_bucket(self._buckets[index])
+            window.start = start
+        
+        for index in self._existing_buckets(oldest, self._oldest):
+            bucket = self._buckets.pop(index)
+            for ip in bucket.attempt_ips:
+                attempts = self._attempts.get(ip)
+                if attempts is None:
+                    continue
+                attempts.prune(self._bucket_start(self._oldest))
+                if not attempts.times:
+                    del self._attempts[ip]
+    
+    def analyze(self, hours: int = 24, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Analysis of the last hours, shaped like ThreatAnalyzer.analyze_events"""
+        with self._lock:
+            window = self._windows.get(hours)
+            if window is None:
+                raise ValueError(f"No incremental window of {hours}h; maintained: {self.window_hours}")
+            
+            self._refresh()
+            self._advance(now or datetime.now())
+            
+            cached = self._cache.get(hours)
+            if cached is None or cached[0] != window.version:
+                cached = self._cache[hours] = (window.version, self._analysis(window))
+            return dict(cached[1])
+    
+    def _analysis(self, window: _SlidingWindow) -> Dict[str, Any]:
+        """Build the analysis of a window from its running totals"""
+        analysis = {
+            'total_events': window.total,
+            'severity_breakdown': Counter(window.severities),
+            'top_source_ips': Counter(dict(window.source_ips.most_common(self.top_entries))),
+            'top_usernames': Counter(dict(window.usernames.most_common(self.top_entries))),
+            'distinct_source_ips': len(window.source_ips),
+            'distinct_usernames': len(window.usernames),
+            'attack_patterns': [],
+            'brute_force_attempts': self._brute_force_attempts(window),
+            'geographic_analysis': {},
+            'recommendations': [],
+            'ai_analysis': {},
+            'timeline_analysis': timeline_summary(window.hourly, window.daily),
+            'threat_score': 0
+        }
+        
+        start = self._bucket_start(window.start)
+        ai_events = [event for event in reversed(self._recent) if event.timestamp >= start]
+        return self.analyzer.finish_analysis(analysis, ai_events)
+    
+    def _brute_force_attempts(self, window: _SlidingWindow) -> List[Dict]:
+        """Run the brute force detector over the window's attempts from marked IPs"""
+        if not window.attackers:
+            return []
+        
+        start = self._bucket_start(window.start)
+        attempts = []
+        for ip in window.attackers:
+            ip_attempts = self._attempts[ip]
+            attempts.extend(ip_attempts.events[bisect.bisect_left(ip_attempts.times, start):])
+        return self.analyzer.brute_force_detector.detect(EventBatch.from_events(attempts))
@@ -5,16 +5,23 @@ SecurityWatch Pro - Main Monitoring Engine
 import logging
 import time
 import threading
+from itertools import islice
 from pathlib import Path
-from typing import List, Dict
+from typing import Iterable, List, Dict
 from datetime import datetime
 
 from ..models.events import SecurityEvent
 from ..config.settings import SecurityWatchConfig
-from .database import SecurityDatabase
+from .database import SecurityDatabase, REPUTATION_SCORES
 from .patterns import LogPatternMatcher
+from .aggregation import EventAggregator
 from .analyzer import ThreatAnalyzer
+from .bruteforce import StreamingBruteForceDetector, attack_event
 from .alerts import AlertManager
+from .tailer import create_log_watcher
+from .checkpoints import LogTracker, rotation_set
+from .workers import LogWorkerPool, MATCH_BATCH_SIZE
+from .sources import InputSourceGroup, SOURCE_FLUSH_INTERVAL
 
 
 class SecurityWatchMonitor:
@@ -26,10 +33,15 @@ class SecurityWatchMonitor:
         self.pattern_matcher = LogPatternMatcher()
         self.threat_analyzer = ThreatAnalyzer(self.database)
         self.alert_manager = AlertManager(self.config)
+        self.brute_force_stream = StreamingBruteForceDetector(self.pattern_matcher.patterns)
+        self.aggregator = EventAggregator()
         self.logger = self._setup_logging()
         self.running = False
-        self.log_positions = {}  # Track file positions
+        self.log_trackers: Dict[str, LogTracker] = {}  # Track file positions across rotations
         self.monitor_thread = None
+        self.watcher = None
+        self.workers = None
+        self.input_sources = InputSourceGroup()
         
     def _setup_logging(self) -> logging.Logger:
         """Setup enterprise-grade logging"""
@@ -59,63 +71,137 @@ class SecurityWatchMonitor:
         
         return logger
     
+    def _tracker(self, log_path: str) -> LogTracker:
+        """Get the tracker for a log file, resuming from saved checkpoints"""
+        tracker = self.log_trackers.get(log_path)
+        if tracker is None:
+            tracker = LogTracker(log_path, self.database.get_log_checkpoints(log_path))
+            self.log_trackers[log_path] = tracker
+        return tracker
+    
+    def _worker_pool(self) -> LogWorkerPool:
+        """Get the pool that reads and matches log files, starting it on first use"""
+        if self.workers is None:
+            self.workers = LogWorkerPool(self.config.monitoring.worker_threads,
+                                         self.config.monitoring.match_processes)
+        return self.workers
+    
     def monitor_log_file(self, log_path: str) -> List[SecurityEvent]:
         """Monitor a single log file for new entries"""
         events = []
         
         try:
-            if not Path(log_path).exists():
-                return events
+            # Stream raw lines in bounded chunks
+            new_lines = self._tracker(log_path).iter_lines(self.config.monitoring.max_bytes_per_cycle)
+            lines = (line.strip() for line in new_lines)
+            lines = (line for line in lines if line)
             
-            # Get current file position
-            current_pos = self.log_positions.get(log_path, 0)
-            
-            with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
-                # Check if file was rotated (size decreased)
-                f.seek(0, 2)  # Go to end
-                file_size = f.tell()
-                
-                if file_size < current_pos:
-                    # File was rotated, start from beginning
-                    current_pos = 0
-                    self.logger.info(f"Log rotation detected for {log_path}")
-                
-                f.seek(current_pos)
-                new_lines = f.readlines()
-                self.log_positions[log_path] = f.tell()
-            
-            # Process new lines
-            for line in new_lines:
-                line = line.strip()
-                if line:
-                    matched_events = self.pattern_matcher.match_patterns(line, log_path)
-                    events.extend(matched_events)
+            # Match in batches, in this thread or in the match processes
+            batches = iter(lambda: list(islice(lines, MATCH_BATCH_SIZE)), [])
+            events = self._worker_pool().match_batches(self.pattern_matcher, batches, log_path)
             
         except Exception as e:
+            # Read the lines again next time rather than checkpoint past them
             self.logger.error(f"Error monitoring {log_path}: {e}")
+            self._tracker(log_path).rollback()
         
         return events
     
     def check_all_logs(self) -> List[SecurityEvent]:
         """Check all configured log files"""
-        all_events = []
+        return self.check_log_files(self.config.monitoring.log_paths)
+    
+    def check_log_files(self, log_paths: Iterable[str]) -> List[SecurityEvent]:
+        """Check the given log files for new entries"""
+        log_paths = list(log_paths)
         
-        for log_path in self.config.monitoring.log_paths:
-            events = self.monitor_log_file(log_path)
-            all_events.extend(events)
+        # Files are read concurrently, then merged into one ingest in timestamp order
+        per_file = self._worker_pool().map(self.monitor_log_file, log_paths)
+        trackers = [self.log_trackers[path] for path in log_paths if path in self.log_trackers]
+        return self._ingest(per_file, trackers)
+    
+    def check_input_sources(self, timeout: float = 0.0) -> List[SecurityEvent]:
+        """Match the lines the streaming input sources delivered since the last check"""
+        drained = self.input_sources.drain(timeout)
+        if not drained:
+            return []
+        
+        pool = self._worker_pool()
+        per_source = [pool.match_batches(self.pattern_matcher, batches, name)
+                      for name, batches in drained.items()]
+        return self._ingest(per_source, [])
+    
+    def _ingest(self, per_file: List[List[SecurityEvent]], trackers: List[LogTracker],
+                alert: bool = True, aggregator: EventAggregator = None,
+                brute_force: StreamingBruteForceDetector = None) -> List[SecurityEvent]:
+        """Store, score and alert on events read from several files in one pass.
+        
+        Matches of aggregated patterns are folded into one event per threshold
+        crossing by the aggregator, and brute force bursts are found by the
+        streaming detector; both are the monitor's own unless a scan brings
+        its own for its historical time range.
+        """
+        all_events = sorted((event for events in per_file for event in events),
+                            key=lambda event: event.timestamp)
+        
+        # Thresholded patterns are stored once per crossing instead of once per line
+        all_events = (aggregator or self.aggregator).aggregate(all_events, self.pattern_matcher.patterns)
+        
+        # The events to store run through the streaming brute force detector, so it
+        # counts the same rows as detection on the database; each new burst becomes
+        # an event of its own, stored and alerted on with the rest
+        if alert:
+            attacks = (brute_force or self.brute_force_stream).observe_events(all_events)
+            for attack, trigger in attacks:
+                self.logger.warning(f"Brute force attack from {attack['source_ip']}: "
+                                    f"{attack['attempt_count']} failed logins in "
+                                    f"{attack['time_span_seconds']:.0f}s")
+            all_events.extend(attack_event(attack, trigger) for attack, trigger in attacks)
         
-        # Store events in database and update IP reputation
-        for event in all_events:
-            self.database.add_event(event)
-            if event.source_ip:
-                self.database.update_ip_reputation(event.source_ip, event.severity)
+        # Store events together with the read positions that produced them
+        checkpoints, retired = [], []
+        for tracker in trackers:
+            saved, removed = tracker.pending()
+            checkpoints.extend(saved)
+            retired.extend(removed)
+        self.database.add_events(all_events, checkpoints, retired)
+        for tracker in trackers:
+            tracker.mark_saved()
+        
+        # Update IP reputation
+        self.database.apply_ip_reputation_deltas(self._aggregate_reputation(all_events))
         
         # Send alerts if needed
-        if all_events:
+        if all_events and alert:
             self.alert_manager.process_events(all_events)
         
         return all_events
     
+    @staticmethod
+    def _aggregate_reputation(events: List[SecurityEvent]) -> Dict[str, Dict]:
+        """Fold a poll's events into one reputation delta per source IP"""
+        deltas = {}
+        for event in events:
+            if not event.source_ip:
+                continue
+            
+            seen = event.timestamp.isoformat()
+            delta = deltas.get(event.source_ip)
+            if delta is None:
+                deltas[event.source_ip] = {
+                    'score': REPUTATION_SCORES.get(event.severity, 1),
+                    'count': 1,
+                    'first_seen': seen,
+                    'last_seen': seen
+                }
+            else:
+                delta['score'] += REPUTATION_SCORES.get(event.severity, 1)
+                delta['count'] += 1
+                delta['first_seen'] = min(delta['first_seen'], seen)
+                delta['last_seen'] = max(delta['last_seen'], seen)
+        
+        return deltas
+    
     def start_monitoring(self):
         """Start continuous monitoring"""
         if self.running:
@@ -125,21 +211,37 @@ class SecurityWatchMonitor:
         self.running = True
         self.logger.info("Starting SecurityWatch Pro monitoring...")
         
-        # Initialize log positions for existing files
+        # Resume from saved checkpoints; files never seen before start at the end
         for log_path in self.config.monitoring.log_paths:
-            if Path(log_path).exists():
-                try:
-                    with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        f.seek(0, 2)  # Go to end
-                        self.log_positions[log_path] = f.tell()
-                except Exception as e:
-                    self.logger.error(f"Error initializing position for {log_path}: {e}")
+            try:
+                self._tracker(log_path).start_at_end()
+            except Exception as e:
+                self.logger.error(f"Error initializing position for {log_path}: {e}")
+        
+        # Journal and syslog socket input feeds the same pipeline as the files
+        self.input_sources = InputSourceGroup(self.config.monitoring.input_sources,
+                                              self.config.monitoring.source_queue_batches)
+        
+        # Read whatever was written while monitoring was stopped
+        try:
+            self.check_all_logs()
+        except Exception as e:
+            self.logger.error(f"Error catching up on logs: {e}")
+        
+        # Wake on file changes instead of rescanning every interval
+        self.watcher = create_log_watcher(
+            self.config.monitoring.log_paths,
+            mode=self.config.monitoring.watch_mode,
+            poll_interval=self.config.monitoring.poll_interval,
+            logger=self.logger
+        )
         
         # Start monitoring thread
         self.monitor_thread = threading.Thread(target=self._monitoring_loop, daemon=True)
         self.monitor_thread.start()
         
-        self.logger.info(f"Monitoring started. Watching {len(self.config.monitoring.log_paths)} log files")
+        self.logger.info(f"Monitoring started. Watching {len(self.config.monitoring.log_paths)} log files "
+                         f"and {len(self.input_sources)} input sources")
     
     def stop_monitoring(self):
         """Stop continuous monitoring"""
@@ -152,27 +254,66 @@ class SecurityWatchMonitor:
         if self.monitor_thread and self.monitor_thread.is_alive():
             self.monitor_thread.join(timeout=5)
         
+        if self.watcher:
+            self.watcher.close()
+            self.watcher = None
+        
+        # Stop the sources, then store what they had already handed over
+        self.input_sources.close()
+        try:
+            self.check_input_sources()
+        except Exception as e:
+            self.logger.error(f"Error storing input source backlog: {e}")
+        
+        if self.workers:
+            self.workers.close()
+            self.workers = None
+        
         self.logger.info("Monitoring stopped")
     
     def _monitoring_loop(self):
-        """Main monitoring loop"""
+        """Main monitoring loop.
+        
+        Files are read as soon as the watcher reports them changed. A full
+        scan still runs every check_interval as a safety net for changes the
+        watcher cannot see, such as writes on network filesystems. Lines from
+        the input sources are matched as they arrive, and while they are
+        configured the watcher is polled often enough to keep up with them.
+        """
+        next_full_scan = time.monotonic() + self.config.monitoring.check_interval
+        next_cleanup = time.monotonic()
+        backlog = set()
+        
         while self.running:
             try:
-                # Check all logs
-                events = self.check_all_logs()
+                # Wait for changes, waking at least once a second to notice stop requests;
+                # files left with a backlog by the per-cycle byte cap are read again at once
+                wake = SOURCE_FLUSH_INTERVAL if self.input_sources else 1.0
+                timeout = 0 if backlog or self.input_sources.pending() else \
+                    min(wake, max(next_full_scan - time.monotonic(), 0))
+                changed = self.watcher.wait(timeout) | backlog
+                
+                if time.monotonic() >= next_full_scan:
+                    events = self.check_all_logs()
+                    next_full_scan = time.monotonic() + self.config.monitoring.check_interval
+                elif changed:
+                    events = self.check_log_files(changed)
+                else:
+                    events = []
+                events += self.check_input_sources()
                 
                 if events:
                     self.logger.info(f"Detected {len(events)} security events")
                 
+                backlog = {path for path, tracker in self.log_trackers.items() if tracker.backlog}
+                
                 # Cleanup old events periodically
-                if datetime.now().minute == 0:  # Once per hour
+                if time.monotonic() >= next_cleanup:  # Once per hour
+                    next_cleanup = time.monotonic() + 3600
                     deleted = self.database.cleanup_old_events(self.config.monitoring.database_retention_days)
                     if deleted > 0:
                         self.logger.info(f"Cleaned up {deleted} old events")
                 
-                # Sleep for configured interval
-                time.sleep(self.config.monitoring.check_interval)
-                
             except Exception as e:
                 self.logger.error(f"Error in monitoring loop: {e}")
                 time.sleep(10)  # Wait before retrying
@@ -184,37 +325,79 @@ class SecurityWatchMonitor:
         return {
             'running': self.running,
             'log_files_monitored': len(self.config.monitoring.log_paths),
+            'input_sources': [source.name for source in self.input_sources.sources],
             'total_events': stats.get('total_events', 0),
             'events_by_severity': stats.get('by_severity', {}),
             'top_attacking_ips': stats.get('top_ips', [])[:5],
             'config_summary': self.config.get_config_summary()
         }
     
-    def run_manual_scan(self) -> Dict:
-        """Run a manual scan of all log files"""
+    def run_manual_scan(self, mapped: bool = False) -> Dict:
+        """Run a manual scan of all log files.
+        
+        With mapped, plain log files are memory-mapped and only the lines
+        that may match a pattern are decoded, which suits forensic scans of
+        huge static logs. The throughput of the scan is reported either way.
+        """
         self.logger.info("Starting manual security scan...")
+        log_paths = self.config.monitoring.log_paths
         
-        # Reset positions to scan entire files
-        old_positions = self.log_positions.copy()
-        self.log_positions = {}
+        # Scan entire files without touching the monitoring checkpoints; with match
+        # processes configured each file is sharded across them
+        started = time.perf_counter()
+        per_file = self._worker_pool().scan_files(self.pattern_matcher, log_paths, mapped=mapped)
+        elapsed = time.perf_counter() - started
+        bytes_scanned = sum(path.stat().st_size for path in map(Path, log_paths) if path.is_file())
+        throughput = bytes_scanned / 2**20 / elapsed if elapsed > 0 else 0.0
+        events = self._ingest(per_file, [], aggregator=EventAggregator(),
+                              brute_force=StreamingBruteForceDetector(self.pattern_matcher.patterns))
         
-        try:
-            events = self.check_all_logs()
-            
-            # Analyze events
-            analysis = self.threat_analyzer.analyze_events(events)
-            
-            self.logger.info(f"Manual scan completed. Found {len(events)} events")
-            
-            return {
-                'events_found': len(events),
-                'analysis': analysis,
-                'scan_time': datetime.now().isoformat()
-            }
-            
-        finally:
-            # Restore positions
-            self.log_positions = old_positions
+        # Analyze events
+        analysis = self.threat_analyzer.analyze_events(events)
+        
+        self.logger.info(f"Manual scan completed. Found {len(events)} events "
+                         f"({bytes_scanned / 2**20:.1f} MB in {elapsed:.2f}s, {throughput:.1f} MB/s)")
+        
+        return {
+            'events_found': len(events),
+            'analysis': analysis,
+            'bytes_scanned': bytes_scanned,
+            'scan_seconds': elapsed,
+            'throughput_mb_s': throughput,
+            'scan_time': datetime.now().isoformat()
+        }
+    
+    def backfill(self, patterns: List[str]) -> Dict:
+        """Ingest historical logs, including compressed rotations, matched by glob patterns.
+        
+        Files are streamed (and decompressed) in parallel without temporary
+        files and without touching the monitoring checkpoints. Events are
+        stored a group of files at a time, and no alerts are sent for them.
+        """
+        paths = rotation_set(patterns)
+        self.logger.info(f"Backfilling {len(paths)} log files...")
+        
+        pool = self._worker_pool()
+        aggregator = EventAggregator()
+        group_size = max(self.config.monitoring.worker_threads, self.config.monitoring.match_processes, 1)
+        files = {}
+        events_stored = 0
+        for start in range(0, len(paths), group_size):
+            group = paths[start:start + group_size]
+            per_file = pool.scan_files(self.pattern_matcher, group)
+            events_stored += len(self._ingest(per_file, [], alert=False, aggregator=aggregator))
+            files.update((path, len(events)) for path, events in zip(group, per_file))
+        
+        events_found = sum(files.values())
+        self.logger.info(f"Backfill completed. Found {events_found} events in {len(paths)} files, "
+                         f"stored {events_stored}")
+        
+        return {
+            'files': files,
+            'events_found': events_found,
+            'events_stored': events_stored,
+            'scan_time': datetime.now().isoformat()
+        }
     
     def add_log_file(self, log_path: str) -> bool:
         """Add a new log file to monitor"""
@@ -226,21 +409,27 @@ class SecurityWatchMonitor:
         
         # Initialize position for new file
         try:
-            with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
-                f.seek(0, 2)  # Go to end
-                self.log_positions[log_path] = f.tell()
+            tracker = self._tracker(log_path)
+            tracker.start_at_end()
+            saved, retired = tracker.pending()
+            self.database.save_log_checkpoints(saved, retired)
+            tracker.mark_saved()
         except Exception as e:
             self.logger.error(f"Error initializing position for {log_path}: {e}")
             return False
         
+        if self.watcher:
+            self.watcher.watch(log_path)
+        
         self.logger.info(f"Added log file to monitoring: {log_path}")
         return True
     
     def remove_log_file(self, log_path: str):
         """Remove a log file from monitoring"""
         self.config.remove_log_path(log_path)
-        if log_path in self.log_positions:
-            del self.log_positions[log_path]
+        self.log_trackers.pop(log_path, None)
+        if self.watcher:
+            self.watcher.unwatch(log_path)
         self.logger.info(f"Removed log file from monitoring: {log_path}")
     
     def get_recent_events(self, hours: int = 24) -> List[SecurityEvent]:
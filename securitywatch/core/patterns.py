@@ -4,10 +4,263 @@ SecurityWatch Pro - Log Pattern Matching
 
 import re
 import socket
+import threading
 from datetime import datetime
-from typing import List
+from typing import Dict, FrozenSet, List, Optional, Tuple, Union
 
 from ..models.events import SecurityEvent, ThreatPattern
+from .bruteforce import BRUTE_FORCE_THRESHOLD, BRUTE_FORCE_WINDOW
+from .readers import mapped_lines
+from .timestamps import TimestampParser
+
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+
+# A match as (details, pattern index, ip, username): small and cheap to send between processes
+CompactMatch = Tuple[str, int, str, str]
+
+# Characters found on nearly every log line; a literal made only of these
+# (an IP's dots, a timestamp's colons) rejects almost nothing
+COMMON_LOG_CHARACTERS = frozenset(' \t.:-/0123456789')
+
+
+def _selectivity(literal_set: FrozenSet[str]) -> Tuple[int, int, int]:
+    """Sort key ranking literal sets from least to most selective"""
+    return (min(sum(ch not in COMMON_LOG_CHARACTERS for ch in lit) for lit in literal_set),
+            min(len(lit) for lit in literal_set), -len(literal_set))
+
+
+def _required_literal_sets(regex_pattern: str) -> List[FrozenSet[str]]:
+    """Extract the literals a pattern needs in order to match.
+    
+    Each returned set lists alternatives of which at least one must occur
+    in every match: a plain run such as "Failed password for " gives a
+    one-element set, an alternation such as (?:FAILED|denied) gives one
+    element per branch.
+    """
+    
+    def best(sets: List[FrozenSet[str]]) -> Optional[FrozenSet[str]]:
+        sets = [s for s in sets if s]
+        if not sets:
+            return None
+        return max(sets, key=_selectivity)
+    
+    def walk(subpattern) -> List[FrozenSet[str]]:
+        sets = []
+        current = []
+        
+        def flush():
+            if current:
+                sets.append(frozenset([''.join(current)]))
+                current.clear()
+        
+        for op, av in subpattern:
+            if op is sre_constants.LITERAL:
+                current.append(chr(av))
+            elif op is sre_constants.SUBPATTERN:
+                # Keep contiguous literals flowing through plain groups
+                inner = av[-1]
+                if all(item_op is sre_constants.LITERAL for item_op, _ in inner):
+                    current.extend(chr(item_av) for _, item_av in inner)
+                else:
+                    flush()
+                    sets.extend(walk(inner))
+            elif op is sre_constants.BRANCH:
+                flush()
+                choices = [best(walk(alternative)) for alternative in av[1]]
+                if all(choices):
+                    sets.append(frozenset().union(*choices))
+            elif op is sre_constants.IN:
+                flush()
+                if all(item_op is sre_constants.LITERAL for item_op, _ in av):
+                    sets.append(frozenset(chr(item_av) for _, item_av in av))
+            elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) and av[0] >= 1:
+                flush()
+                sets.extend(walk(av[2]))
+            else:
+                flush()
+        
+        flush()
+        return sets
+    
+    return walk(sre_parse.parse(regex_pattern, re.IGNORECASE))
+
+
+def _select_anchors(regex_pattern: str) -> Optional[FrozenSet[str]]:
+    """Pick the most selective required literal set of a pattern, lowercased"""
+    try:
+        literal_sets = _required_literal_sets(regex_pattern)
+    except (re.error, RecursionError):
+        return None
+    
+    candidates = [
+        frozenset(lit.lower() for lit in literal_set)
+        for literal_set in literal_sets
+        if all(lit.isascii() for lit in literal_set)
+    ]
+    if not candidates:
+        return None
+    return max(candidates, key=_selectivity)
+
+
+class LiteralPrefilter:
+    """Multi-literal index in front of the threat patterns.
+    
+    Every distinct anchor literal is checked once per line, and each hit
+    enables the patterns that need it. A line containing none of the
+    literals is rejected for all anchored patterns at once.
+    """
+    
+    def __init__(self, anchor_sets: List[Optional[FrozenSet[str]]]):
+        self.unanchored = [i for i, anchors in enumerate(anchor_sets) if anchors is None]
+        self.everything = list(range(len(anchor_sets)))
+        
+        index = {}
+        for i, anchors in enumerate(anchor_sets):
+            for literal in sorted(anchors or ()):
+                index.setdefault(literal, []).append(i)
+        # Longer literals are rarer, so test them first
+        self.literals = sorted(index.items(), key=lambda item: -len(item[0]))
+        # For finding candidate lines in raw bytes, as a memory-mapped scan does;
+        # a literal containing another one finds no extra lines
+        self.byte_literals = [
+            literal.encode() for literal in index
+            if not any(other != literal and other in literal for other in index)
+        ]
+    
+    def candidates(self, log_line: str) -> List[int]:
+        """Indices of the patterns that may match the line, in pattern order"""
+        # Case-insensitive matching can fold some non-ASCII characters onto
+        # ASCII letters, so only ASCII lines can be prefiltered safely
+        if not log_line.isascii():
+            return self.everything
+        
+        lowered = log_line.lower()
+        found = None
+        for literal, indices in self.literals:
+            if literal in lowered:
+                if found is None:
+                    found = set(self.unanchored)
+                found.update(indices)
+        
+        if found is None:
+            return self.unanchored
+        return sorted(found)
+
+
+class CompiledPatternSet:
+    """Precompiled view of the enabled threat patterns.
+    
+    Every enabled pattern is compiled once and only evaluated on lines that
+    pass the literal prefilter. Per-pattern counters record how many lines
+    were evaluated, prefiltered away and matched; they are updated once per
+    batch under a lock so several reader threads can share one set.
+    """
+    
+    def __init__(self, patterns: List[ThreatPattern]):
+        self.patterns = [p for p in patterns if p.enabled]
+        self.compiled = [re.compile(p.regex_pattern, re.IGNORECASE) for p in self.patterns]
+        self.event_types = [p.name.lower().replace(' ', '_') for p in self.patterns]
+        self.anchors = [_select_anchors(p.regex_pattern) for p in self.patterns]
+        self.prefilter = LiteralPrefilter(self.anchors)
+        
+        self.lines_seen = 0
+        self.lines_rejected = 0
+        self.evaluated = [0] * len(self.patterns)
+        self.matched = [0] * len(self.patterns)
+        self._lock = threading.Lock()
+    
+    def search(self, log_line: str) -> List[Tuple[int, Dict[str, str]]]:
+        """Return (pattern index, named groups) for every enabled pattern matching the line"""
+        return [(index, groups) for _, index, groups in self.search_lines([log_line])]
+    
+    def search_lines(self, lines: List[str]) -> List[Tuple[int, int, Dict[str, str]]]:
+        """Return (line position, pattern index, named groups) for every match in a batch"""
+        matches = []
+        compiled = self.compiled
+        candidates_for = self.prefilter.candidates
+        evaluated = [0] * len(compiled)
+        matched = [0] * len(compiled)
+        rejected = 0
+        
+        for position, log_line in enumerate(lines):
+            candidates = candidates_for(log_line)
+            if not candidates:
+                rejected += 1
+                continue
+            
+            for index in candidates:
+                evaluated[index] += 1
+                match = compiled[index].search(log_line)
+                if match:
+                    matched[index] += 1
+                    matches.append((position, index, match.groupdict()))
+        
+        with self._lock:
+            self.lines_seen += len(lines)
+            self.lines_rejected += rejected
+            for index in range(len(compiled)):
+                self.evaluated[index] += evaluated[index]
+                self.matched[index] += matched[index]
+        
+        return matches
+    
+    def compact_matches(self, lines: List[str]) -> List[CompactMatch]:
+        """Return (details, pattern index, ip, username) for every match in a batch"""
+        return [
+            (lines[position].strip(), index, groups.get('ip') or '', groups.get('username') or '')
+            for position, index, groups in self.search_lines(lines)
+        ]
+    
+    def decode_candidates(self, lines: List[Union[str, bytes]]) -> List[str]:
+        """Decode the lines of a batch that may match, dropping the rest.
+        
+        A batch of raw lines is joined and searched for the anchor literals
+        as a memory-mapped scan is, so only the lines around hits are
+        decoded; the others are counted as skipped. Text batches, and sets
+        with unanchored patterns, keep every line.
+        """
+        if self.prefilter.unanchored or not all(isinstance(line, bytes) for line in lines):
+            return [line.decode('utf-8', errors='ignore') if isinstance(line, bytes) else line
+                    for line in lines]
+        
+        joined = b'\n'.join(lines)
+        decoded = [line.decode('utf-8', errors='ignore')
+                   for line in mapped_lines(joined, self.prefilter.byte_literals, 0, len(joined))]
+        self.record_skipped(len(lines) - len(decoded))
+        return decoded
+    
+    def record_skipped(self, line_count: int):
+        """Count lines rejected without being split out, as by a memory-mapped scan"""
+        with self._lock:
+            self.lines_seen += line_count
+            self.lines_rejected += line_count
+    
+    def reset_stats(self):
+        """Zero the counters"""
+        with self._lock:
+            self.lines_seen = 0
+            self.lines_rejected = 0
+            self.evaluated = [0] * len(self.patterns)
+            self.matched = [0] * len(self.patterns)
+    
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-pattern prefilter counters for this compiled set"""
+        with self._lock:
+            return {
+                pattern.name: {
+                    'evaluated': self.evaluated[i],
+                    'prefiltered': self.lines_seen - self.evaluated[i],
+                    'matched': self.matched[i]
+                }
+                for i, pattern in enumerate(self.patterns)
+            }
 
 
 class LogPatternMatcher:
@@ -15,16 +268,27 @@ class LogPatternMatcher:
     
     def __init__(self):
         self.patterns = self._initialize_patterns()
+        self.hostname = socket.gethostname()
+        self.timestamps = TimestampParser()
+        self._compiled = None
+        self._retired_stats = {}
+        self._stats_lock = threading.Lock()
     
     def _initialize_patterns(self) -> List[ThreatPattern]:
-        """Initialize default threat patterns"""
+        """Initialize default threat patterns.
+        
+        Failed login patterns carry the brute force rule of BruteForceDetector,
+        so live alerts and the dashboard flag the same bursts.
+        """
         return [
             # SSH Failed Login Patterns
             ThreatPattern(
                 name="SSH Failed Login",
                 description="Failed SSH authentication attempts",
                 regex_pattern=r"Failed password for (?P<username>\S+) from (?P<ip>\d+\.\d+\.\d+\.\d+)",
-                severity="medium"
+                severity="medium",
+                threshold_count=BRUTE_FORCE_THRESHOLD,
+                time_window=BRUTE_FORCE_WINDOW
             ),
             ThreatPattern(
                 name="SSH Invalid User",
@@ -38,7 +302,9 @@ class LogPatternMatcher:
                 name="Windows Failed Login",
                 description="Windows logon failures",
                 regex_pattern=r"Logon Type:\s+(?P<logon_type>\d+).*Source Network Address:\s+(?P<ip>\d+\.\d+\.\d+\.\d+).*Account Name:\s+(?P<username>\S+)",
-                severity="medium"
+                severity="medium",
+                threshold_count=BRUTE_FORCE_THRESHOLD,
+                time_window=BRUTE_FORCE_WINDOW
             ),
             
             # Brute Force Patterns
@@ -48,7 +314,8 @@ class LogPatternMatcher:
                 regex_pattern=r"authentication failure.*user=(?P<username>\S+)",
                 severity="high",
                 threshold_count=10,
-                time_window=300
+                time_window=300,
+                aggregate=True
             ),
             
             # Web Application Attacks
@@ -73,7 +340,8 @@ class LogPatternMatcher:
                 description="Potential port scanning activity",
                 regex_pattern=r"(?P<ip>\d+\.\d+\.\d+\.\d+).*(?:connection refused|timeout|unreachable)",
                 severity="medium",
-                threshold_count=20
+                threshold_count=20,
+                aggregate=True
             ),
             
             # Additional Security Patterns
@@ -102,7 +370,9 @@ class LogPatternMatcher:
                 name="Failed Root Login",
                 description="Failed root login attempts",
                 regex_pattern=r"Failed password for root from (?P<ip>\d+\.\d+\.\d+\.\d+)",
-                severity="critical"
+                severity="critical",
+                threshold_count=BRUTE_FORCE_THRESHOLD,
+                time_window=BRUTE_FORCE_WINDOW
             ),
 
             ThreatPattern(
@@ -110,41 +380,98 @@ class LogPatternMatcher:
                 description="Multiple authentication failures from same IP",
                 regex_pattern=r"authentication failure.*rhost=(?P<ip>\d+\.\d+\.\d+\.\d+)",
                 severity="high",
-                threshold_count=5
+                threshold_count=5,
+                aggregate=True
             )
         ]
     
-    def match_patterns(self, log_line: str, log_source: str) -> List[SecurityEvent]:
-        """Match log line against all threat patterns"""
-        events = []
+    @property
+    def compiled(self) -> CompiledPatternSet:
+        """Compiled pattern set, rebuilt only after the pattern set changes"""
+        if self._compiled is None:
+            self._compiled = CompiledPatternSet(self.patterns)
+        return self._compiled
+    
+    def invalidate(self):
+        """Force recompilation on the next match (call after editing patterns in place)"""
+        if self._compiled is not None:
+            self.add_prefilter_stats(self._compiled.get_stats())
+        self._compiled = None
+    
+    @staticmethod
+    def _merge_stats(totals: Dict[str, Dict[str, int]], stats: Dict[str, Dict[str, int]]):
+        """Add per-pattern counters into a running total"""
+        for name, counters in stats.items():
+            entry = totals.setdefault(name, {'evaluated': 0, 'prefiltered': 0, 'matched': 0})
+            for key, value in counters.items():
+                entry[key] += value
+    
+    def add_prefilter_stats(self, stats: Dict[str, Dict[str, int]]):
+        """Fold in counters collected elsewhere, such as by a match worker process"""
+        with self._stats_lock:
+            self._merge_stats(self._retired_stats, stats)
+    
+    def get_prefilter_stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-pattern counts of lines evaluated, prefiltered away and matched"""
+        with self._stats_lock:
+            totals = {name: dict(counters) for name, counters in self._retired_stats.items()}
+        if self._compiled is not None:
+            self._merge_stats(totals, self._compiled.get_stats())
+        return totals
+    
+    def reset_prefilter_stats(self):
+        """Start counting from zero"""
+        with self._stats_lock:
+            self._retired_stats = {}
+        if self._compiled is not None:
+            self._compiled.reset_stats()
+    
+    def match_patterns(self, log_line: Union[str, bytes], log_source: str) -> List[SecurityEvent]:
+        """Match log line (text or raw UTF-8 bytes) against all threat patterns"""
+        return self.match_lines([log_line], log_source)
+    
+    def match_lines(self, lines: List[Union[str, bytes]], log_source: str) -> List[SecurityEvent]:
+        """Match a batch of log lines against all threat patterns, in line order"""
+        compiled = self.compiled
+        lines = compiled.decode_candidates(lines)
+        return self.build_events(compiled, compiled.compact_matches(lines), log_source)
+    
+    def build_events(self, compiled: CompiledPatternSet, matches: List[CompactMatch],
+                     log_source: str) -> List[SecurityEvent]:
+        """Turn compact matches from a compiled pattern set into security events.
         
-        for pattern in self.patterns:
-            if not pattern.enabled:
-                continue
-            
-            match = re.search(pattern.regex_pattern, log_line, re.IGNORECASE)
-            if match:
-                event = SecurityEvent(
-                    timestamp=datetime.now(),
-                    event_type=pattern.name.lower().replace(' ', '_'),
-                    source_ip=match.groupdict().get('ip', ''),
-                    username=match.groupdict().get('username', ''),
-                    hostname=socket.gethostname(),
-                    details=log_line.strip(),
-                    severity=pattern.severity,
-                    log_source=log_source
-                )
-                events.append(event)
+        Events are stamped with the time in the log line itself, falling back
+        to now for lines without a recognised timestamp.
+        """
+        if not matches:
+            return []
         
-        return events
+        now = datetime.now()
+        parse = self.timestamps.parse
+        return [
+            SecurityEvent(
+                timestamp=parse(details, log_source, now) or now,
+                event_type=compiled.event_types[index],
+                source_ip=ip,
+                username=username,
+                hostname=self.hostname,
+                details=details,
+                severity=compiled.patterns[index].severity,
+                log_source=log_source
+            )
+            for details, index, ip, username in matches
+        ]
     
     def add_custom_pattern(self, pattern: ThreatPattern):
         """Add a custom threat pattern"""
+        re.compile(pattern.regex_pattern, re.IGNORECASE)
         self.patterns.append(pattern)
+        self.invalidate()
     
     def remove_pattern(self, pattern_name: str):
         """Remove a threat pattern by name"""
         self.patterns = [p for p in self.patterns if p.name != pattern_name]
+        self.invalidate()
     
     def get_patterns(self) -> List[ThreatPattern]:
         """Get all current patterns"""
@@ -155,6 +482,7 @@ class LogPatternMatcher:
         for pattern in self.patterns:
             if pattern.name == pattern_name:
                 pattern.enabled = True
+                self.invalidate()
                 break
     
     def disable_pattern(self, pattern_name: str):
@@ -162,4 +490,5 @@ class LogPatternMatcher:
         for pattern in self.patterns:
             if pattern.name == pattern_name:
                 pattern.enabled = False
+                self.invalidate()
                 break
@@ -0,0 +1,176 @@
+"""
+SecurityWatch Pro - Bounded-Memory Log Readers
+"""
+
+import bz2
+import gzip
+import lzma
+import re
+from typing import BinaryIO, Iterator, Optional, Sequence
+
+import numpy as np
+
+
+# Bytes requested from the file per read
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+# Bytes of a mapped file searched at once for candidate lines
+DEFAULT_SEARCH_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Bytes of a mapped file compared at once when counting its lines
+COUNT_CHUNK_SIZE = 64 * 1024 * 1024
+
+NON_ASCII = re.compile(b'[\x80-\xff]')
+
+# Leading bytes of the compressed formats rotated logs come in
+COMPRESSION_MAGIC = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+)
+
+
+def compression_of(path: str) -> Optional[str]:
+    """Compression format of a file from its magic bytes, or None for plain text"""
+    with open(path, 'rb') as f:
+        head = f.read(6)
+    for magic, name in COMPRESSION_MAGIC:
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def _open_zstd(path: str) -> BinaryIO:
+    """Streaming zstd reader from the standard library or the optional zstandard package"""
+    try:
+        from compression import zstd  # Python 3.14+
+        return zstd.open(path, 'rb')
+    except ImportError:
+        pass
+    
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError(f"Reading zstd-compressed {path} requires the zstandard package")
+    return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+
+
+def open_log(path: str) -> BinaryIO:
+    """Open a log for binary reading, decompressing rotated archives on the fly"""
+    compression = compression_of(path)
+    if compression == 'gzip':
+        return gzip.open(path, 'rb')
+    if compression == 'bz2':
+        return bz2.open(path, 'rb')
+    if compression == 'xz':
+        return lzma.open(path, 'rb')
+    if compression == 'zstd':
+        return _open_zstd(path)
+    return open(path, 'rb')
+
+
+class ChunkedLineReader:
+    """Iterate the complete lines of a binary file in fixed-size chunks.
+    
+    Only one chunk plus the partial line carried over from the previous
+    chunk is held in memory, whatever the size of the backlog. Lines are
+    yielded as raw bytes without their newline; `offset` is the position
+    just past the last line yielded, so it can be checkpointed at any point.
+    """
+    
+    def __init__(self, f: BinaryIO, offset: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 max_bytes: Optional[int] = None, final: bool = False):
+        self.f = f
+        self.start = offset
+        self.offset = offset
+        self.chunk_size = chunk_size
+        self.max_bytes = max_bytes
+        self.final = final  # Also yield a trailing line with no newline
+        self.budget_exhausted = False
+    
+    def __iter__(self) -> Iterator[bytes]:
+        if self.f.tell() != self.offset:
+            self.f.seek(self.offset)
+        limit = None if self.max_bytes is None else self.start + self.max_bytes
+        carry = b''
+        
+        while True:
+            chunk = self.f.read(self.chunk_size)
+            if not chunk:
+                break
+            
+            lines = (carry + chunk).split(b'\n')
+            carry = lines.pop()
+            for line in lines:
+                self.offset += len(line) + 1
+                yield line
+                
+                # Stop at the first line boundary past the budget; the rest is re-read next time
+                if limit is not None and self.offset >= limit:
+                    self.budget_exhausted = True
+                    return
+            
+            # A line longer than a chunk is passed on in pieces to keep memory bounded
+            if len(carry) >= self.chunk_size:
+                self.offset += len(carry)
+                yield carry
+                carry = b''
+        
+        if self.final and carry:
+            self.offset += len(carry)
+            yield carry
+
+
+def count_lines(buf, start: int, end: int) -> int:
+    """Number of lines starting in [start, end) of a buffer such as a memory map"""
+    count = 0
+    for offset in range(start, end, COUNT_CHUNK_SIZE):
+        chunk = np.frombuffer(buf, dtype=np.uint8, count=min(COUNT_CHUNK_SIZE, end - offset), offset=offset)
+        count += int(np.count_nonzero(chunk == ord('\n')))
+        # A live view would keep a memory map from closing
+        del chunk
+    if end > start and buf[end - 1] != ord('\n'):
+        count += 1
+    return count
+
+
+def mapped_lines(buf, literals: Sequence[bytes], start: int, end: int) -> Iterator[bytes]:
+    """Stripped lines starting in [start, end) of a buffer that may contain one of the literals.
+    
+    The literals are lowercase and matched case-insensitively; lines with
+    non-ASCII bytes are always yielded, since case folding can map those
+    onto ASCII letters. The buffer is lowercased a chunk at a time and
+    searched with bytes.find, so Python code only runs for lines around a
+    hit. start must be a line boundary.
+    """
+    position = start
+    while position < end:
+        chunk_end = min(end, position + DEFAULT_SEARCH_CHUNK_SIZE)
+        if chunk_end < end:
+            # Cut after the last complete line, or after the first when it is longer than a chunk
+            newline = buf.rfind(b'\n', position, chunk_end)
+            if newline < 0:
+                newline = buf.find(b'\n', chunk_end, end)
+            chunk_end = end if newline < 0 else newline + 1
+        
+        chunk = buf[position:chunk_end]
+        lowered = chunk.lower()
+        line_starts = set()
+        for literal in literals:
+            hit = lowered.find(literal)
+            while hit >= 0:
+                line_starts.add(lowered.rfind(b'\n', 0, hit) + 1)
+                line_end = lowered.find(b'\n', hit)
+                hit = -1 if line_end < 0 else lowered.find(literal, line_end + 1)
+        if not chunk.isascii():
+            hit = NON_ASCII.search(chunk)
+            while hit:
+                line_starts.add(chunk.rfind(b'\n', 0, hit.start()) + 1)
+                line_end = chunk.find(b'\n', hit.start())
+                hit = None if line_end < 0 else NON_ASCII.search(chunk, line_end + 1)
+        
+        for line_start in sorted(line_starts):
+            line_end = chunk.find(b'\n', line_start)
+            yield chunk[line_start:None if line_end < 0 else line_end].strip()
+        position = chunk_end
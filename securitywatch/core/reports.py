@@ -21,8 +21,8 @@ class ReportGenerator:
     
     def generate_html_report(self, hours: int = 24) -> str:
         """Generate comprehensive HTML security report"""
-        # Get recent events
-        events = self.database.get_recent_events(hours)
+        # Stream recent events straight into the analyzer
+        events = self.database.iter_events(hours=hours)
         
         # Analyze threats
         analysis = self.analyzer.analyze_events(events)
@@ -219,9 +219,10 @@ class ReportGenerator:
         
         # Top attacking IPs
         if analysis['top_source_ips']:
-            html_report += """
+            html_report += f"""
             <div class="chart">
                 <h2>🌐 Top Attacking IP Addresses</h2>
+                <p>{analysis['distinct_source_ips']:,} distinct source IPs</p>
                 <table class="table">
                     <tr>
                         <th>IP Address</th>
@@ -230,7 +231,8 @@ class ReportGenerator:
                     </tr>
             """
             
-            total_events = sum(analysis['top_source_ips'].values())
+            # Only the top entries are kept, so shares are of all events
+            total_events = analysis['total_events']
             for ip, count in analysis['top_source_ips'].most_common(10):
                 percentage = (count / total_events * 100) if total_events > 0 else 0
                 html_report += f"""
@@ -264,6 +266,8 @@ class ReportGenerator:
                 <h2>📈 Timeline Analysis</h2>
                 <p><strong>Peak Activity Hour:</strong> {timeline.get('peak_hour', {}).get('hour', 'N/A')}:00 
                    ({timeline.get('peak_hour', {}).get('events', 0)} events)</p>
+                <p><strong>Busiest Weekday:</strong> {timeline.get('peak_weekday', {}).get('day', 'N/A')}
+                   ({timeline.get('peak_weekday', {}).get('events', 0)} events)</p>
                 <p><strong>Days with Events:</strong> {timeline.get('total_days_with_events', 0)}</p>
             </div>
             """
@@ -303,7 +307,7 @@ class ReportGenerator:
     
     def generate_json_report(self, hours: int = 24) -> Dict:
         """Generate JSON report for API consumption"""
-        events = self.database.get_recent_events(hours)
+        events = self.database.iter_events(hours=hours)
         analysis = self.analyzer.analyze_events(events)
         stats = self.database.get_statistics()
         
@@ -317,7 +321,9 @@ class ReportGenerator:
                 'total_events': analysis['total_events'],
                 'severity_breakdown': dict(analysis['severity_breakdown']),
                 'threat_score': analysis['threat_score'],
-                'brute_force_attacks': len(analysis['brute_force_attempts'])
+                'brute_force_attacks': len(analysis['brute_force_attempts']),
+                'distinct_source_ips': analysis['distinct_source_ips'],
+                'distinct_usernames': analysis['distinct_usernames']
             },
             'top_attackers': [
                 {'ip': ip, 'count': count} 
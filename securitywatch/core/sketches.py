@@ -0,0 +1,202 @@
+"""
+SecurityWatch Pro - Streaming Count Sketches
+"""
+
+import heapq
+import math
+from operator import itemgetter
+from collections import Counter
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+# Largest overcount of a heavy hitter, as a fraction of all counted items
+HEAVY_HITTER_ERROR = 0.001
+
+# HyperLogLog registers are 2**precision bytes; the standard error is 1.04 / sqrt(2**precision)
+HLL_PRECISION = 14
+
+_MASK64 = (1 << 64) - 1
+
+
+class SpaceSaving:
+    """Top-N heavy hitters in bounded memory (Metwally et al.'s Space-Saving).
+    
+    At most capacity items are counted. A new item past capacity replaces
+    the item with the lowest count and inherits that count as its error,
+    so every estimate overcounts by at most total / capacity and any item
+    occurring more often than that is guaranteed to be tracked. The lowest
+    count is found through a heap whose entries may lag behind increments
+    and are refreshed only when they reach the top.
+    """
+    
+    def __init__(self, capacity: Optional[int] = None, error: float = HEAVY_HITTER_ERROR):
+        if capacity is None:
+            if not 0 < error < 1:
+                raise ValueError(f"Heavy hitter error must be between 0 and 1, got {error}")
+            capacity = math.ceil(1 / error)
+        if capacity < 1:
+            raise ValueError(f"Heavy hitter capacity must be positive, got {capacity}")
+        self.capacity = capacity
+        self.total = 0
+        self._counts: Dict[Hashable, int] = {}
+        self._errors: Dict[Hashable, int] = {}
+        self._heap: List[Tuple[int, Hashable]] = []  # One (count, item) per tracked item
+    
+    def __len__(self) -> int:
+        return len(self._counts)
+    
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self._counts
+    
+    def __getitem__(self, item: Hashable) -> int:
+        """Estimated count, never below the true count of a tracked item"""
+        return self._counts.get(item, 0)
+    
+    @property
+    def max_error(self) -> int:
+        """Largest overcount of any estimate"""
+        return self.total // self.capacity
+    
+    def add(self, item: Hashable, count: int = 1):
+        """Count occurrences of an item"""
+        self.total += count
+        counts = self._counts
+        if item in counts:
+            counts[item] += count
+            return
+        if len(counts) < self.capacity:
+            counts[item] = count
+            self._errors[item] = 0
+            heapq.heappush(self._heap, (count, item))
+            return
+        
+        heap = self._heap
+        while True:
+            lowest, victim = heap[0]
+            current = counts[victim]
+            if current == lowest:
+                break
+            heapq.heapreplace(heap, (current, victim))
+        
+        del counts[victim], self._errors[victim]
+        counts[item] = lowest + count
+        self._errors[item] = lowest
+        heapq.heapreplace(heap, (lowest + count, item))
+    
+    def update(self, items: Iterable[Hashable]):
+        """Count each of a stream of items once"""
+        add = self.add
+        for item in items:
+            add(item)
+    
+    def guaranteed(self, item: Hashable) -> int:
+        """Occurrences of an item certainly counted"""
+        return self._counts.get(item, 0) - self._errors.get(item, 0)
+    
+    def most_common(self, n: Optional[int] = None) -> List[Tuple[Hashable, int]]:
+        """Items with the highest estimated counts, like Counter.most_common"""
+        if n is None:
+            return sorted(self._counts.items(), key=itemgetter(1), reverse=True)
+        return heapq.nlargest(n, self._counts.items(), key=itemgetter(1))
+
+
+class HyperLogLog:
+    """Distinct count estimate in 2**precision bytes (Flajolet et al.).
+    
+    Each item's 64-bit hash picks a register by its top precision bits,
+    which keeps the longest run of leading zeros seen in the remaining
+    bits. Small cardinalities fall back to linear counting of the empty
+    registers. Python's str hash is salted per process, so estimates are
+    only comparable within one process.
+    """
+    
+    def __init__(self, precision: int = HLL_PRECISION):
+        if not 4 <= precision <= 18:
+            raise ValueError(f"HyperLogLog precision must be between 4 and 18, got {precision}")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+    
+    def add(self, item: Hashable):
+        """Record an item"""
+        # SplitMix64 finalizer, inlined: spreads every input bit over the 64 output bits
+        hashed = hash(item) & _MASK64
+        hashed = (hashed ^ (hashed >> 30)) * 0xBF58476D1CE4E5B9 & _MASK64
+        hashed = (hashed ^ (hashed >> 27)) * 0x94D049BB133111EB & _MASK64
+        hashed ^= hashed >> 31
+        index = hashed >> (64 - self.precision)
+        rank = 64 - self.precision - (hashed & ((1 << (64 - self.precision)) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+    
+    def update(self, items: Iterable[Hashable]):
+        """Record each of a stream of items"""
+        add = self.add
+        for item in items:
+            add(item)
+    
+    def count(self) -> int:
+        """Estimated number of distinct items recorded"""
+        registers = np.frombuffer(self.registers, dtype=np.uint8)
+        m = len(registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.ldexp(1.0, -registers.astype(np.int32)).sum()
+        
+        empty = int(np.count_nonzero(registers == 0))
+        if estimate <= 2.5 * m and empty:
+            estimate = m * math.log(m / empty)
+        return int(round(estimate))
+
+
+class HeavyHitterCounter:
+    """Top items and distinct count of a stream, exact until it grows too large.
+    
+    Items are counted exactly in a Counter while at most capacity distinct
+    ones have appeared. Once more do, the counts so far seed a SpaceSaving
+    and a HyperLogLog that count the rest in bounded memory, so small
+    streams pay neither the sketches' per-item cost nor their error. With
+    no error given, counting stays exact however many items appear.
+    """
+    
+    def __init__(self, error: Optional[float] = HEAVY_HITTER_ERROR):
+        self._hitters = SpaceSaving(error=error) if error is not None else None
+        self.capacity = self._hitters.capacity if self._hitters is not None else None
+        self._distinct: Optional[HyperLogLog] = None
+        self._counts: Optional[Counter] = Counter()
+    
+    @property
+    def exact(self) -> bool:
+        """Whether counts are still exact"""
+        return self._counts is not None
+    
+    def add(self, item: Hashable):
+        """Count one occurrence of an item"""
+        counts = self._counts
+        if counts is None:
+            self._hitters.add(item)
+            self._distinct.add(item)
+            return
+        counts[item] += 1
+        if self.capacity is not None and len(counts) > self.capacity:
+            self._spill()
+    
+    def _spill(self):
+        """Move the exact counts into the sketches"""
+        for item, count in self._counts.most_common():
+            self._hitters.add(item, count)
+        self._distinct = HyperLogLog()
+        self._distinct.update(self._counts)
+        self._counts = None
+    
+    def most_common(self, n: Optional[int] = None) -> List[Tuple[Hashable, int]]:
+        """Items with the highest counts, like Counter.most_common"""
+        if self._counts is not None:
+            return self._counts.most_common(n)
+        return self._hitters.most_common(n)
+    
+    def distinct(self) -> int:
+        """Number of distinct items counted, estimated once sketched"""
+        if self._counts is not None:
+            return len(self._counts)
+        return self._distinct.count()
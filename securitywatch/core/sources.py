@@ -0,0 +1,443 @@
+"""
+SecurityWatch Pro - Streaming Input Sources
+"""
+
+import logging
+import os
+import queue
+import re
+import select
+import selectors
+import socket
+import subprocess
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .workers import MATCH_BATCH_SIZE
+
+
+# Line batches waiting for the monitoring loop across all sources; when full the sources stop reading
+DEFAULT_QUEUE_BATCHES = 64
+
+# Longest a source holds a partial batch before handing it over, in seconds
+SOURCE_FLUSH_INTERVAL = 0.2
+
+# Interface a syslog URL without a host listens on; other hosts can only inject
+# lines if a listener is explicitly bound to a reachable address
+DEFAULT_SYSLOG_HOST = '127.0.0.1'
+
+# Seconds before restarting a journalctl that exited
+JOURNAL_RESTART_DELAY = 5.0
+
+# Follows the journal from now on; matches and a resume cursor are appended
+JOURNALCTL_COMMAND = ('journalctl', '--follow', '--output=export')
+
+# Largest syslog datagram accepted
+MAX_DATAGRAM_SIZE = 65535
+
+# <PRI> and, for RFC 5424, the version: the rest reads like a log file line
+SYSLOG_HEADER = re.compile(rb'^<\d{1,3}>(?:1 )?')
+
+# RFC 6587 octet counting: "<length> <message>"
+OCTET_COUNT = re.compile(rb'(\d{1,9}) ')
+
+
+def syslog_line(message: bytes) -> bytes:
+    """A received syslog message as a log file line"""
+    return SYSLOG_HEADER.sub(b'', message.strip(), count=1)
+
+
+def journal_line(entry: Dict[str, bytes]) -> bytes:
+    """A journal entry as an rsyslog-style line, so the patterns and timestamp parser apply"""
+    realtime = entry.get('__REALTIME_TIMESTAMP')
+    logged = datetime.fromtimestamp(int(realtime) / 1_000_000) if realtime else datetime.now()
+    ident = entry.get('SYSLOG_IDENTIFIER') or entry.get('_COMM') or b'journal'
+    pid = entry.get('SYSLOG_PID') or entry.get('_PID')
+    header = b' '.join([logged.astimezone().isoformat().encode(), entry.get('_HOSTNAME', b'localhost'),
+                        ident + (b'[' + pid + b']' if pid else b'') + b':'])
+    return header + b' ' + entry.get('MESSAGE', b'').replace(b'\n', b' ').strip()
+
+
+class JournalExportParser:
+    """Incremental parser for the journal export format (journalctl -o export).
+    
+    Entries are runs of FIELD=value lines ended by a blank line; fields
+    that are binary or span lines are sent as the name, a newline, a
+    little-endian 64-bit length and the raw data.
+    """
+    
+    def __init__(self):
+        self._buffer = b''
+        self._entry: Dict[str, bytes] = {}
+    
+    def feed(self, data: bytes) -> List[Dict[str, bytes]]:
+        """Parse more of the stream, returning the entries it completed"""
+        buffer = self._buffer + data
+        entries = []
+        position = 0
+        while True:
+            newline = buffer.find(b'\n', position)
+            if newline < 0:
+                break
+            
+            if newline == position:
+                if self._entry:
+                    entries.append(self._entry)
+                    self._entry = {}
+                position = newline + 1
+                continue
+            
+            line = buffer[position:newline]
+            equals = line.find(b'=')
+            if equals >= 0:
+                self._entry[line[:equals].decode('ascii', errors='replace')] = line[equals + 1:]
+                position = newline + 1
+                continue
+            
+            # Binary field; wait for the rest if it has not all arrived
+            start = newline + 1 + 8
+            if len(buffer) < start:
+                break
+            end = start + int.from_bytes(buffer[newline + 1:start], 'little')
+            if len(buffer) <= end:
+                break
+            self._entry[line.decode('ascii', errors='replace')] = buffer[start:end]
+            position = end + 1
+        
+        self._buffer = buffer[position:]
+        return entries
+
+
+class SyslogStreamFramer:
+    """Split a syslog TCP stream into messages, octet-counted (RFC 6587) or newline-delimited"""
+    
+    def __init__(self):
+        self._buffer = b''
+    
+    def feed(self, data: bytes) -> List[bytes]:
+        """Add received bytes, returning the messages they completed"""
+        buffer = self._buffer + data
+        messages = []
+        position = 0
+        while position < len(buffer):
+            # Messages start with '<', so a leading number can only be a length
+            counted = OCTET_COUNT.match(buffer, position)
+            if counted:
+                end = counted.end() + int(counted.group(1))
+                if len(buffer) < end:
+                    break
+                messages.append(buffer[counted.end():end])
+                position = end
+            else:
+                newline = buffer.find(b'\n', position)
+                if newline < 0:
+                    break
+                messages.append(buffer[position:newline])
+                position = newline + 1
+        
+        self._buffer = buffer[position:]
+        return messages
+    
+    def flush(self) -> List[bytes]:
+        """Messages left unterminated when the stream closed"""
+        rest, self._buffer = self._buffer, b''
+        return [rest] if rest.strip() else []
+
+
+class InputSource(ABC):
+    """A stream of log lines read on its own thread.
+    
+    Lines are collected into batches and handed to the monitoring loop
+    through a bounded queue shared by all sources. When the loop falls
+    behind the queue fills, the source blocks and stops reading, and the
+    backlog stays with the producer: in journalctl's pipe, in the TCP
+    window or with the sender of a unix datagram. UDP has no such flow
+    control, so its senders' datagrams are dropped by the kernel instead.
+    """
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.logger = logging.getLogger('SecurityWatchPro')
+        self._queue: Optional[queue.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._pending: List[bytes] = []
+        self._pending_since = 0.0
+    
+    def open(self):
+        """Acquire the underlying stream; errors are raised to the caller of start()"""
+    
+    @abstractmethod
+    def read(self):
+        """Read until close() is called, passing lines to add_lines()"""
+    
+    def _interrupt(self):
+        """Unblock read() once stopping is set"""
+    
+    def start(self, batches: queue.Queue):
+        """Open the source and start reading into the queue"""
+        self._queue = batches
+        self.open()
+        self._thread = threading.Thread(target=self._run, name=f'securitywatch-source-{self.name}',
+                                        daemon=True)
+        self._thread.start()
+    
+    def _run(self):
+        try:
+            self.read()
+            self.flush()
+        except Exception as e:
+            if not self._stopping.is_set():
+                self.logger.error(f"Input source {self.name} failed: {e}")
+    
+    def add_lines(self, lines: Iterable[bytes]):
+        """Queue non-empty lines, handing over a batch once it is full"""
+        if not self._pending:
+            self._pending_since = time.monotonic()
+        self._pending.extend(line for line in lines if line)
+        if len(self._pending) >= MATCH_BATCH_SIZE:
+            self.flush()
+    
+    def flush_if_due(self):
+        """Hand over a partial batch that has waited SOURCE_FLUSH_INTERVAL"""
+        if self._pending and time.monotonic() - self._pending_since >= SOURCE_FLUSH_INTERVAL:
+            self.flush()
+    
+    def flush(self):
+        """Hand the pending lines to the monitoring loop, blocking while its queue is full"""
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        while not self._stopping.is_set():
+            try:
+                self._queue.put((self.name, batch), timeout=SOURCE_FLUSH_INTERVAL)
+                return
+            except queue.Full:
+                continue
+    
+    def close(self):
+        """Stop reading and release the stream"""
+        self._stopping.set()
+        self._interrupt()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+class JournalSource(InputSource):
+    """systemd journal entries followed through journalctl's export format.
+    
+    matches are journalctl match arguments such as _SYSTEMD_UNIT=ssh.service.
+    If journalctl exits it is restarted after the last entry read.
+    """
+    
+    def __init__(self, matches: Sequence[str] = (), command: Sequence[str] = JOURNALCTL_COMMAND):
+        super().__init__('journal' + ''.join(f':{match}' for match in matches))
+        self.matches = list(matches)
+        self.command = list(command)
+        self.cursor: Optional[bytes] = None
+        self._process: Optional[subprocess.Popen] = None
+    
+    def _arguments(self) -> List[str]:
+        resume = [f"--after-cursor={self.cursor.decode()}"] if self.cursor else ['--lines=0']
+        return self.command + resume + self.matches
+    
+    def open(self):
+        self._process = subprocess.Popen(self._arguments(), stdout=subprocess.PIPE,
+                                         stderr=subprocess.DEVNULL)
+    
+    def read(self):
+        parser = JournalExportParser()
+        while not self._stopping.is_set():
+            fd = self._process.stdout.fileno()
+            readable, _, _ = select.select([fd], [], [], SOURCE_FLUSH_INTERVAL)
+            if readable:
+                data = os.read(fd, 65536)
+                if not data:
+                    self.flush()
+                    status = self._process.wait()
+                    self._process.stdout.close()
+                    if self._stopping.wait(JOURNAL_RESTART_DELAY):
+                        return
+                    self.logger.warning(f"journalctl exited with status {status}, restarting")
+                    self.open()
+                    parser = JournalExportParser()
+                    continue
+                
+                entries = parser.feed(data)
+                if entries:
+                    self.cursor = entries[-1].get('__CURSOR', self.cursor)
+                    self.add_lines(journal_line(entry) for entry in entries)
+            self.flush_if_due()
+    
+    def _interrupt(self):
+        if self._process is not None and self._process.poll() is None:
+            self._process.terminate()
+    
+    def close(self):
+        super().close()
+        if self._process is not None:
+            self._process.wait()
+            self._process.stdout.close()
+            self._process = None
+
+
+class SyslogSource(InputSource):
+    """Syslog listener on udp://host:port, tcp://host:port or unix:///path (datagrams, like /dev/log).
+    
+    Without a host (udp://:514) the listener is bound to localhost; give
+    the address of an interface, or 0.0.0.0, to accept remote senders.
+    """
+    
+    def __init__(self, url: str):
+        super().__init__(f"syslog:{url}")
+        self.url = url
+        self.transport, _, target = url.partition('://')
+        if self.transport == 'unix':
+            self.bind_address = target
+        elif self.transport in ('udp', 'tcp'):
+            host, _, port = target.rpartition(':')
+            if not port.isdigit():
+                raise ValueError(f"Syslog URL needs a port: {url}")
+            self.bind_address = (host.strip('[]') or DEFAULT_SYSLOG_HOST, int(port))
+        else:
+            raise ValueError(f"Unsupported syslog transport: {url}")
+        self._socket: Optional[socket.socket] = None
+    
+    @property
+    def address(self):
+        """Address the listener is bound to, with the actual port when 0 was requested"""
+        return self._socket.getsockname() if self._socket else self.bind_address
+    
+    def open(self):
+        if self.transport == 'unix':
+            if os.path.exists(self.bind_address):
+                os.unlink(self.bind_address)  # Stale socket from an earlier run
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        else:
+            family = socket.AF_INET6 if ':' in self.bind_address[0] else socket.AF_INET
+            kind = socket.SOCK_STREAM if self.transport == 'tcp' else socket.SOCK_DGRAM
+            self._socket = socket.socket(family, kind)
+            self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind(self.bind_address)
+        if self.transport == 'tcp':
+            self._socket.listen()
+        self._socket.settimeout(SOURCE_FLUSH_INTERVAL)
+    
+    def read(self):
+        if self.transport == 'tcp':
+            self._read_streams()
+            return
+        
+        while not self._stopping.is_set():
+            try:
+                message = self._socket.recv(MAX_DATAGRAM_SIZE)
+            except socket.timeout:
+                message = None
+            if message:
+                self.add_lines(syslog_line(line) for line in message.splitlines())
+            self.flush_if_due()
+    
+    def _read_streams(self):
+        """Serve every TCP sender from this thread, so a full queue pauses them all"""
+        connections = selectors.DefaultSelector()
+        connections.register(self._socket, selectors.EVENT_READ)
+        try:
+            while not self._stopping.is_set():
+                for key, _ in connections.select(SOURCE_FLUSH_INTERVAL):
+                    if key.fileobj is self._socket:
+                        connection, _ = self._socket.accept()
+                        connections.register(connection, selectors.EVENT_READ, SyslogStreamFramer())
+                        continue
+                    
+                    framer = key.data
+                    try:
+                        data = key.fileobj.recv(65536)
+                    except OSError:
+                        data = b''
+                    if data:
+                        self.add_lines(syslog_line(message) for message in framer.feed(data))
+                    else:
+                        self.add_lines(syslog_line(message) for message in framer.flush())
+                        connections.unregister(key.fileobj)
+                        key.fileobj.close()
+                self.flush_if_due()
+        finally:
+            for key in list(connections.get_map().values()):
+                if key.fileobj is not self._socket:
+                    key.fileobj.close()
+            connections.close()
+    
+    def close(self):
+        super().close()
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+            if self.transport == 'unix' and os.path.exists(self.bind_address):
+                os.unlink(self.bind_address)
+
+
+def create_input_source(spec: str) -> InputSource:
+    """Input source for a config entry: journal[:MATCH...], udp://, tcp:// or unix:// syslog"""
+    if spec == 'journal' or spec.startswith('journal:'):
+        return JournalSource([match for match in spec.split(':')[1:] if match])
+    return SyslogSource(spec)
+
+
+class InputSourceGroup:
+    """The streaming input sources of a monitor and the bounded queue they feed"""
+    
+    def __init__(self, specs: Iterable[str] = (), max_batches: int = DEFAULT_QUEUE_BATCHES):
+        self.logger = logging.getLogger('SecurityWatchPro')
+        self.batches: queue.Queue = queue.Queue(maxsize=max(1, max_batches))
+        self._carry: Optional[Tuple[str, List[bytes]]] = None  # Taken past the limit of the last drain()
+        self.sources: List[InputSource] = []
+        for spec in specs:
+            try:
+                self.add(create_input_source(spec))
+            except (OSError, ValueError) as e:
+                self.logger.error(f"Error starting input source {spec}: {e}")
+    
+    def add(self, source: InputSource):
+        """Start a source feeding this group"""
+        source.start(self.batches)
+        self.sources.append(source)
+    
+    def __len__(self) -> int:
+        return len(self.sources)
+    
+    def pending(self) -> bool:
+        """Whether batches are waiting to be matched"""
+        return self._carry is not None or not self.batches.empty()
+    
+    def drain(self, timeout: float = 0.0) -> Dict[str, List[List[bytes]]]:
+        """Batches delivered so far, grouped by source in arrival order.
+        
+        Waits up to timeout for the first batch, then takes at most a queue's
+        worth so one busy source cannot hold up the monitoring loop.
+        """
+        drained: Dict[str, List[List[bytes]]] = OrderedDict()
+        item, self._carry = self._carry, None
+        try:
+            if item is None:
+                item = self.batches.get(timeout=timeout) if timeout > 0 else self.batches.get_nowait()
+            for _ in range(self.batches.maxsize):
+                name, batch = item
+                drained.setdefault(name, []).append(batch)
+                item = self.batches.get_nowait()
+        except queue.Empty:
+            pass
+        else:
+            # Over the limit: keep the batch for the next call, ahead of the queue
+            self._carry = item
+        return drained
+    
+    def close(self):
+        """Stop every source"""
+        for source in self.sources:
+            source.close()
+        self.sources.clear()
@@ -0,0 +1,228 @@
+"""
+SecurityWatch Pro - Log File Change Watchers
+"""
+
+import ctypes
+import errno
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+
+# inotify(7) event masks
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+
+# Watch parent directories so rotation (move + recreate) is seen as well as writes
+DIRECTORY_WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+                        IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class PollingWatcher:
+    """Portable watcher that compares file metadata instead of reopening files.
+    
+    A stat() per path per interval is far cheaper than reading every log,
+    so the interval can be short enough for sub-second detection.
+    """
+    
+    def __init__(self, paths: Iterable[str] = (), poll_interval: float = 1.0):
+        self.poll_interval = poll_interval
+        self._signatures: Dict[str, Optional[Tuple[int, int, int]]] = {}
+        for path in paths:
+            self.watch(path)
+    
+    @staticmethod
+    def _signature(path: str) -> Optional[Tuple[int, int, int]]:
+        """Identity, size and modification time of a path, or None if missing"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+    
+    def watch(self, path: str):
+        """Start watching a log file"""
+        self._signatures[path] = self._signature(path)
+    
+    def unwatch(self, path: str):
+        """Stop watching a log file"""
+        self._signatures.pop(path, None)
+    
+    def _changed(self) -> Set[str]:
+        """Paths whose metadata changed since the last check"""
+        changed = set()
+        for path, previous in self._signatures.items():
+            current = self._signature(path)
+            if current != previous:
+                self._signatures[path] = current
+                changed.add(path)
+        return changed
+    
+    def wait(self, timeout: float) -> Set[str]:
+        """Block until watched files change or the timeout expires"""
+        deadline = time.monotonic() + timeout
+        while True:
+            changed = self._changed()
+            remaining = deadline - time.monotonic()
+            if changed or remaining <= 0:
+                return changed
+            time.sleep(min(self.poll_interval, remaining))
+    
+    def close(self):
+        """Release watcher resources"""
+        self._signatures.clear()
+
+
+class InotifyWatcher:
+    """Linux inotify watcher that wakes only when a watched log changes"""
+    
+    def __init__(self, paths: Iterable[str] = ()):
+        self._libc = ctypes.CDLL(None, use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, f"inotify_init1 failed: {os.strerror(error)}")
+        
+        self._paths: Set[str] = set()
+        self._by_directory: Dict[str, Dict[str, str]] = {}  # directory -> {file name: path}
+        self._directory_wds: Dict[int, str] = {}
+        self._unwatched_directories: Set[str] = set()
+        for path in paths:
+            self.watch(path)
+    
+    def watch(self, path: str):
+        """Start watching a log file through its parent directory"""
+        directory, name = os.path.split(os.path.abspath(path))
+        self._paths.add(path)
+        self._by_directory.setdefault(directory, {})[name] = path
+        if directory not in self._directory_wds.values():
+            self._add_directory_watch(directory)
+    
+    def unwatch(self, path: str):
+        """Stop watching a log file"""
+        directory, name = os.path.split(os.path.abspath(path))
+        self._paths.discard(path)
+        names = self._by_directory.get(directory, {})
+        names.pop(name, None)
+        if names:
+            return
+        
+        self._by_directory.pop(directory, None)
+        self._unwatched_directories.discard(directory)
+        for wd, watched in list(self._directory_wds.items()):
+            if watched == directory:
+                self._libc.inotify_rm_watch(self._fd, wd)
+                del self._directory_wds[wd]
+    
+    def _add_directory_watch(self, directory: str) -> bool:
+        """Add an inotify watch for a directory, remembering it for retry if missing"""
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), DIRECTORY_WATCH_MASK)
+        if wd < 0:
+            self._unwatched_directories.add(directory)
+            return False
+        
+        self._directory_wds[wd] = directory
+        self._unwatched_directories.discard(directory)
+        return True
+    
+    def _retry_missing_directories(self) -> Set[str]:
+        """Watch directories that appeared since the last attempt"""
+        changed = set()
+        for directory in list(self._unwatched_directories):
+            if self._add_directory_watch(directory):
+                # Anything written before the watch existed must be read now
+                changed.update(self._by_directory.get(directory, {}).values())
+        return changed
+    
+    def _read_events(self) -> Set[str]:
+        """Drain pending inotify events into the set of affected log paths"""
+        changed = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            except OSError as e:
+                if e.errno == errno.EINTR:
+                    continue
+                raise
+            
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                
+                if mask & IN_Q_OVERFLOW:
+                    changed.update(self._paths)
+                    continue
+                
+                directory = self._directory_wds.get(wd)
+                if directory is None:
+                    continue
+                
+                names = self._by_directory.get(directory, {})
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                    # The directory itself went away; watch again once it is back
+                    if mask & IN_MOVE_SELF:
+                        self._libc.inotify_rm_watch(self._fd, wd)
+                    del self._directory_wds[wd]
+                    self._unwatched_directories.add(directory)
+                    changed.update(names.values())
+                    continue
+                
+                path = names.get(os.fsdecode(name))
+                if path is not None:
+                    changed.add(path)
+    
+    def wait(self, timeout: float) -> Set[str]:
+        """Block until watched files change or the timeout expires"""
+        changed = self._retry_missing_directories()
+        if changed:
+            return changed
+        
+        try:
+            readable, _, _ = select.select([self._fd], [], [], timeout)
+        except InterruptedError:
+            return set()
+        
+        return self._read_events() if readable else set()
+    
+    def close(self):
+        """Release the inotify file descriptor"""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def create_log_watcher(paths: Iterable[str], mode: str = "auto", poll_interval: float = 1.0,
+                       logger: Optional[logging.Logger] = None):
+    """Create an inotify watcher where available, falling back to polling"""
+    logger = logger or logging.getLogger('SecurityWatchPro')
+    paths = list(paths)
+    
+    if mode in ("auto", "inotify") and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(paths)
+        except (OSError, AttributeError) as e:
+            logger.warning(f"inotify unavailable ({e}), falling back to polling every {poll_interval}s")
+    elif mode == "inotify":
+        logger.warning(f"inotify requires Linux, falling back to polling every {poll_interval}s")
+    
+    return PollingWatcher(paths, poll_interval)
@@ -0,0 +1,169 @@
+"""
+SecurityWatch Pro - Vectorized Timeline Histograms
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from ..models.batch import EventBatch
+
+
+SECONDS_PER_HOUR = 3600
+SECONDS_PER_DAY = 86400
+
+# Weekday of day 0 (1970-01-01, a Thursday), Monday being 0 as in datetime.weekday()
+EPOCH_WEEKDAY = 3
+
+# Timestamps converted per NumPy call when folding a stream of events in
+TIMELINE_CHUNK_SIZE = 65536
+
+WEEKDAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def wall_clock_seconds(timestamps: Iterable[datetime]) -> np.ndarray:
+    """Seconds since 1970-01-01 on the wall clock of each timestamp.
+    
+    Offsets of aware timestamps are dropped rather than applied, so the
+    hours and days binned are the ones written in the logs, as with
+    datetime.hour and datetime.date().
+    """
+    timestamps = timestamps if isinstance(timestamps, list) else list(timestamps)
+    try:
+        seconds = np.fromiter(((timestamp - _EPOCH).total_seconds() for timestamp in timestamps),
+                              dtype=np.float64, count=len(timestamps))
+    except TypeError:
+        seconds = np.fromiter(((timestamp.replace(tzinfo=None) - _EPOCH).total_seconds()
+                               for timestamp in timestamps), dtype=np.float64, count=len(timestamps))
+    return np.floor(seconds).astype(np.int64)
+
+
+def timeline_summary(hourly: Dict[int, int], daily: Dict[str, int]) -> Dict:
+    """Summarize hourly and daily event counts; ties go to the earliest hour or day"""
+    if not daily:
+        return {}
+    
+    hourly = dict(sorted(hourly.items()))
+    daily = dict(sorted(daily.items()))
+    weekdays = [0] * 7
+    for day, count in daily.items():
+        weekdays[date.fromisoformat(day).weekday()] += count
+    
+    peak_hour = max(hourly.items(), key=lambda x: x[1]) if hourly else (0, 0)
+    peak_day = max(daily.items(), key=lambda x: x[1])
+    peak_weekday = max(range(7), key=weekdays.__getitem__)
+    
+    return {
+        'hourly_distribution': hourly,
+        'daily_distribution': daily,
+        'weekday_distribution': dict(zip(WEEKDAY_NAMES, weekdays)),
+        'peak_hour': {'hour': peak_hour[0], 'events': peak_hour[1]},
+        'peak_day': {'date': peak_day[0], 'events': peak_day[1]},
+        'peak_weekday': {'day': WEEKDAY_NAMES[peak_weekday], 'events': weekdays[peak_weekday]},
+        'total_days_with_events': len(daily)
+    }
+
+
+class Timeline:
+    """Hour-of-day, day-of-week and calendar-day histograms of event times.
+    
+    Times are binned as int64 wall-clock seconds since the epoch with one
+    np.bincount per histogram, instead of calling timestamp.hour and
+    strftime per event. Calendar days are counted in an array starting at
+    the earliest day seen, which grows as earlier or later days are added,
+    so a timeline can be filled a chunk at a time from a stream.
+    """
+    
+    def __init__(self):
+        self.hourly = np.zeros(24, dtype=np.int64)
+        self.weekdays = np.zeros(7, dtype=np.int64)
+        self.daily = np.zeros(0, dtype=np.int64)
+        self.first_day: Optional[int] = None
+    
+    @classmethod
+    def from_seconds(cls, seconds: np.ndarray) -> 'Timeline':
+        timeline = cls()
+        timeline.add_seconds(seconds)
+        return timeline
+    
+    @classmethod
+    def from_timestamps(cls, timestamps: Iterable[datetime]) -> 'Timeline':
+        return cls.from_seconds(wall_clock_seconds(timestamps))
+    
+    @classmethod
+    def from_batch(cls, batch: EventBatch) -> 'Timeline':
+        return cls.from_seconds(batch.timestamps.astype('datetime64[s]').astype(np.int64))
+    
+    @property
+    def total(self) -> int:
+        return int(self.hourly.sum())
+    
+    def add_seconds(self, seconds: np.ndarray):
+        """Count events at wall-clock epoch seconds"""
+        if not len(seconds):
+            return
+        
+        days = seconds // SECONDS_PER_DAY
+        self.hourly += np.bincount((seconds - days * SECONDS_PER_DAY) // SECONDS_PER_HOUR, minlength=24)
+        self.weekdays += np.bincount((days + EPOCH_WEEKDAY) % 7, minlength=7)
+        
+        low, high = int(days.min()), int(days.max())
+        if self.first_day is None:
+            self.first_day = low
+        last_day = max(self.first_day + len(self.daily) - 1, high)
+        if low < self.first_day or last_day >= self.first_day + len(self.daily):
+            first_day = min(self.first_day, low)
+            self.daily = np.pad(self.daily, (self.first_day - first_day,
+                                             last_day - self.first_day - len(self.daily) + 1))
+            self.first_day = first_day
+        self.daily += np.bincount(days - self.first_day, minlength=len(self.daily))
+    
+    def add_timestamps(self, timestamps: Iterable[datetime]):
+        """Count events at datetimes"""
+        self.add_seconds(wall_clock_seconds(timestamps))
+    
+    def active_days(self) -> np.ndarray:
+        """Event counts of the calendar days that have any"""
+        return self.daily[self.daily > 0]
+    
+    def hourly_distribution(self) -> Dict[int, int]:
+        """Events per hour of day, for hours with any"""
+        return {hour: int(count) for hour, count in enumerate(self.hourly.tolist()) if count}
+    
+    def daily_distribution(self) -> Dict[str, int]:
+        """Events per calendar day as YYYY-MM-DD, for days with any, oldest first"""
+        if self.first_day is None:
+            return {}
+        first = date(1970, 1, 1) + timedelta(days=self.first_day)
+        return {(first + timedelta(days=int(offset))).isoformat(): int(self.daily[offset])
+                for offset in np.flatnonzero(self.daily)}
+    
+    def summary(self) -> Dict:
+        """Timeline analysis in the shape ThreatAnalyzer reports"""
+        return timeline_summary(self.hourly_distribution(), self.daily_distribution())
+
+
+class TimelineBuilder:
+    """Collect timestamps from a stream of events and bin them a chunk at a time"""
+    
+    def __init__(self, chunk_size: int = TIMELINE_CHUNK_SIZE):
+        self.timeline = Timeline()
+        self.chunk_size = chunk_size
+        self._pending: List[datetime] = []
+    
+    def add(self, timestamp: datetime):
+        pending = self._pending
+        pending.append(timestamp)
+        if len(pending) >= self.chunk_size:
+            self.timeline.add_timestamps(pending)
+            pending.clear()
+    
+    def finish(self) -> Timeline:
+        """Bin the remaining timestamps and return the timeline"""
+        if self._pending:
+            self.timeline.add_timestamps(self._pending)
+            self._pending.clear()
+        return self.timeline
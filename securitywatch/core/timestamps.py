@@ -0,0 +1,130 @@
+"""
+SecurityWatch Pro - Log Timestamp Extraction
+"""
+
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+MONTHS = {name: number for number, name in enumerate(
+    ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'), start=1)}
+
+# Only the head of a line is searched; timestamps come first in every supported format
+SEARCH_WINDOW = 256
+
+# Syslog omits the year; a date this far ahead of now belongs to last year
+SYSLOG_FUTURE_TOLERANCE = timedelta(days=1)
+
+
+def _local(value: datetime) -> datetime:
+    """Naive local time, the convention for every stored event"""
+    return value.astimezone().replace(tzinfo=None) if value.tzinfo else value
+
+
+def _offset(text: str) -> timezone:
+    """Timezone for a 'Z', '+hhmm' or '+hh:mm' suffix"""
+    if text in ('Z', 'z'):
+        return timezone.utc
+    text = text.replace(':', '')
+    minutes = int(text[1:3]) * 60 + int(text[3:5])
+    return timezone(timedelta(minutes=-minutes if text[0] == '-' else minutes))
+
+
+def _microseconds(fraction: Optional[str]) -> int:
+    return int((fraction or '0')[:6].ljust(6, '0'))
+
+
+def _parse_syslog(match: re.Match, now: datetime) -> datetime:
+    month, day, hour, minute, second = match.groups()
+    value = datetime(now.year, MONTHS[month], int(day), int(hour), int(minute), int(second))
+    if value > now + SYSLOG_FUTURE_TOLERANCE:
+        value = value.replace(year=now.year - 1)
+    return value
+
+
+def _parse_iso(match: re.Match, now: datetime) -> datetime:
+    year, month, day, hour, minute, second, fraction, zone = match.groups()
+    value = datetime(int(year), int(month), int(day), int(hour), int(minute), int(second),
+                     _microseconds(fraction))
+    return _local(value.replace(tzinfo=_offset(zone))) if zone else value
+
+
+def _parse_clf(match: re.Match, now: datetime) -> datetime:
+    day, month, year, hour, minute, second, zone = match.groups()
+    value = datetime(int(year), MONTHS[month], int(day), int(hour), int(minute), int(second),
+                     tzinfo=_offset(zone))
+    return _local(value)
+
+
+def _parse_windows(match: re.Match, now: datetime) -> datetime:
+    month, day, year, hour, minute, second, meridiem = match.groups()
+    hour = int(hour)
+    if meridiem:
+        hour = hour % 12 + (12 if meridiem.upper() == 'PM' else 0)
+    return datetime(int(year), int(month), int(day), hour, int(minute), int(second))
+
+
+# (name, regex, builder); the regex captures exactly what its builder needs
+TIMESTAMP_FORMATS: List[Tuple[str, re.Pattern, Callable[[re.Match, datetime], datetime]]] = [
+    # Jan  5 14:02:11 host sshd[42]: ...
+    ('syslog', re.compile(r'^(?:<\d{1,3}>)?(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec) '
+                          r'{1,2}(\d{1,2}) (\d{2}):(\d{2}):(\d{2})\b'), _parse_syslog),
+    # 2026-01-05T14:02:11.123456+01:00, rsyslog high precision, Windows SystemTime='...Z'
+    ('iso8601', re.compile(r'(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2}):(\d{2})'
+                           r'(?:[.,](\d+))?(Z|z|[+-]\d{2}:?\d{2})?'), _parse_iso),
+    # 203.0.113.5 - - [05/Jan/2026:14:02:11 +0000] "GET / HTTP/1.1" ...
+    ('clf', re.compile(r'\[(\d{2})/(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)/(\d{4}):'
+                       r'(\d{2}):(\d{2}):(\d{2}) ([+-]\d{4})\]'), _parse_clf),
+    # 1/5/2026 2:02:11 PM, as in Windows event log exports
+    ('windows', re.compile(r'\b(\d{1,2})/(\d{1,2})/(\d{4}) (\d{1,2}):(\d{2}):(\d{2})(?: ?([AaPp][Mm]))?'),
+     _parse_windows),
+]
+
+
+class TimestampParser:
+    """Extract the time an event was logged from the line itself.
+    
+    Each log source almost always uses one format, so the format that last
+    matched a source is tried first and the others only on a miss. The last
+    timestamp text seen per format is cached, since consecutive lines
+    usually share the same second.
+    """
+    
+    def __init__(self):
+        self._order: List[int] = list(range(len(TIMESTAMP_FORMATS)))
+        self._source_format: Dict[str, int] = {}
+        self._last: Dict[int, Tuple[str, datetime]] = {}
+    
+    def parse(self, log_line: str, log_source: str = '', now: Optional[datetime] = None) -> Optional[datetime]:
+        """Event time of a log line, or None when it carries no recognised timestamp"""
+        head = log_line[:SEARCH_WINDOW]
+        preferred = self._source_format.get(log_source)
+        order = self._order if preferred is None else [preferred] + [i for i in self._order if i != preferred]
+        
+        for index in order:
+            _, regex, build = TIMESTAMP_FORMATS[index]
+            match = regex.search(head)
+            if not match:
+                continue
+            
+            text = match.group(0)
+            cached = self._last.get(index)
+            if cached is not None and cached[0] == text:
+                value = cached[1]
+            else:
+                try:
+                    value = build(match, now or datetime.now())
+                except (ValueError, OverflowError):
+                    continue
+                self._last[index] = (text, value)
+            
+            self._source_format[log_source] = index
+            return value
+        
+        return None
+    
+    def format_of(self, log_source: str) -> Optional[str]:
+        """Name of the format last recognised for a log source"""
+        index = self._source_format.get(log_source)
+        return None if index is None else TIMESTAMP_FORMATS[index][0]
@@ -0,0 +1,255 @@
+"""
+SecurityWatch Pro - Parallel Log Workers
+"""
+
+import logging
+import mmap
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from ..models.events import SecurityEvent, ThreatPattern
+from .patterns import CompactMatch, CompiledPatternSet, LogPatternMatcher
+from .readers import ChunkedLineReader, compression_of, count_lines, mapped_lines, open_log
+
+
+# Lines handed to a match worker process at a time
+MATCH_BATCH_SIZE = 2048
+
+# Batches per file in flight to the match processes, bounding memory
+MAX_PENDING_BATCHES = 4
+
+# Bytes of a file scanned by one process task during a whole-file scan
+SHARD_SIZE = 32 * 1024 * 1024
+
+T = TypeVar('T')
+
+# What a match worker sends back: compact matches and its prefilter counters
+WorkerResult = Tuple[List[CompactMatch], Dict[str, Dict[str, int]]]
+
+# Pattern sets compiled inside a match worker process, keyed by the patterns they compile
+_process_pattern_sets: Dict[Tuple, CompiledPatternSet] = {}
+
+
+def _pattern_set(patterns: Sequence[ThreatPattern]) -> CompiledPatternSet:
+    """Compiled pattern set for this process, reused while the patterns are unchanged"""
+    key = tuple((p.name, p.regex_pattern, p.severity, p.enabled) for p in patterns)
+    compiled = _process_pattern_sets.get(key)
+    if compiled is None:
+        _process_pattern_sets.clear()
+        compiled = CompiledPatternSet(list(patterns))
+        _process_pattern_sets[key] = compiled
+    return compiled
+
+
+def _take_stats(compiled: CompiledPatternSet) -> Dict[str, Dict[str, int]]:
+    stats = compiled.get_stats()
+    compiled.reset_stats()
+    return stats
+
+
+def line_batches(f, start: int = 0, end: Optional[int] = None) -> Iterator[List[bytes]]:
+    """Non-empty stripped lines starting in [start, end) of an open binary file, in batches"""
+    max_bytes = None if end is None else end - start
+    lines = (line.strip() for line in ChunkedLineReader(f, start, max_bytes=max_bytes, final=True))
+    lines = (line for line in lines if line)
+    return iter(lambda: list(islice(lines, MATCH_BATCH_SIZE)), [])
+
+
+def shard_ranges(path: str, shard_size: int = SHARD_SIZE) -> List[Tuple[int, Optional[int]]]:
+    """Split a file into byte ranges of about shard_size that start and end on line boundaries.
+    
+    A compressed file cannot be entered mid-stream, so it is one range
+    (0, None) read to the end.
+    """
+    if compression_of(path):
+        return [(0, None)]
+    
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        bounds = [0]
+        while bounds[-1] + shard_size < size:
+            # Finish the line the cut falls in
+            f.seek(bounds[-1] + shard_size - 1)
+            f.readline()
+            if f.tell() >= size:
+                break
+            bounds.append(f.tell())
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+def _decoded(lines: List[bytes]) -> List[str]:
+    return [line.decode('utf-8', errors='ignore') for line in lines]
+
+
+def scan_mapped(compiled: CompiledPatternSet, path: str, start: int = 0,
+                end: Optional[int] = None) -> List[CompactMatch]:
+    """Match the lines starting in [start, end) of a plain file through a memory map.
+    
+    The anchor literals are searched for in the mapped bytes, and only the
+    lines around hits are decoded and matched; the lines in between are
+    just counted for the prefilter statistics.
+    """
+    matches = []
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        end = size if end is None else min(end, size)
+        if start >= end:
+            return matches
+        
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            candidates = 0
+            lines = mapped_lines(buf, compiled.prefilter.byte_literals, start, end)
+            for batch in iter(lambda: list(islice(lines, MATCH_BATCH_SIZE)), []):
+                candidates += len(batch)
+                matches.extend(compiled.compact_matches(_decoded(batch)))
+            compiled.record_skipped(count_lines(buf, start, end) - candidates)
+    return matches
+
+
+def scan_range(compiled: CompiledPatternSet, path: str, start: int = 0, end: Optional[int] = None,
+               mapped: bool = False) -> List[CompactMatch]:
+    """Match every line starting in [start, end) of a file.
+    
+    With mapped, plain files are scanned through a memory map; compressed
+    files, and pattern sets with unanchored patterns that must see every
+    line, are still read line by line.
+    """
+    if mapped and not compiled.prefilter.unanchored and not compression_of(path):
+        return scan_mapped(compiled, path, start, end)
+    
+    matches = []
+    with open_log(path) as f:
+        for batch in line_batches(f, start, end):
+            matches.extend(compiled.compact_matches(_decoded(batch)))
+    return matches
+
+
+def match_in_process(patterns: List[ThreatPattern], lines: List[bytes]) -> WorkerResult:
+    """Match a batch of lines in a worker process"""
+    compiled = _pattern_set(patterns)
+    matches = compiled.compact_matches(_decoded(lines))
+    return matches, _take_stats(compiled)
+
+
+def scan_range_in_process(patterns: List[ThreatPattern], path: str, start: int,
+                          end: Optional[int], mapped: bool = False) -> WorkerResult:
+    """Match every line starting in [start, end) of a file in a worker process.
+    
+    The worker reads (and decompresses) its range itself, so only the byte
+    offsets travel to the process and only the matches travel back.
+    """
+    compiled = _pattern_set(patterns)
+    matches = scan_range(compiled, path, start, end, mapped)
+    return matches, _take_stats(compiled)
+
+
+class LogWorkerPool:
+    """Read and pattern-match several log files at once.
+    
+    Each file is handled by a thread, so a busy file no longer holds up
+    reading the others. Regex matching holds the GIL, so it can optionally
+    be offloaded to a pool of processes, each keeping its patterns
+    compiled; whole files are then split into shards scanned in parallel.
+    """
+    
+    def __init__(self, max_threads: int = 4, match_processes: int = 0):
+        self.logger = logging.getLogger('SecurityWatchPro')
+        self.threads = ThreadPoolExecutor(max_workers=max(1, max_threads),
+                                          thread_name_prefix='securitywatch-log')
+        self.processes: Optional[ProcessPoolExecutor] = None
+        if match_processes > 0:
+            # spawn: forking a process that already runs reader threads is unsafe
+            self.processes = ProcessPoolExecutor(max_workers=match_processes,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+    
+    def map(self, fn: Callable[[str], T], paths: Iterable[str]) -> List[T]:
+        """Run fn on every path concurrently, returning results in path order"""
+        paths = list(paths)
+        if len(paths) <= 1:
+            return [fn(path) for path in paths]
+        return list(self.threads.map(fn, paths))
+    
+    def match_batches(self, matcher: LogPatternMatcher, batches: Iterable[List[bytes]],
+                      log_source: str) -> List[SecurityEvent]:
+        """Match batches of lines from one file, keeping events in line order"""
+        if self.processes is None:
+            events = []
+            for batch in batches:
+                events.extend(matcher.match_lines(batch, log_source))
+            return events
+        
+        # Indices in the compact matches refer to this snapshot of the pattern set
+        compiled = matcher.compiled
+        matches = []
+        pending: deque = deque()
+        for batch in batches:
+            pending.append(self.processes.submit(match_in_process, compiled.patterns, batch))
+            if len(pending) >= MAX_PENDING_BATCHES:
+                matches.extend(self._collect(matcher, pending.popleft()))
+        while pending:
+            matches.extend(self._collect(matcher, pending.popleft()))
+        return matcher.build_events(compiled, matches, log_source)
+    
+    def scan_files(self, matcher: LogPatternMatcher, paths: Iterable[str],
+                   shard_size: int = SHARD_SIZE, mapped: bool = False) -> List[List[SecurityEvent]]:
+        """Match every line of whole files, returning each file's events in line order.
+        
+        With match processes every plain file is cut into shards of about
+        shard_size bytes that the processes read and match independently,
+        and compressed files are decompressed in parallel, one per process.
+        With mapped, plain files are memory-mapped and only the lines that
+        may match are decoded. A file that cannot be read is logged and
+        yields no events.
+        """
+        paths = list(paths)
+        if self.processes is None:
+            return self.map(lambda path: self._scan_in_thread(matcher, path, mapped), paths)
+        
+        compiled = matcher.compiled
+        jobs = []
+        for path in paths:
+            try:
+                ranges = shard_ranges(path, shard_size)
+            except OSError as e:
+                self.logger.error(f"Error scanning {path}: {e}")
+                ranges = []
+            jobs.append((path, [self.processes.submit(scan_range_in_process, compiled.patterns,
+                                                      path, start, end, mapped)
+                                for start, end in ranges]))
+        
+        results = []
+        for path, futures in jobs:
+            matches = []
+            try:
+                for future in futures:
+                    matches.extend(self._collect(matcher, future))
+            except Exception as e:
+                self.logger.error(f"Error scanning {path}: {e}")
+                matches = []
+            results.append(matcher.build_events(compiled, matches, path))
+        return results
+    
+    def _scan_in_thread(self, matcher: LogPatternMatcher, path: str, mapped: bool) -> List[SecurityEvent]:
+        try:
+            compiled = matcher.compiled
+            return matcher.build_events(compiled, scan_range(compiled, path, mapped=mapped), path)
+        except Exception as e:
+            self.logger.error(f"Error scanning {path}: {e}")
+            return []
+    
+    @staticmethod
+    def _collect(matcher: LogPatternMatcher, future: Future) -> List[CompactMatch]:
+        matches, stats = future.result()
+        matcher.add_prefilter_stats(stats)
+        return matches
+    
+    def close(self):
+        """Shut down the reader threads and match processes"""
+        self.threads.shutdown(wait=True)
+        if self.processes is not None:
+            self.processes.shutdown(wait=True)
@@ -2,12 +2,15 @@
 SecurityWatch Pro - Data Models
 """
 
-from .events import SecurityEvent, ThreatPattern, AlertConfig, EmailConfig, MonitoringConfig
+from .events import SecurityEvent, ThreatPattern, AlertConfig, EmailConfig, MonitoringConfig, LogCheckpoint
+from .batch import EventBatch
 
 __all__ = [
     'SecurityEvent',
     'ThreatPattern', 
     'AlertConfig',
     'EmailConfig',
-    'MonitoringConfig'
+    'MonitoringConfig',
+    'LogCheckpoint',
+    'EventBatch'
 ]
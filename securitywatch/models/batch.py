@@ -0,0 +1,171 @@
+"""
+SecurityWatch Pro - Columnar Event Batch
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from .events import SecurityEvent
+
+
+# String fields stored as integer codes into a per-batch category list
+CATEGORICAL_COLUMNS = ('event_type', 'source_ip', 'username', 'hostname', 'severity', 'log_source')
+
+# Column order shared with security_events rows and SecurityEvent fields
+EVENT_COLUMNS = ('timestamp', 'event_type', 'source_ip', 'username', 'hostname',
+                 'details', 'severity', 'log_source')
+
+
+def _encode(values: Iterable[Optional[str]], count: int):
+    """Dictionary-encode strings into dense codes in first-seen order"""
+    index = {}
+    codes = np.fromiter((index.setdefault(value or "", len(index)) for value in values),
+                        dtype=np.int32, count=count)
+    return codes, list(index)
+
+
+def _parse_timestamps(values: Sequence) -> np.ndarray:
+    """Parse ISO timestamps or datetimes into a datetime64[us] array"""
+    try:
+        return np.array(values, dtype='datetime64[us]')
+    except (TypeError, ValueError):
+        # Offsets and other ISO variants numpy does not parse
+        return np.array([
+            value if isinstance(value, datetime) else datetime.fromisoformat(value)
+            for value in values
+        ], dtype='datetime64[us]')
+
+
+class EventBatch:
+    """Security events stored column by column.
+    
+    Timestamps are a datetime64[us] array (naive, as stored in the database)
+    and the string fields are int32 codes into per-column category lists, so
+    analyzers can count and group with NumPy instead of walking
+    SecurityEvent objects. Iterating or indexing a batch still yields
+    SecurityEvent instances for code that needs them.
+    """
+    
+    def __init__(self, timestamps: np.ndarray, codes: Dict[str, np.ndarray],
+                 categories: Dict[str, List[str]], details: List[str]):
+        self.timestamps = timestamps
+        self.codes = codes
+        self.categories = categories
+        self.details = details
+    
+    @classmethod
+    def from_rows(cls, rows: Sequence[tuple]) -> 'EventBatch':
+        """Build a batch from rows in EVENT_COLUMNS order"""
+        if not rows:
+            return cls.empty()
+        
+        columns = dict(zip(EVENT_COLUMNS, zip(*rows)))
+        count = len(rows)
+        codes, categories = {}, {}
+        for name in CATEGORICAL_COLUMNS:
+            codes[name], categories[name] = _encode(columns[name], count)
+        
+        details = [value or "" for value in columns['details']]
+        return cls(_parse_timestamps(columns['timestamp']), codes, categories, details)
+    
+    @classmethod
+    def from_events(cls, events: Iterable[SecurityEvent]) -> 'EventBatch':
+        """Build a batch from SecurityEvent objects"""
+        return cls.from_rows([
+            (event.timestamp, event.event_type, event.source_ip, event.username,
+             event.hostname, event.details, event.severity, event.log_source)
+            for event in events
+        ])
+    
+    @classmethod
+    def of(cls, events) -> 'EventBatch':
+        """Return events as a batch, converting only when needed"""
+        return events if isinstance(events, cls) else cls.from_events(events)
+    
+    @classmethod
+    def empty(cls) -> 'EventBatch':
+        """Batch with no events"""
+        return cls(np.array([], dtype='datetime64[us]'),
+                   {name: np.array([], dtype=np.int32) for name in CATEGORICAL_COLUMNS},
+                   {name: [] for name in CATEGORICAL_COLUMNS}, [])
+    
+    def __len__(self) -> int:
+        return len(self.timestamps)
+    
+    def __iter__(self) -> Iterator[SecurityEvent]:
+        for index in range(len(self)):
+            yield self.event(index)
+    
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return self.event(key)
+        return self.take(key)
+    
+    def event(self, index: int) -> SecurityEvent:
+        """Materialize one row as a SecurityEvent"""
+        values = {name: self.categories[name][self.codes[name][index]]
+                  for name in CATEGORICAL_COLUMNS}
+        return SecurityEvent(timestamp=self.timestamps[index].item(),
+                             details=self.details[index], **values)
+    
+    def to_events(self) -> List[SecurityEvent]:
+        """Materialize every row as a SecurityEvent"""
+        return list(self)
+    
+    def take(self, selector) -> 'EventBatch':
+        """Select rows by slice, index array or boolean mask, sharing categories"""
+        if isinstance(selector, slice):
+            details = self.details[selector]
+        else:
+            positions = np.arange(len(self))[selector]
+            details = [self.details[position] for position in positions]
+        return EventBatch(self.timestamps[selector],
+                          {name: codes[selector] for name, codes in self.codes.items()},
+                          self.categories, details)
+    
+    def code_of(self, column: str, value: str) -> int:
+        """Code of a category value, or -1 if it does not occur"""
+        try:
+            return self.categories[column].index(value)
+        except ValueError:
+            return -1
+    
+    def column(self, name: str) -> np.ndarray:
+        """Decoded values of one column"""
+        if name == 'timestamp':
+            return self.timestamps
+        if name == 'details':
+            return np.array(self.details, dtype=object)
+        categories = np.empty(len(self.categories[name]), dtype=object)
+        categories[:] = self.categories[name]
+        return categories[self.codes[name]]
+    
+    def counts(self, name: str) -> Dict[str, int]:
+        """Occurrences of each value of a categorical column"""
+        categories = self.categories[name]
+        totals = np.bincount(self.codes[name], minlength=len(categories))
+        return {categories[code]: int(total) for code, total in enumerate(totals) if total}
+    
+    @property
+    def epoch_seconds(self) -> np.ndarray:
+        """Timestamps as float seconds since the epoch"""
+        return self.timestamps.astype('int64') / 1e6
+    
+    @property
+    def hours(self) -> np.ndarray:
+        """Hour of day of every event"""
+        return ((self.timestamps - self.timestamps.astype('datetime64[D]')) //
+                np.timedelta64(1, 'h')).astype(np.int64)
+    
+    @property
+    def days(self) -> np.ndarray:
+        """Calendar day of every event"""
+        return self.timestamps.astype('datetime64[D]')
+    
+    def to_frame(self, columns: Sequence[str] = EVENT_COLUMNS):
+        """Build a pandas DataFrame of the requested columns"""
+        import pandas as pd
+        
+        return pd.DataFrame({name: self.column(name) for name in columns})
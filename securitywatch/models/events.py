@@ -2,14 +2,28 @@
 SecurityWatch Pro - Event Data Models
 """
 
+import sys
 from datetime import datetime
 from dataclasses import dataclass
 from typing import List, Optional
 
 
+def _intern(value):
+    """Intern strings so repeated values share one object"""
+    return sys.intern(value) if type(value) is str else value
+
+
 @dataclass
 class SecurityEvent:
-    """Individual security event data structure"""
+    """Individual security event data structure.
+    
+    Slot-based to drop the per-instance __dict__, and the low-cardinality
+    fields are interned so a large window of events shares one string per
+    distinct event type, hostname, severity and log source.
+    """
+    __slots__ = ('timestamp', 'event_type', 'source_ip', 'username', 'hostname',
+                 'details', 'severity', 'log_source')
+    
     timestamp: datetime
     event_type: str  # failed_login, brute_force, suspicious_ip, etc.
     source_ip: str
@@ -18,6 +32,23 @@ class SecurityEvent:
     details: str
     severity: str  # low, medium, high, critical
     log_source: str
+    
+    def __post_init__(self):
+        self.event_type = _intern(self.event_type)
+        self.hostname = _intern(self.hostname)
+        self.severity = _intern(self.severity)
+        self.log_source = _intern(self.log_source)
+
+
+@dataclass
+class LogCheckpoint:
+    """Read position within one log file, identified by (device, inode)"""
+    log_path: str  # Monitored path the file was (or still is) linked at
+    device: int
+    inode: int
+    offset: int  # Bytes consumed so far, always at a line boundary
+    fingerprint: str = ""  # Hash of the first fingerprint_size bytes
+    fingerprint_size: int = 0
 
 
 @dataclass
@@ -30,6 +61,7 @@ class ThreatPattern:
     enabled: bool = True
     threshold_count: int = 5
     time_window: int = 300  # seconds
+    aggregate: bool = False  # store one event per threshold_count matches in time_window, not one per line
 
 
 @dataclass
@@ -64,7 +96,14 @@ class EmailConfig:
 class MonitoringConfig:
     """System monitoring configuration"""
     log_paths: List[str] = None
-    check_interval: int = 60  # seconds
+    check_interval: int = 60  # seconds between full rescans of every log
+    watch_mode: str = "auto"  # auto, inotify or poll
+    poll_interval: float = 1.0  # seconds between stat checks when polling
+    max_bytes_per_cycle: int = 16 * 1024 * 1024  # per file, so one backlog cannot starve the rest
+    worker_threads: int = 4  # log files read and matched concurrently
+    match_processes: int = 0  # processes for regex matching; 0 matches in the reader threads
+    input_sources: List[str] = None  # journal[:MATCH], udp:// or tcp://host:port (no host: localhost), unix:///path
+    source_queue_batches: int = 64  # line batches buffered from input sources before they block
     max_events_memory: int = 10000
     database_retention_days: int = 30
     auto_detect_logs: bool = True
@@ -73,3 +112,5 @@ class MonitoringConfig:
     def __post_init__(self):
         if self.log_paths is None:
             self.log_paths = []
+        if self.input_sources is None:
+            self.input_sources = []
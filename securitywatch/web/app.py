@@ -13,10 +13,15 @@ import time
 from ..core.monitor import SecurityWatchMonitor
 from ..core.database import SecurityDatabase
 from ..core.analyzer import ThreatAnalyzer
+from ..core.incremental import IncrementalAnalyzer
 from ..core.reports import ReportGenerator
 from ..config.settings import SecurityWatchConfig
 
 
+# Largest page of events /api/events serves per request
+MAX_EVENTS_PAGE = 1000
+
+
 def create_app():
     """Create and configure Flask application"""
     app = Flask(__name__)
@@ -30,12 +35,14 @@ def create_app():
     monitor = SecurityWatchMonitor(config)
     database = SecurityDatabase()
     analyzer = ThreatAnalyzer(database, enable_ai=True)
+    incremental_analyzer = IncrementalAnalyzer(analyzer)
     report_generator = ReportGenerator(database)
     
     # Store components in app context
     app.config['MONITOR'] = monitor
     app.config['DATABASE'] = database
     app.config['ANALYZER'] = analyzer
+    app.config['INCREMENTAL_ANALYZER'] = incremental_analyzer
     app.config['REPORT_GENERATOR'] = report_generator
     app.config['CONFIG'] = config
     app.config['SOCKETIO'] = socketio
@@ -45,39 +52,51 @@ def create_app():
         """Main dashboard page"""
         # Get recent statistics
         stats = database.get_statistics()
-        recent_events = database.get_recent_events(24)
-        analysis = analyzer.analyze_events(recent_events)
+        analysis = incremental_analyzer.analyze(hours=24)
+        recent_events = list(database.iter_events(hours=24, limit=10))
         
         return render_template('dashboard.html',
                              stats=stats,
                              analysis=analysis,
-                             recent_events=recent_events[:10])
+                             recent_events=recent_events)
     
     @app.route('/api/stats')
     def api_stats():
         """API endpoint for dashboard statistics"""
+        # Counts come from the rollup tables; the threat score, brute force
+        # detection and AI analysis from the incrementally maintained window
         stats = database.get_statistics()
-        recent_events = database.get_recent_events(1)  # Last hour
-        analysis = analyzer.analyze_events(recent_events)
+        recent_stats = database.get_statistics(hours=1)  # Last hour
+        analysis = incremental_analyzer.analyze(hours=1)
         
         return jsonify({
             'total_events': stats.get('total_events', 0),
-            'recent_events': len(recent_events),
+            'recent_events': recent_stats.get('total_events', 0),
             'threat_score': analysis.get('threat_score', 0),
             'brute_force_attacks': len(analysis.get('brute_force_attempts', [])),
-            'severity_breakdown': dict(analysis.get('severity_breakdown', {})),
-            'top_ips': analysis.get('top_source_ips', {}),
+            'severity_breakdown': recent_stats.get('by_severity', {}),
+            'top_ips': dict(recent_stats.get('top_ips', [])),
             'ai_analysis': analysis.get('ai_analysis', {}),
             'ai_enabled': analysis.get('ai_enabled', False)
         })
     
     @app.route('/api/events')
     def api_events():
-        """API endpoint for recent events"""
+        """API endpoint for recent events, paginated with an opaque cursor"""
         hours = request.args.get('hours', 24, type=int)
-        limit = request.args.get('limit', 50, type=int)
+        limit = min(max(request.args.get('limit', 50, type=int), 1), MAX_EVENTS_PAGE)
         
-        events = database.get_recent_events(hours)[:limit]
+        try:
+            events, next_cursor = database.get_events_page(
+                limit=limit,
+                cursor=request.args.get('cursor'),
+                hours=hours,
+                severity=request.args.get('severity'),
+                source_ip=request.args.get('ip'),
+                event_type=request.args.get('event_type')
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         events_data = []
         for event in events:
@@ -90,7 +109,10 @@ def create_app():
                 'details': event.details[:100] + '...' if len(event.details) > 100 else event.details
             })
         
-        return jsonify(events_data)
+        response = jsonify(events_data)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
     
     @app.route('/api/analysis/<ip>')
     def api_ip_analysis(ip):
@@ -183,12 +205,12 @@ def create_app():
     def handle_stats_request():
         """Handle real-time stats request"""
         stats = database.get_statistics()
-        recent_events = database.get_recent_events(1)
-        analysis = analyzer.analyze_events(recent_events)
+        recent_stats = database.get_statistics(hours=1)
+        analysis = incremental_analyzer.analyze(hours=1)
         
         emit('stats_update', {
             'total_events': stats.get('total_events', 0),
-            'recent_events': len(recent_events),
+            'recent_events': recent_stats.get('total_events', 0),
             'threat_score': analysis.get('threat_score', 0),
             'timestamp': datetime.now().isoformat()
         })
@@ -200,14 +222,14 @@ def create_app():
             time.sleep(5)  # Update every 5 seconds
             
             stats = database.get_statistics()
-            recent_events = database.get_recent_events(1)
-            analysis = analyzer.analyze_events(recent_events)
+            recent_stats = database.get_statistics(hours=1)
+            analysis = incremental_analyzer.analyze(hours=1)
             
             socketio.emit('live_update', {
                 'total_events': stats.get('total_events', 0),
-                'recent_events': len(recent_events),
+                'recent_events': recent_stats.get('total_events', 0),
                 'threat_score': analysis.get('threat_score', 0),
-                'severity_breakdown': dict(analysis.get('severity_breakdown', {})),
+                'severity_breakdown': recent_stats.get('by_severity', {}),
                 'timestamp': datetime.now().isoformat()
             })
     
@@ -90,6 +90,8 @@ class SecurityWatchCLI:
         print("=" * 40)
         print(f"Status: {'🟢 Running' if status['running'] else '🔴 Stopped'}")
         print(f"Log Files: {status['log_files_monitored']}")
+        if status['input_sources']:
+            print(f"Input Sources: {', '.join(status['input_sources'])}")
         print(f"Total Events: {status['total_events']}")
         
         if status['events_by_severity']:
@@ -102,12 +104,14 @@ class SecurityWatchCLI:
             for ip, count in status['top_attacking_ips']:
                 print(f"  {ip}: {count} events")
     
-    def run_scan(self):
+    def run_scan(self, mapped: bool = False):
         """Run manual security scan"""
         print("🔍 Running manual security scan...")
-        result = self.monitor.run_manual_scan()
+        result = self.monitor.run_manual_scan(mapped)
         
         print(f"✅ Scan completed. Found {result['events_found']} security events")
+        print(f"⏱️  Scanned {result['bytes_scanned'] / 2**20:.1f} MB in {result['scan_seconds']:.2f}s "
+              f"({result['throughput_mb_s']:.1f} MB/s)")
         
         if result['events_found'] > 0:
             analysis = result['analysis']
@@ -119,6 +123,20 @@ class SecurityWatchCLI:
                 for rec in analysis['recommendations'][:3]:
                     print(f"  • {rec}")
     
+    def backfill(self, patterns: list):
+        """Ingest historical and compressed rotated logs"""
+        print(f"📦 Backfilling logs matching: {' '.join(patterns)}")
+        result = self.monitor.backfill(patterns)
+        
+        if not result['files']:
+            print("❌ No log files matched")
+            return
+        
+        for path, count in result['files'].items():
+            print(f"  {path}: {count} events")
+        print(f"✅ Backfill completed. Stored {result['events_stored']} of {result['events_found']} "
+              f"security events from {len(result['files'])} files")
+    
     def generate_report(self, report_type: str = 'html', hours: int = 24, 
                        output: str = None):
         """Generate security report"""
@@ -197,7 +215,8 @@ class SecurityWatchCLI:
     
     def show_recent_events(self, hours: int = 1, limit: int = 10):
         """Show recent security events"""
-        events = self.monitor.get_recent_events(hours)
+        database = self.monitor.database
+        events = list(database.iter_events(hours=hours, limit=limit))
         
         if not events:
             print(f"✅ No security events in the last {hours} hour(s)")
@@ -206,7 +225,7 @@ class SecurityWatchCLI:
         print(f"🚨 Recent Security Events (last {hours} hour(s)):")
         print("=" * 80)
         
-        for event in events[:limit]:
+        for event in events:
             severity_icon = {
                 'critical': '🔥',
                 'high': '⚠️',
@@ -219,8 +238,10 @@ class SecurityWatchCLI:
                   f"IP: {event.source_ip or 'Unknown'} | "
                   f"User: {event.username or 'Unknown'}")
         
-        if len(events) > limit:
-            print(f"... and {len(events) - limit} more events")
+        if len(events) == limit:
+            remaining = database.count_events(hours=hours) - limit
+            if remaining > 0:
+                print(f"... and {remaining} more events")
 
 
 def main():
@@ -232,6 +253,8 @@ def main():
 Examples:
   %(prog)s start --daemon          Start monitoring in daemon mode
   %(prog)s scan                    Run manual security scan
+  %(prog)s scan --mmap             Scan huge static logs through memory maps
+  %(prog)s backfill '/var/log/auth.log*'  Ingest a rotation set, including .gz files
   %(prog)s report --hours 24       Generate 24-hour HTML report
   %(prog)s analyze-ip 192.168.1.100  Analyze specific IP address
   %(prog)s events --hours 1        Show events from last hour
@@ -254,7 +277,14 @@ Examples:
     subparsers.add_parser('status', help='Show monitoring status')
     
     # Scan command
-    subparsers.add_parser('scan', help='Run manual security scan')
+    scan_parser = subparsers.add_parser('scan', help='Run manual security scan')
+    scan_parser.add_argument('--mmap', action='store_true',
+                             help='Memory-map plain log files and decode only candidate lines')
+    
+    # Backfill command
+    backfill_parser = subparsers.add_parser('backfill', help='Ingest historical and compressed rotated logs')
+    backfill_parser.add_argument('patterns', nargs='+',
+                                 help='Log files or glob patterns (.gz, .bz2, .xz and .zst are decompressed)')
     
     # Report command
     report_parser = subparsers.add_parser('report', help='Generate security report')
@@ -302,7 +332,9 @@ Examples:
         elif args.command == 'status':
             cli.show_status()
         elif args.command == 'scan':
-            cli.run_scan()
+            cli.run_scan(args.mmap)
+        elif args.command == 'backfill':
+            cli.backfill(args.patterns)
         elif args.command == 'report':
             cli.generate_report(args.type, args.hours, args.output)
         elif args.command == 'analyze-ip':
@@ -2,16 +2,64 @@
 SecurityWatch Pro - Core Component Tests
 """
 
+import bz2
+import gzip
+import io
+import lzma
+import os
+import numpy as np
 import pytest
 import tempfile
+import shutil
+import socket
 import sqlite3
-from datetime import datetime, timedelta
+import sys
+import threading
+from collections import Counter
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
-from securitywatch.core.database import SecurityDatabase
+from securitywatch.core.database import SecurityDatabase, SCHEMA_MIGRATIONS
 from securitywatch.core.patterns import LogPatternMatcher
+from securitywatch.core.aggregation import EventAggregator
 from securitywatch.core.analyzer import ThreatAnalyzer
+from securitywatch.core.bruteforce import BruteForceDetector, StreamingBruteForceDetector, attack_event
+from securitywatch.core.incremental import IncrementalAnalyzer
+from securitywatch.core.checkpoints import LogTracker, rotation_set
+from securitywatch.core.sources import (InputSource, InputSourceGroup, JournalExportParser, JournalSource,
+                                        SyslogSource, SyslogStreamFramer)
+from securitywatch.core.sketches import HeavyHitterCounter, HyperLogLog, SpaceSaving
+from securitywatch.core.readers import ChunkedLineReader, compression_of, open_log
+from securitywatch.core.timeline import Timeline, TimelineBuilder
+from securitywatch.core.timestamps import TimestampParser
+from securitywatch.core.tailer import InotifyWatcher, PollingWatcher, create_log_watcher
+from securitywatch.core.workers import LogWorkerPool, shard_ranges
 from securitywatch.models.events import SecurityEvent, ThreatPattern
+from securitywatch.models.batch import EventBatch
+
+
+class TestSecurityEvent:
+    """Test SecurityEvent model"""
+    
+    def test_slots_and_interned_fields(self):
+        """Test events carry no __dict__ and share low-cardinality strings"""
+        def fresh(value):
+            return value.encode().decode()
+        
+        now = datetime.now()
+        first, second = [
+            SecurityEvent(
+                timestamp=now, event_type=fresh("ssh_failed_login"),
+                source_ip="10.0.0.1", username="root", hostname=fresh("testhost"),
+                details="Failed login", severity=fresh("high"), log_source=fresh("/var/log/auth.log")
+            )
+            for _ in range(2)
+        ]
+        
+        assert not hasattr(first, '__dict__')
+        assert first == second
+        for field in ('event_type', 'hostname', 'severity', 'log_source'):
+            assert getattr(first, field) is getattr(second, field)
 
 
 class TestSecurityDatabase:
@@ -25,6 +73,7 @@ class TestSecurityDatabase:
     
     def teardown_method(self):
         """Cleanup test database"""
+        self.db.close()
         Path(self.temp_db.name).unlink(missing_ok=True)
     
     def test_database_initialization(self):
@@ -42,6 +91,115 @@ class TestSecurityDatabase:
         
         conn.close()
     
+    def test_connection_pool(self):
+        """Test connections are reused per thread and tuned for concurrency"""
+        conn = self.db._connection()
+        assert self.db._connection() is conn
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        
+        other = []
+        thread = threading.Thread(target=lambda: other.append(self.db._connection()))
+        thread.start()
+        thread.join()
+        assert other[0] is not conn
+    
+    def test_hot_queries_use_indexes(self):
+        """Test time-range, IP and statistics queries are served by indexes"""
+        conn = self.db._connection()
+        statements = []
+        conn.set_trace_callback(statements.append)
+        try:
+            self.db.get_recent_events(24)
+            self.db.get_ip_events("192.168.1.100", 24)
+            self.db.get_statistics()
+            self.db.get_statistics(hours=1)
+            self.db.add_event(SecurityEvent(
+                timestamp=datetime.now() - timedelta(days=40), event_type="old_event",
+                source_ip="192.168.1.100", username="", hostname="testhost",
+                details="Old event", severity="low", log_source="/var/log/test.log"
+            ))
+            self.db.cleanup_old_events(30)
+        finally:
+            conn.set_trace_callback(None)
+        
+        queries = [sql for sql in statements if sql.lstrip().upper().startswith(('SELECT', 'DELETE'))]
+        assert queries
+        for sql in queries:
+            plan = ' '.join(row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql))
+            assert 'INDEX' in plan or 'PRIMARY KEY' in plan, f"Full table scan for: {sql}\n{plan}"
+    
+    def test_schema_migration_of_existing_database(self):
+        """Test indexes and rollups are added to databases created before they existed"""
+        self.db.close()
+        Path(self.temp_db.name).unlink()
+        
+        conn = sqlite3.connect(self.temp_db.name)
+        conn.execute('''
+            CREATE TABLE security_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT NOT NULL,
+                event_type TEXT NOT NULL, source_ip TEXT, username TEXT, hostname TEXT,
+                details TEXT, severity TEXT NOT NULL, log_source TEXT,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        conn.execute(
+            "INSERT INTO security_events (timestamp, event_type, source_ip, severity) VALUES (?, ?, ?, ?)",
+            (datetime.now().isoformat(), "ssh_failed_login", "10.0.0.9", "medium"))
+        conn.commit()
+        conn.close()
+        
+        self.db = SecurityDatabase(self.temp_db.name)
+        conn = self.db._connection()
+        indexes = {row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='index' AND tbl_name='security_events'")}
+        
+        assert {'idx_events_timestamp', 'idx_events_ip_timestamp',
+                'idx_events_severity_timestamp', 'idx_events_type_timestamp'} <= indexes
+        assert 'idx_events_severity' not in indexes
+        assert self.db.get_schema_version() == SCHEMA_MIGRATIONS[-1][0]
+        
+        # Rollups are backfilled from the events already stored
+        assert self.db.get_statistics()['top_ips'] == [("10.0.0.9", 1)]
+    
+    def test_concurrent_schema_migration(self):
+        """Test processes opening an old database at once migrate it only once"""
+        now = datetime.now()
+        self.db.add_events([SecurityEvent(timestamp=now - timedelta(seconds=i), event_type="ssh_failed_login",
+                                          source_ip=f"10.0.{i >> 8 & 255}.{i & 255}", username="root",
+                                          hostname="host", details="", severity="medium",
+                                          log_source="/var/log/auth.log")
+                            for i in range(50_000)])
+        self.db.close()
+        
+        # Back to the schema before the rollups
+        conn = sqlite3.connect(self.temp_db.name)
+        conn.execute('DROP TABLE event_rollups')
+        conn.execute('PRAGMA user_version = 1')
+        conn.commit()
+        conn.close()
+        
+        barrier = threading.Barrier(3)
+        outcomes = []
+        
+        def open_database():
+            barrier.wait()
+            try:
+                SecurityDatabase(self.temp_db.name).close()
+                outcomes.append('ok')
+            except Exception as e:
+                outcomes.append(repr(e))
+        
+        threads = [threading.Thread(target=open_database) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert outcomes == ['ok'] * 3
+        
+        self.db = SecurityDatabase(self.temp_db.name)
+        assert self.db.get_schema_version() == SCHEMA_MIGRATIONS[-1][0]
+        assert self.db.get_statistics()['total_events'] == 50_000
+    
     def test_add_event(self):
         """Test adding security events"""
         event = SecurityEvent(
@@ -63,6 +221,126 @@ class TestSecurityDatabase:
         assert events[0].event_type == "test_event"
         assert events[0].source_ip == "192.168.1.100"
     
+    def test_add_events_batch(self):
+        """Test adding a batch of events in one transaction"""
+        events = [
+            SecurityEvent(
+                timestamp=datetime.now(),
+                event_type="ssh_failed_login",
+                source_ip=f"192.168.1.{i}",
+                username="root",
+                hostname="testhost",
+                details=f"Failed login {i}",
+                severity="medium",
+                log_source="/var/log/auth.log"
+            )
+            for i in range(25)
+        ]
+        
+        assert self.db.add_events(events) == 25
+        assert self.db.add_events([]) == 0
+        assert len(self.db.get_recent_events(1)) == 25
+    
+    def test_statistics_from_rollups(self):
+        """Test rollup statistics track inserts and retention cleanup"""
+        now = datetime.now()
+        for offset_days, severity, ip in [(0, "high", "10.0.0.1"), (0, "high", "10.0.0.1"),
+                                          (0, "low", ""), (40, "critical", "10.0.0.2")]:
+            self.db.add_event(SecurityEvent(
+                timestamp=now - timedelta(days=offset_days), event_type="ssh_failed_login",
+                source_ip=ip, username="root", hostname="testhost", details="Failed login",
+                severity=severity, log_source="/var/log/auth.log"
+            ))
+        
+        stats = self.db.get_statistics()
+        assert stats['total_events'] == 4
+        assert stats['by_severity'] == {'high': 2, 'low': 1, 'critical': 1}
+        assert stats['top_ips'][0] == ("10.0.0.1", 2)
+        assert self.db.get_statistics(hours=1)['total_events'] == 3
+        
+        assert self.db.cleanup_old_events(30) == 1
+        stats = self.db.get_statistics()
+        assert stats['total_events'] == 3
+        assert 'critical' not in stats['by_severity']
+        assert [ip for ip, _ in stats['top_ips']] == ["10.0.0.1"]
+    
+    def test_events_page_cursor(self):
+        """Test keyset pagination walks every event once, newest first"""
+        base_time = datetime.now() - timedelta(minutes=30)
+        self.db.add_events([
+            SecurityEvent(
+                timestamp=base_time + timedelta(seconds=i // 3), event_type="ssh_failed_login",
+                source_ip=f"10.0.0.{i % 2}", username="root", hostname="testhost",
+                details=f"Failed login {i}", severity="high" if i % 4 == 0 else "low",
+                log_source="/var/log/auth.log"
+            )
+            for i in range(25)
+        ])
+        
+        seen = []
+        cursor = None
+        while True:
+            events, cursor = self.db.get_events_page(limit=7, cursor=cursor, hours=1)
+            seen.extend(events)
+            if cursor is None:
+                break
+        
+        assert sorted(event.details for event in seen) == sorted(f"Failed login {i}" for i in range(25))
+        assert [e.timestamp for e in seen] == sorted((e.timestamp for e in seen), reverse=True)
+        
+        high = list(self.db.iter_events(hours=1, severity="high", page_size=2))
+        assert len(high) == self.db.count_events(hours=1, severity="high") == 7
+        assert self.db.count_events(source_ip="10.0.0.1") == 12
+        assert len(list(self.db.iter_events(limit=5))) == 5
+        
+        # Later pages must stay index range searches without a sort step
+        conn = self.db._connection()
+        statements = []
+        conn.set_trace_callback(statements.append)
+        try:
+            for filters in ({}, {'severity': "high"}, {'source_ip': "10.0.0.1"}):
+                _, cursor = self.db.get_events_page(limit=2, hours=1, **filters)
+                self.db.get_events_page(limit=2, cursor=cursor, hours=1, **filters)
+        finally:
+            conn.set_trace_callback(None)
+        for sql in statements:
+            plan = ' '.join(row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql))
+            assert 'TEMP B-TREE' not in plan, f"Sorted page for: {sql}\n{plan}"
+        
+        with pytest.raises(ValueError):
+            self.db.get_events_page(cursor="not-a-cursor")
+        for limit in (0, -1):
+            with pytest.raises(ValueError):
+                self.db.get_events_page(limit=limit)
+    
+    def test_event_batch_from_database(self):
+        """Test EventBatch loads columns directly and round-trips events"""
+        base_time = datetime(2026, 1, 5, 10, 30, 0, 250000)
+        events = [
+            SecurityEvent(
+                timestamp=base_time - timedelta(minutes=i), event_type="ssh_failed_login",
+                source_ip="10.0.0.1" if i % 2 else "", username="root", hostname="testhost",
+                details=f"Failed login {i}", severity="high" if i % 3 else "low",
+                log_source="/var/log/auth.log"
+            )
+            for i in range(6)
+        ]
+        self.db.add_events(events)
+        
+        batch = self.db.get_event_batch()
+        assert len(batch) == 6
+        assert batch.to_events() == events  # Newest first, like get_recent_events
+        assert batch.counts('severity') == {'low': 2, 'high': 4}
+        assert batch.codes['source_ip'].dtype == np.int32
+        assert batch.hours.tolist() == [e.timestamp.hour for e in events]
+        assert batch.epoch_seconds[0] - batch.epoch_seconds[1] == 60
+        
+        high = batch[batch.column('severity') == 'high']
+        assert [e.details for e in high] == [e.details for e in events if e.severity == 'high']
+        assert batch[0] == events[0]
+        assert len(self.db.get_event_batch(source_ip="10.0.0.1")) == 3
+        assert len(self.db.get_event_batch(severity="critical")) == 0
+    
     def test_ip_reputation_update(self):
         """Test IP reputation tracking"""
         self.db.update_ip_reputation("192.168.1.100", "high")
@@ -78,6 +356,23 @@ class TestSecurityDatabase:
         
         assert score == 30  # high (10) + critical (20)
     
+    def test_ip_reputation_batch_deltas(self):
+        """Test aggregated reputation deltas add up like per-event updates"""
+        now = datetime.now().isoformat()
+        self.db.update_ip_reputation("10.0.0.5", "high")
+        self.db.apply_ip_reputation_deltas({
+            "10.0.0.5": {'score': 45, 'count': 3, 'first_seen': now, 'last_seen': now},
+            "10.0.0.6": {'score': 5, 'count': 1, 'first_seen': now, 'last_seen': now}
+        })
+        
+        conn = sqlite3.connect(self.temp_db.name)
+        rows = dict((row[0], row[1:]) for row in conn.execute(
+            "SELECT ip_address, reputation_score, event_count, is_blocked FROM ip_reputation"))
+        conn.close()
+        
+        assert rows["10.0.0.5"] == (55, 4, 1)
+        assert rows["10.0.0.6"] == (5, 1, 0)
+    
     def test_cleanup_old_events(self):
         """Test cleanup of old events"""
         # Add old event
@@ -200,6 +495,478 @@ class TestLogPatternMatcher:
         events = self.matcher.match_patterns(log_line, "/var/log/auth.log")
         
         assert len(events) == 1  # Pattern should work again
+    
+    def test_patterns_compiled_once(self):
+        """Test patterns are only recompiled when the pattern set changes"""
+        compiled = self.matcher.compiled
+        self.matcher.match_patterns("Invalid user hacker from 10.0.0.1", "/var/log/auth.log")
+        assert self.matcher.compiled is compiled
+        
+        self.matcher.disable_pattern("SSH Invalid User")
+        assert self.matcher.compiled is not compiled
+        assert "SSH Invalid User" not in [p.name for p in self.matcher.compiled.patterns]
+    
+    def test_prefilter_is_case_insensitive(self):
+        """Test literal prefiltering keeps case-insensitive semantics"""
+        log_line = "FAILED PASSWORD FOR admin FROM 192.168.1.100 port 22 ssh2"
+        events = self.matcher.match_patterns(log_line, "/var/log/auth.log")
+        
+        assert [e.event_type for e in events] == ["ssh_failed_login"]
+        assert events[0].username == "admin"
+    
+    def test_raw_bytes_lines_match_like_text(self):
+        """Test undecoded lines give the same events as decoded ones"""
+        lines = [
+            "Jan 1 sshd[1]: Failed password for root from 192.168.1.100 port 22 ssh2",
+            "GET /index.php?id=1 UNION SELECT password FROM users",
+            "GET /../../etc/passwd",
+            "Jan 1 sshd[1]: Accepted publickey for deploy from 10.0.0.5",
+            "Jan 1 sshd[1]: Failed password for jos\u00e9 from 192.168.1.7 port 22 ssh2",
+        ]
+        for line in lines:
+            text_events = self.matcher.match_patterns(line, "/var/log/auth.log")
+            byte_events = self.matcher.match_patterns(line.encode(), "/var/log/auth.log")
+            assert [(e.event_type, e.source_ip, e.username, e.details) for e in byte_events] == \
+                   [(e.event_type, e.source_ip, e.username, e.details) for e in text_events]
+    
+    def test_raw_bytes_prefiltered_before_decoding(self):
+        """Test raw lines are prefiltered on their bytes and counted like text"""
+        lines = [b"Normal system startup message", b"CRON[42]: session opened for user root",
+                 b"Jan 1 sshd[1]: FAILED PASSWORD for admin from 192.168.1.100 port 22"]
+        compiled = self.matcher.compiled
+        assert compiled.decode_candidates(lines) == [lines[2].decode()]
+        
+        self.matcher.reset_prefilter_stats()
+        self.matcher.match_lines([line.decode() for line in lines], "/var/log/auth.log")
+        text_stats = self.matcher.get_prefilter_stats()
+        self.matcher.reset_prefilter_stats()
+        self.matcher.match_lines(lines, "/var/log/auth.log")
+        assert self.matcher.get_prefilter_stats() == text_stats
+    
+    def test_prefilter_rejects_lines_without_anchors(self):
+        """Test lines without any required literal skip the anchored patterns"""
+        self.matcher.match_patterns("Normal system startup message", "/var/log/syslog")
+        self.matcher.match_patterns("Failed password for admin from 192.168.1.100 port 22",
+                                    "/var/log/auth.log")
+        
+        stats = self.matcher.get_prefilter_stats()
+        assert stats["SSH Failed Login"] == {'evaluated': 1, 'prefiltered': 1, 'matched': 1}
+        assert stats["SSH Invalid User"] == {'evaluated': 0, 'prefiltered': 2, 'matched': 0}
+        
+        # Counters survive recompilation of the pattern set
+        self.matcher.disable_pattern("SSH Invalid User")
+        assert self.matcher.get_prefilter_stats()["SSH Failed Login"]['evaluated'] == 1
+
+
+class TestBruteForceDetector:
+    """Test sliding-window brute force detection"""
+    
+    @staticmethod
+    def _attempts(ip, start, offsets, username="root"):
+        return [SecurityEvent(timestamp=start + timedelta(seconds=offset), event_type="ssh_failed_login",
+                              source_ip=ip, username=username, hostname="host",
+                              details="Failed password", severity="medium", log_source="/var/log/auth.log")
+                for offset in offsets]
+    
+    def test_burst_inside_long_campaign(self):
+        """Test a burst is found even when the IP's attempts span hours"""
+        start = datetime(2026, 3, 1, 8, 0, 0)
+        events = (self._attempts("203.0.113.5", start, range(0, 6 * 3600, 1800)) +     # slow probing
+                  self._attempts("203.0.113.5", start, range(7200, 7260, 5), "admin") +  # 12 in a minute
+                  self._attempts("198.51.100.7", start, [0, 700, 1400, 2100, 2800, 3500]))
+        
+        attacks = BruteForceDetector().detect(EventBatch.from_events(events))
+        assert [a['source_ip'] for a in attacks] == ["203.0.113.5"]
+        attack = attacks[0]
+        assert attack['attempt_count'] == 13  # The burst plus the probe at 7200s
+        assert attack['first_attempt'] == start + timedelta(seconds=7200)
+        assert attack['last_attempt'] == start + timedelta(seconds=7255)
+        assert attack['usernames_targeted'] == ["admin", "root"]
+        assert attack['total_attempts'] == 24 and attack['burst_count'] == 1
+        assert attack['severity'] == 'high'
+    
+    def test_window_edges_and_separate_bursts(self):
+        """Test the window is inclusive and distant bursts are counted apart"""
+        start = datetime(2020, 1, 1)
+        events = (self._attempts("10.0.0.1", start, [0, 150, 300, 450, 600]) +
+                  self._attempts("10.0.0.1", start + timedelta(days=900), [0, 1, 2, 3, 4]) +
+                  self._attempts("10.0.0.2", start, [0, 150, 300, 450, 601]))
+        
+        detector = BruteForceDetector()
+        attacks = detector.detect(EventBatch.from_events(events))
+        assert [(a['source_ip'], a['attempt_count'], a['burst_count']) for a in attacks] == \
+               [("10.0.0.1", 5, 2)]
+        assert attacks[0]['time_span_seconds'] == 600
+        assert detector.detect_events(events) == attacks
+    
+    def test_streaming_reports_each_burst_once(self):
+        """Test the streaming detector flags a burst inside a slow campaign as it starts"""
+        start = datetime(2026, 3, 1, 8, 0, 0)
+        events = sorted(self._attempts("203.0.113.5", start, range(0, 6 * 3600, 1800)) +
+                        self._attempts("203.0.113.5", start, range(7200, 7260, 5), "admin") +
+                        self._attempts("203.0.113.5", start, range(9000, 9005)) +
+                        self._attempts("198.51.100.7", start, [0, 700, 1400, 2100, 2800, 3500]),
+                        key=lambda e: e.timestamp)
+        
+        findings = StreamingBruteForceDetector().observe_events(events)
+        assert [(a['source_ip'], a['burst_count'], t.timestamp) for a, t in findings] == [
+            ("203.0.113.5", 1, start + timedelta(seconds=7215)),  # 5th attempt within 600s
+            ("203.0.113.5", 2, start + timedelta(seconds=9003))]  # With the probe at 9000s
+        attack, trigger = findings[0]
+        assert attack['attempt_count'] == 5 and attack['usernames_targeted'] == ["admin", "root"]
+        assert attack['first_attempt'] == start + timedelta(seconds=7200)
+        
+        event = attack_event(attack, trigger)
+        assert event.event_type == "brute_force_attack" and event.source_ip == "203.0.113.5"
+        assert event.timestamp == trigger.timestamp and event.severity == "high"
+        assert event.username == "" and event.details.endswith("usernames targeted: admin, root")
+    
+    def test_streaming_pattern_rules(self):
+        """Test thresholds and windows come from the patterns of each event type"""
+        patterns = [ThreatPattern("SSH Failed Login", "", r"x", "medium", threshold_count=3, time_window=60)]
+        detector = StreamingBruteForceDetector(patterns)
+        start = datetime(2026, 3, 1)
+        windows = [SecurityEvent(timestamp=start + timedelta(seconds=s), event_type="windows_failed_login",
+                                 source_ip="10.0.0.1", username="", hostname="dc", details="4625",
+                                 severity="medium", log_source="Security")
+                   for s in (1, 2)]
+        
+        # Three SSH failures in a minute trip the pattern's rule; Windows ones keep their own count
+        assert not detector.observe_events(windows + self._attempts("10.0.0.1", start, [0, 30]))
+        [(attack, _)] = detector.observe_events(self._attempts("10.0.0.1", start, [60]))
+        assert attack['attempt_count'] == 3 and attack['total_attempts'] == 3
+        assert not detector.observe_events(self._attempts("10.0.0.2", start, [0, 30, 61]))
+        
+        # A late attempt is slotted in time order
+        assert detector.observe_events(self._attempts("10.0.0.2", start, [45]))
+    
+    @staticmethod
+    def _sshd_failures(ip, user, offsets):
+        """auth.log lines of real sshd password failures: a PAM line, then sshd's own"""
+        start = datetime(2026, 3, 1, 8, 0, 0)
+        lines = []
+        for offset in offsets:
+            stamp = (start + timedelta(seconds=offset)).strftime('%b %d %H:%M:%S')
+            lines.append(f"{stamp} bastion sshd[{offset}]: pam_unix(sshd:auth): authentication failure; "
+                         f"logname= uid=0 euid=0 tty=ssh ruser= rhost={ip}  user={user}")
+            lines.append(f"{stamp} bastion sshd[{offset}]: Failed password for {user} from {ip} "
+                         f"port 50022 ssh2")
+        return lines
+    
+    def test_streaming_and_batch_detectors_agree(self, tmp_path, monkeypatch):
+        """Test live alerts on ingested auth.log lines match detection on the stored rows"""
+        monkeypatch.chdir(tmp_path)
+        from securitywatch.core.monitor import SecurityWatchMonitor
+        monitor = SecurityWatchMonitor()
+        try:
+            lines = sorted(self._sshd_failures("203.0.113.5", "alice", [0, 40, 80, 120]) +  # Four only
+                           self._sshd_failures("198.51.100.7", "bob", [0, 60, 120, 180, 240, 300]) +
+                           self._sshd_failures("192.0.2.9", "carol", [0, 150, 300, 450, 601]),  # Too slow
+                           key=lambda line: line[:15])
+            events = monitor.pattern_matcher.match_lines(lines, "/var/log/auth.log")
+            stored = monitor._ingest([events], [])
+            
+            live = {event.source_ip for event in stored if event.event_type == "brute_force_attack"}
+            rows = [event for event in monitor.database.iter_events()
+                    if event.event_type != "brute_force_attack"]
+            dashboard = {attack['source_ip'] for attack in BruteForceDetector().detect_events(rows)}
+            assert live == dashboard == {"198.51.100.7"}
+        finally:
+            monitor.database.close()
+    
+    def test_streaming_memory_is_bounded(self):
+        """Test idle IPs are evicted least recently active first"""
+        detector = StreamingBruteForceDetector(max_ips=2)
+        start = datetime(2026, 3, 1)
+        for ip in ("10.0.0.1", "10.0.0.2", "10.0.0.1", "10.0.0.3"):
+            detector.observe_events(self._attempts(ip, start, [0]))
+        assert len(detector) == 2 and detector.evicted == 1
+        
+        # 10.0.0.1 kept both attempts; 10.0.0.2 was evicted, so its earlier one no longer counts
+        assert detector.observe_events(self._attempts("10.0.0.1", start, [1, 2, 3]))
+        assert not detector.observe_events(self._attempts("10.0.0.2", start, [1, 2, 3, 4]))
+
+
+class TestEventAggregator:
+    """Test thresholded patterns are stored once per crossing"""
+    
+    def setup_method(self):
+        self.patterns = LogPatternMatcher().patterns
+        self.start = datetime(2026, 3, 1, 12, 0, 0)
+    
+    def _events(self, event_type, ip, offsets, username=""):
+        return [SecurityEvent(timestamp=self.start + timedelta(seconds=offset), event_type=event_type,
+                              source_ip=ip, username=username, hostname="host", details=f"line {offset}",
+                              severity="medium", log_source="/var/log/syslog")
+                for offset in offsets]
+    
+    def test_threshold_crossing_emits_one_event(self):
+        """Test a port scan becomes one event per window and other patterns pass through"""
+        scan = self._events("port_scanning", "203.0.113.5", range(0, 100, 2))   # 50 in 100s
+        later = self._events("port_scanning", "203.0.113.5", range(400, 440))  # 40 more after the window
+        other = self._events("ssh_failed_login", "203.0.113.5", [1, 2, 3])
+        events = sorted(scan + later + other, key=lambda e: e.timestamp)
+        
+        aggregator = EventAggregator()
+        stored = aggregator.aggregate(events, self.patterns)
+        scans = [e for e in stored if e.event_type == "port_scanning"]
+        assert len(stored) == 5 and len(scans) == 2
+        assert scans[0].timestamp == self.start + timedelta(seconds=38)  # 20th match
+        assert scans[0].details.startswith("20 matches in 38s (threshold 20 in 300s); last: line 38")
+        assert scans[1].timestamp == self.start + timedelta(seconds=419)
+        assert aggregator.absorbed == 90 - 2
+    
+    def test_keys_and_windows(self):
+        """Test counts are kept per key and expire with the window"""
+        aggregator = EventAggregator()
+        # Username-keyed pattern: 9 per user never reaches 10
+        events = (self._events("rapid_failed_logins", "", range(9), username="alice") +
+                  self._events("rapid_failed_logins", "", range(9), username="bob"))
+        assert aggregator.aggregate(events, self.patterns) == []
+        
+        # Spread wider than the window, the count never builds up
+        slow = self._events("multiple_authentication_failures", "10.0.0.1", range(0, 3000, 100))
+        assert aggregator.aggregate(slow, self.patterns) == []
+        assert len(aggregator.aggregate(self._events("rapid_failed_logins", "", [10], username="alice"),
+                                        self.patterns)) == 1
+    
+    def test_memory_is_bounded(self):
+        """Test idle counters are evicted least recently active first"""
+        aggregator = EventAggregator(max_keys=3)
+        for i in range(10):
+            aggregator.aggregate(self._events("port_scanning", f"10.0.0.{i}", [i]), self.patterns)
+        assert len(aggregator) == 3 and aggregator.evicted == 7
+
+
+class TestSketches:
+    """Test heavy hitter and distinct count sketches against exact counts"""
+    
+    @staticmethod
+    def _stream(count, seed=11):
+        """Source IPs with a heavy-tailed (Zipf) distribution"""
+        rng = np.random.default_rng(seed)
+        return [f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}"
+                for i in (rng.zipf(1.3, count) % 1_000_000).tolist()]
+    
+    def test_space_saving_error_bounds(self):
+        """Test estimates overcount by at most total / capacity"""
+        items = self._stream(200_000)
+        exact = Counter(items)
+        sketch = SpaceSaving(capacity=200)
+        sketch.update(items)
+        
+        assert len(sketch) == 200
+        assert sketch.total == len(items)
+        assert sketch.max_error == len(items) // 200
+        for ip, count in exact.items():
+            if count > sketch.max_error:
+                assert ip in sketch  # Every heavy hitter is tracked
+        for ip, estimate in sketch.most_common():
+            assert sketch.guaranteed(ip) <= exact[ip] <= estimate <= exact[ip] + sketch.max_error
+        assert [ip for ip, _ in sketch.most_common(10)] == [ip for ip, _ in exact.most_common(10)]
+    
+    def test_space_saving_exact_within_capacity(self):
+        """Test counts are exact while the items fit"""
+        items = self._stream(5000)
+        exact = Counter(items)
+        sketch = SpaceSaving(capacity=len(exact))
+        for ip in items:
+            sketch.add(ip)
+        assert dict(sketch.most_common()) == dict(exact)
+        
+        weighted = SpaceSaving(error=0.01)
+        assert weighted.capacity == 100
+        weighted.add("10.0.0.1", 50)
+        weighted.add("10.0.0.1", 25)
+        assert weighted["10.0.0.1"] == 75
+        assert weighted["10.0.0.2"] == 0
+        with pytest.raises(ValueError):
+            SpaceSaving(error=0)
+    
+    @pytest.mark.parametrize("distinct", [0, 1, 100, 5000, 200_000])
+    def test_hyperloglog_accuracy(self, distinct):
+        """Test distinct counts stay within a few standard errors"""
+        sketch = HyperLogLog(precision=12)
+        for repeat in range(2):  # Duplicates must not count
+            sketch.update(f"192.168.{i >> 8}.{i & 255}:{i}" for i in range(distinct))
+        
+        standard_error = 1.04 / (2 ** 12) ** 0.5
+        assert abs(sketch.count() - distinct) <= max(2, 4 * standard_error * distinct)
+    
+    def test_heavy_hitter_counter_switches_to_sketches(self):
+        """Test counts stay exact up to the sketch capacity and bounded past it"""
+        items = self._stream(20_000)
+        exact = Counter(items)
+        
+        small = HeavyHitterCounter(error=1 / len(exact))
+        for ip in items:
+            small.add(ip)
+        assert small.exact
+        assert small.most_common(10) == exact.most_common(10)
+        assert small.distinct() == len(exact)
+        
+        bounded = HeavyHitterCounter(error=0.01)
+        for ip in items:
+            bounded.add(ip)
+        assert not bounded.exact
+        for ip, estimate in bounded.most_common(3):
+            assert exact[ip] <= estimate <= exact[ip] + 0.01 * len(items)
+        assert bounded.distinct() == pytest.approx(len(exact), rel=0.05)
+        
+        unbounded = HeavyHitterCounter(error=None)
+        for ip in items:
+            unbounded.add(ip)
+        assert unbounded.exact and unbounded.distinct() == len(exact)
+    
+    def test_analysis_memory_bounded(self):
+        """Test streamed analyses keep only the top entries of millions of possible IPs"""
+        temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        temp_db.close()
+        db = SecurityDatabase(temp_db.name)
+        try:
+            items = self._stream(30_000)
+            now = datetime.now()
+            events = (SecurityEvent(timestamp=now, event_type="sql_injection_attempt", source_ip=ip,
+                                    username="", hostname="testhost", details="test",
+                                    severity="high", log_source="/var/log/nginx/access.log")
+                      for ip in items)
+            analyzer = ThreatAnalyzer(db, enable_ai=False, heavy_hitter_error=0.005)
+            analysis = analyzer.analyze_events(events)
+            from_list = analyzer.analyze_events([SecurityEvent(
+                timestamp=now, event_type="sql_injection_attempt", source_ip=ip, username="",
+                hostname="testhost", details="test", severity="high",
+                log_source="/var/log/nginx/access.log") for ip in items])
+        finally:
+            db.close()
+            Path(temp_db.name).unlink(missing_ok=True)
+        
+        exact = Counter(items)
+        assert len(analysis['top_source_ips']) == 10
+        for ip, count in exact.most_common(3):
+            assert count <= analysis['top_source_ips'][ip] <= count + 0.005 * len(items)
+        assert analysis['distinct_source_ips'] == pytest.approx(len(exact), rel=0.05)
+        
+        # A list is already in memory, so it is counted exactly
+        assert from_list['top_source_ips'] == Counter(dict(exact.most_common(10)))
+        assert from_list['distinct_source_ips'] == len(exact)
+
+
+class TestTimeline:
+    """Test vectorized timeline histograms against per-event datetime fields"""
+    
+    @staticmethod
+    def _timestamps(count, seed=17):
+        """Random times over two months, in random order"""
+        rng = np.random.default_rng(seed)
+        base = datetime(2025, 2, 20, 13, 30)
+        return [base + timedelta(seconds=int(offset), microseconds=int(micro))
+                for offset, micro in zip(rng.integers(-30 * 86400, 30 * 86400, count), rng.integers(0, 10**6, count))]
+    
+    def test_histograms_match_datetime_fields(self):
+        """Test hour, weekday and calendar day bins against datetime attributes"""
+        timestamps = self._timestamps(5000)
+        timeline = Timeline.from_timestamps(timestamps)
+        
+        assert timeline.total == 5000
+        assert timeline.hourly.tolist() == [sum(1 for t in timestamps if t.hour == h) for h in range(24)]
+        assert timeline.weekdays.tolist() == [sum(1 for t in timestamps if t.weekday() == d) for d in range(7)]
+        assert timeline.daily_distribution() == dict(sorted(Counter(t.strftime('%Y-%m-%d') for t in timestamps).items()))
+        assert timeline.hourly_distribution() == dict(Counter(t.hour for t in timestamps))
+    
+    def test_chunked_and_batch_timelines_agree(self):
+        """Test streaming chunks (extending the day range both ways) and batches bin alike"""
+        timestamps = self._timestamps(3000)
+        whole = Timeline.from_timestamps(timestamps).summary()
+        
+        builder = TimelineBuilder(chunk_size=256)
+        for timestamp in timestamps:
+            builder.add(timestamp)
+        assert builder.finish().summary() == whole
+        
+        batch = EventBatch.from_events([
+            SecurityEvent(timestamp=t, event_type="ssh_failed_login", source_ip="10.0.0.1", username="root",
+                          hostname="testhost", details="", severity="low", log_source="/var/log/auth.log")
+            for t in timestamps
+        ])
+        assert Timeline.from_batch(batch).summary() == whole
+    
+    def test_aware_timestamps_use_wall_clock(self):
+        """Test offsets are ignored, as timestamp.hour ignores them"""
+        aware = datetime(2025, 3, 1, 23, 15, tzinfo=timezone(timedelta(hours=-5)))
+        timeline = Timeline.from_timestamps([aware, datetime(2025, 3, 2, 1, 0)])
+        
+        assert timeline.hourly_distribution() == {23: 1, 1: 1}
+        assert timeline.daily_distribution() == {'2025-03-01': 1, '2025-03-02': 1}
+    
+    def test_summary(self):
+        """Test peaks, weekday distribution and ties going to the earliest bin"""
+        timestamps = [datetime(2025, 3, 3, 10), datetime(2025, 3, 3, 10, 5),   # Monday
+                      datetime(2025, 3, 8, 22), datetime(2025, 3, 8, 22, 30)]  # Saturday
+        summary = Timeline.from_timestamps(timestamps).summary()
+        
+        assert summary['peak_hour'] == {'hour': 10, 'events': 2}
+        assert summary['peak_day'] == {'date': '2025-03-03', 'events': 2}
+        assert summary['peak_weekday'] == {'day': 'Monday', 'events': 2}
+        assert summary['weekday_distribution']['Saturday'] == 2
+        assert summary['total_days_with_events'] == 2
+        assert Timeline().summary() == {}
+
+
+class TestTimestampParser:
+    """Test event times taken from the log lines"""
+    
+    def setup_method(self):
+        self.parser = TimestampParser()
+        self.now = datetime(2026, 3, 10, 12, 0, 0)
+    
+    def test_supported_formats(self):
+        """Test syslog, ISO-8601, CLF and Windows timestamps"""
+        def utc(*args):
+            return datetime(*args, tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+        
+        cases = [
+            ("Mar  9 23:15:02 bastion sshd[811]: Failed password for root from 203.0.113.5",
+             datetime(2026, 3, 9, 23, 15, 2)),
+            ("<38>Mar 10 08:00:00 bastion sshd[811]: Invalid user oracle from 203.0.113.5",
+             datetime(2026, 3, 10, 8, 0, 0)),
+            ("2026-03-09T23:15:02.123456789+00:00 bastion sshd[811]: session opened",
+             utc(2026, 3, 9, 23, 15, 2, 123456)),
+            ("2026-03-09 23:15:02,500 app ERROR login failed", datetime(2026, 3, 9, 23, 15, 2, 500000)),
+            ('203.0.113.5 - - [09/Mar/2026:23:15:02 -0500] "GET /../../etc/passwd HTTP/1.1" 404 0',
+             utc(2026, 3, 10, 4, 15, 2)),
+            ("Information\t3/9/2026 11:15:02 PM\tMicrosoft-Windows-Security-Auditing\t4625",
+             datetime(2026, 3, 9, 23, 15, 2)),
+            ("no timestamp here", None),
+        ]
+        for line, expected in cases:
+            assert TimestampParser().parse(line, now=self.now) == expected, line
+    
+    def test_syslog_year_rollover(self):
+        """Test a December line read in January belongs to the previous year"""
+        january = datetime(2026, 1, 1, 0, 5, 0)
+        assert self.parser.parse("Dec 31 23:59:58 host kernel: x", now=january) == \
+               datetime(2025, 12, 31, 23, 59, 58)
+        assert self.parser.parse("Jan  1 00:04:59 host kernel: x", now=january) == \
+               datetime(2026, 1, 1, 0, 4, 59)
+    
+    def test_format_remembered_per_source(self):
+        """Test each log source keeps the format it was last recognised in"""
+        self.parser.parse('1.2.3.4 - - [09/Mar/2026:23:15:02 +0000] "GET /"', "/var/log/nginx/access.log")
+        self.parser.parse("Mar  9 23:15:02 host sshd[1]: x", "/var/log/auth.log")
+        assert self.parser.format_of("/var/log/nginx/access.log") == "clf"
+        assert self.parser.format_of("/var/log/auth.log") == "syslog"
+        assert self.parser.format_of("/var/log/unknown.log") is None
+    
+    def test_events_use_logged_time(self):
+        """Test matched events carry the time from the line, not the scan time"""
+        matcher = LogPatternMatcher()
+        line = "Mar  9 23:15:02 bastion sshd[811]: Failed password for admin from 203.0.113.5 port 22"
+        events = matcher.match_patterns(line, "/var/log/auth.log")
+        assert events[0].timestamp.strftime("%m-%d %H:%M:%S") == "03-09 23:15:02"
+        
+        before = datetime.now()
+        events = matcher.match_patterns("Failed password for admin from 203.0.113.5", "/var/log/auth.log")
+        assert events[0].timestamp >= before
 
 
 class TestThreatAnalyzer:
@@ -214,6 +981,7 @@ class TestThreatAnalyzer:
     
     def teardown_method(self):
         """Cleanup test database"""
+        self.db.close()
         Path(self.temp_db.name).unlink(missing_ok=True)
     
     def test_basic_analysis(self):
@@ -276,6 +1044,63 @@ class TestThreatAnalyzer:
         assert attack['attempt_count'] == 10
         assert attack['severity'] in ['high', 'critical']
     
+    def test_streaming_analysis_matches_list(self):
+        """Test analyzing an iterator gives the same results as a list"""
+        base_time = datetime.now()
+        events = [
+            SecurityEvent(
+                timestamp=base_time + timedelta(seconds=i * 10),
+                event_type="ssh_failed_login" if i % 3 else "sql_injection_attempt",
+                source_ip=f"192.168.1.{i % 2}",
+                username=f"user{i}",
+                hostname="testhost",
+                details=f"Event {i}",
+                severity="critical" if i % 3 == 0 else "medium",
+                log_source="/var/log/auth.log"
+            )
+            for i in range(30)
+        ]
+        
+        from_list = self.analyzer.analyze_events(events)
+        from_iter = self.analyzer.analyze_events(iter(events))
+        
+        for key in ('total_events', 'severity_breakdown', 'top_source_ips',
+                    'timeline_analysis', 'threat_score'):
+            assert from_iter[key] == from_list[key]
+        assert ([a['attempt_count'] for a in from_iter['brute_force_attempts']] ==
+                [a['attempt_count'] for a in from_list['brute_force_attempts']])
+    
+    def test_batch_analysis_matches_list(self):
+        """Test the columnar EventBatch path gives the same results as a list"""
+        base_time = datetime.now().replace(hour=12)
+        events = [
+            SecurityEvent(
+                timestamp=base_time + timedelta(seconds=i * 7),
+                event_type="ssh_failed_login" if i % 4 else "sql_injection_attempt",
+                source_ip=f"192.168.1.{i % 3}" if i % 5 else "",
+                username=f"user{i % 4}" if i % 6 else "",
+                hostname="testhost",
+                details=f"Event {i}",
+                severity=("critical", "high", "medium")[i % 3],
+                log_source="/var/log/auth.log"
+            )
+            for i in range(40)
+        ]
+        
+        from_list = self.analyzer.analyze_events(events)
+        from_batch = self.analyzer.analyze_events(EventBatch.from_events(events))
+        
+        for key in ('total_events', 'severity_breakdown', 'top_source_ips', 'top_usernames',
+                    'timeline_analysis', 'threat_score'):
+            assert from_batch[key] == from_list[key]
+        
+        def normalize(attacks):
+            return [dict(attack, usernames_targeted=sorted(attack['usernames_targeted']))
+                    for attack in attacks]
+        
+        assert from_list['brute_force_attempts']
+        assert normalize(from_batch['brute_force_attempts']) == normalize(from_list['brute_force_attempts'])
+    
     def test_threat_score_calculation(self):
         """Test threat score calculation"""
         # Test with no events
@@ -351,5 +1176,640 @@ class TestThreatAnalyzer:
         assert 'admin' in analysis['usernames_targeted']
 
 
+
+class TestIncrementalAnalyzer:
+    """Test the sliding-window incremental analyzer"""
+    
+    def setup_method(self):
+        """Setup database, analyzer and incremental analyzer"""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.temp_db.close()
+        self.db = SecurityDatabase(self.temp_db.name)
+        self.analyzer = ThreatAnalyzer(self.db, enable_ai=False)
+        self.incremental = IncrementalAnalyzer(self.analyzer)
+    
+    def teardown_method(self):
+        """Cleanup test database"""
+        self.db.close()
+        Path(self.temp_db.name).unlink(missing_ok=True)
+    
+    @staticmethod
+    def _events(count, oldest_seconds, newest_seconds, seed=3):
+        """Failed logins and web attacks at random times in the past"""
+        rng = np.random.default_rng(seed)
+        now = datetime.now()
+        return [
+            SecurityEvent(
+                timestamp=now - timedelta(seconds=int(rng.integers(newest_seconds, oldest_seconds))),
+                event_type=("ssh_failed_login", "sql_injection_attempt")[i % 2],
+                source_ip=f"10.0.0.{rng.integers(1, 40)}",
+                username=f"user{rng.integers(0, 5)}" if i % 2 == 0 else "",
+                hostname="testhost",
+                details="test",
+                severity=("low", "medium", "high", "critical")[i % 4],
+                log_source="/var/log/auth.log"
+            )
+            for i in range(count)
+        ]
+    
+    def _assert_matches_full_analysis(self, hours):
+        """Compare an incremental analysis with analyze_events over the same window"""
+        incremental = self.incremental.analyze(hours=hours)
+        full = self.analyzer.analyze_events(self.db.iter_events(hours=hours))
+        
+        for key in ('total_events', 'severity_breakdown', 'brute_force_attempts',
+                    'timeline_analysis', 'threat_score', 'recommendations'):
+            assert incremental[key] == full[key], key
+        # Ties at the tenth place may keep either IP
+        assert sorted(incremental['top_source_ips'].values()) == sorted(full['top_source_ips'].values())
+        # Streamed analyses estimate distinct IPs with a HyperLogLog
+        assert incremental['distinct_source_ips'] == pytest.approx(full['distinct_source_ips'], rel=0.05)
+        return incremental
+    
+    def test_matches_full_analysis(self):
+        """Test the windows agree with recomputing from scratch"""
+        # Keep clear of the 1h boundary, where windows are exact to a bucket
+        burst = self._events(8, 2 * 3600, 2 * 3600 - 300)
+        for event in burst:
+            event.event_type, event.source_ip = "ssh_failed_login", "192.168.5.5"
+        self.db.add_events(self._events(3000, 20 * 3600, 120) + burst)
+        
+        analysis = self._assert_matches_full_analysis(24)
+        assert analysis['total_events'] == 3008
+        assert analysis['brute_force_attempts']
+        self._assert_matches_full_analysis(1)
+    
+    def test_follows_new_and_late_events(self):
+        """Test events stored after a query are counted, in any order"""
+        self.db.add_events(self._events(500, 20 * 3600, 120))
+        assert self.incremental.analyze(hours=24)['total_events'] == 500
+        
+        late = sorted(self._events(500, 3000, 120, seed=4), key=lambda e: e.timestamp, reverse=True)
+        self.db.add_events(late)
+        analysis = self._assert_matches_full_analysis(24)
+        assert analysis['total_events'] == 1000
+        self._assert_matches_full_analysis(1)
+    
+    def test_windows_slide(self):
+        """Test counts and brute force findings expire as the window slides"""
+        base = datetime.now() - timedelta(minutes=30)
+        self.db.add_events([
+            SecurityEvent(timestamp=base + timedelta(seconds=i * 10), event_type="ssh_failed_login",
+                          source_ip="10.0.0.9", username="root", hostname="testhost",
+                          details="test", severity="medium", log_source="/var/log/auth.log")
+            for i in range(6)
+        ])
+        
+        analysis = self.incremental.analyze(hours=1)
+        assert analysis['total_events'] == 6
+        assert [a['source_ip'] for a in analysis['brute_force_attempts']] == ["10.0.0.9"]
+        
+        later = datetime.now() + timedelta(hours=1)
+        expired = self.incremental.analyze(hours=1, now=later)
+        assert expired['total_events'] == 0
+        assert expired['brute_force_attempts'] == []
+        assert expired['severity_breakdown'] == {}
+        assert self.incremental.analyze(hours=24, now=later)['total_events'] == 6
+        
+        assert self.incremental.analyze(hours=24, now=later + timedelta(days=1))['total_events'] == 0
+    
+    def test_unknown_window(self):
+        """Test only maintained windows can be queried"""
+        with pytest.raises(ValueError):
+            self.incremental.analyze(hours=6)
+
+
+class TestLogWatchers:
+    """Test event-driven and polling log watchers"""
+    
+    def setup_method(self):
+        """Setup a temporary log directory"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.log_path = str(Path(self.temp_dir.name) / "auth.log")
+        Path(self.log_path).write_text("start\n")
+    
+    def teardown_method(self):
+        """Cleanup temporary log directory"""
+        self.temp_dir.cleanup()
+    
+    def _exercise(self, watcher):
+        """Appends, unrelated files and rotation are reported for the right path"""
+        try:
+            assert watcher.wait(0.05) == set()
+            
+            with open(self.log_path, 'a') as f:
+                f.write("Failed password for root\n")
+            assert watcher.wait(2.0) == {self.log_path}
+            
+            Path(self.temp_dir.name, "other.log").write_text("noise\n")
+            assert watcher.wait(0.3) == set()
+            
+            # Rotation: move the old file away and recreate it
+            Path(self.log_path).rename(self.log_path + ".1")
+            Path(self.log_path).write_text("fresh\n")
+            assert self.log_path in watcher.wait(2.0)
+            
+            watcher.unwatch(self.log_path)
+            with open(self.log_path, 'a') as f:
+                f.write("ignored\n")
+            assert watcher.wait(0.3) == set()
+        finally:
+            watcher.close()
+    
+    @pytest.mark.skipif(not sys.platform.startswith('linux'), reason="inotify is Linux only")
+    def test_inotify_watcher(self):
+        """Test the inotify watcher reports changed log files"""
+        self._exercise(InotifyWatcher([self.log_path]))
+    
+    def test_polling_watcher(self):
+        """Test the polling fallback reports changed log files"""
+        self._exercise(PollingWatcher([self.log_path], poll_interval=0.05))
+    
+    def test_create_log_watcher_modes(self):
+        """Test watcher selection honours the configured mode"""
+        watcher = create_log_watcher([self.log_path], mode="poll", poll_interval=0.1)
+        assert isinstance(watcher, PollingWatcher)
+        watcher.close()
+        
+        if sys.platform.startswith('linux'):
+            watcher = create_log_watcher([self.log_path])
+            assert isinstance(watcher, InotifyWatcher)
+            watcher.close()
+
+
+class TestLogTracker:
+    """Test checkpointed, rotation-aware log reading"""
+    
+    def setup_method(self):
+        """Setup a log directory and checkpoint database"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.log_path = str(Path(self.temp_dir.name) / "auth.log")
+        self.db = SecurityDatabase(str(Path(self.temp_dir.name) / "test.db"))
+    
+    def teardown_method(self):
+        """Cleanup log directory"""
+        self.db.close()
+        self.temp_dir.cleanup()
+    
+    def _append(self, path, text):
+        with open(path, 'a') as f:
+            f.write(text)
+    
+    def _read(self, tracker):
+        """Read new lines and persist the tracker's checkpoints"""
+        lines = [line.strip() for line in tracker.read_lines()]
+        saved, retired = tracker.pending()
+        self.db.save_log_checkpoints(saved, retired)
+        tracker.mark_saved()
+        return lines
+    
+    def test_resume_from_saved_checkpoint(self):
+        """Test a restarted tracker resumes exactly, holding back partial lines"""
+        self._append(self.log_path, "old line\n")
+        tracker = LogTracker(self.log_path)
+        tracker.start_at_end()
+        assert self._read(tracker) == []
+        
+        self._append(self.log_path, "one\ntw")
+        assert self._read(tracker) == ["one"]
+        
+        # Restart: everything written while stopped is read once
+        self._append(self.log_path, "o\nthree\n")
+        restarted = LogTracker(self.log_path, self.db.get_log_checkpoints(self.log_path))
+        restarted.start_at_end()
+        assert self._read(restarted) == ["two", "three"]
+        assert self._read(restarted) == []
+    
+    def test_rename_rotation_drains_old_file(self):
+        """Test lines left in a renamed file are read before the new file"""
+        self._append(self.log_path, "first\n")
+        tracker = LogTracker(self.log_path)
+        assert self._read(tracker) == ["first"]
+        
+        self._append(self.log_path, "unread before rotation\n")
+        Path(self.log_path).rename(self.log_path + ".1")
+        assert self._read(tracker) == []  # Not recreated yet
+        self._append(self.log_path, "after rotation\n")
+        
+        assert self._read(tracker) == ["unread before rotation", "after rotation"]
+        checkpoints = self.db.get_log_checkpoints(self.log_path)
+        assert len(checkpoints) == 1
+        assert checkpoints[0].inode == Path(self.log_path).stat().st_ino
+    
+    def test_copytruncate_rotation_drains_copy(self):
+        """Test lines left before copytruncate are read from the copy"""
+        self._append(self.log_path, "first line long enough to fingerprint\n")
+        tracker = LogTracker(self.log_path)
+        assert self._read(tracker) == ["first line long enough to fingerprint"]
+        
+        self._append(self.log_path, "unread before truncate\n")
+        shutil.copyfile(self.log_path, self.log_path + ".1")
+        with open(self.log_path, 'w'):
+            pass
+        self._append(self.log_path, "new content that is even longer than before the truncate\n")
+        
+        assert self._read(tracker) == ["unread before truncate",
+                                       "new content that is even longer than before the truncate"]
+    
+    def test_read_budget_leaves_backlog(self):
+        """Test a per-call byte cap stops early and resumes at a line boundary"""
+        self._append(self.log_path, "".join(f"line {i:03d}\n" for i in range(100)))
+        tracker = LogTracker(self.log_path)
+        
+        first = self._read_budgeted(tracker, 64)
+        assert tracker.backlog
+        assert 0 < len(first) < 100
+        
+        rest = []
+        while tracker.backlog:
+            rest.extend(self._read_budgeted(tracker, 64))
+        assert first + rest == [f"line {i:03d}" for i in range(100)]
+    
+    def test_rollback_rereads_unprocessed_lines(self):
+        """Test lines read but not processed are read again, across a copytruncate too"""
+        self._append(self.log_path, "first line long enough to fingerprint\n")
+        tracker = LogTracker(self.log_path)
+        assert self._read(tracker) == ["first line long enough to fingerprint"]
+        
+        self._append(self.log_path, "two\nthree\n")
+        lines = tracker.iter_lines()
+        assert next(lines) == b"two"  # Processing fails here
+        lines.close()
+        tracker.rollback()
+        
+        self._append(self.log_path, "unread before truncate\n")
+        shutil.copyfile(self.log_path, self.log_path + ".1")
+        with open(self.log_path, 'w'):
+            pass
+        self._append(self.log_path, "new content that is even longer than before the truncate\n")
+        lines = tracker.iter_lines()
+        assert next(lines) == b"two"  # Drained from the copy, then fails again
+        lines.close()
+        tracker.rollback()
+        
+        assert self._read(tracker) == ["two", "three", "unread before truncate",
+                                       "new content that is even longer than before the truncate"]
+    
+    def test_monitor_rereads_after_match_failure(self, tmp_path, monkeypatch):
+        """Test a file whose matching fails mid-way is not checkpointed past the failure"""
+        monkeypatch.chdir(tmp_path)
+        from securitywatch.core.monitor import SecurityWatchMonitor
+        monitor = SecurityWatchMonitor()
+        try:
+            self._append(self.log_path, "".join(
+                f"Failed password for user{i} from 10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255} port 22\n"
+                for i in range(5000)))
+            monitor._tracker(self.log_path)  # Read from the start
+            
+            match_lines = monitor.pattern_matcher.match_lines
+            calls = []
+            
+            def failing_match_lines(lines, log_source):
+                calls.append(len(lines))
+                if len(calls) == 2:
+                    raise RuntimeError("match worker died")
+                return match_lines(lines, log_source)
+            
+            monkeypatch.setattr(monitor.pattern_matcher, 'match_lines', failing_match_lines)
+            assert monitor.check_log_files([self.log_path]) == []
+            
+            # A restart resumes from the saved checkpoint, which did not move
+            restarted = LogTracker(self.log_path, monitor.database.get_log_checkpoints(self.log_path))
+            assert len(restarted.read_lines()) == 5000
+            
+            events = monitor.check_log_files([self.log_path])
+            assert sum(event.event_type == "ssh_failed_login" for event in events) == 5000
+            assert monitor.check_log_files([self.log_path]) == []
+        finally:
+            monitor.database.close()
+            if monitor.workers:
+                monitor.workers.close()
+    
+    def _read_budgeted(self, tracker, max_bytes):
+        return [line.decode() for line in tracker.iter_lines(max_bytes)]
+
+
+class TestChunkedLineReader:
+    """Test bounded-memory line reading"""
+    
+    def test_lines_across_chunk_boundaries(self):
+        """Test lines split across chunks, long lines and trailing partial lines"""
+        data = b"alpha\nbravo charlie delta\n\necho\npart"
+        f = io.BytesIO(data)
+        reader = ChunkedLineReader(f, chunk_size=8)
+        lines = list(reader)
+        
+        # Lines longer than a chunk arrive in pieces; the partial last line waits
+        assert lines[0] == b"alpha" and lines[-2:] == [b"", b"echo"]
+        assert b"".join(lines) == b"alphabravo charlie deltaecho"
+        assert reader.offset == data.rindex(b"\n") + 1
+        
+        reader = ChunkedLineReader(f, chunk_size=1024, final=True)
+        assert list(reader) == [b"alpha", b"bravo charlie delta", b"", b"echo", b"part"]
+        assert reader.offset == len(data)
+    
+    def test_budget_and_resume(self):
+        """Test max_bytes stops the reader and offset resumes exactly"""
+        data = b"".join(b"event %d\n" % i for i in range(50))
+        f = io.BytesIO(data)
+        reader = ChunkedLineReader(f, chunk_size=16, max_bytes=40)
+        first = list(reader)
+        assert reader.budget_exhausted
+        
+        rest = list(ChunkedLineReader(f, reader.offset, chunk_size=16))
+        assert first + rest == data.split(b"\n")[:-1]
+    
+    def test_compressed_logs_stream(self):
+        """Test rotated logs are recognised by content and decompressed on the fly"""
+        data = b"".join(b"event %d\n" % i for i in range(1000))
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for name, compress, compression in (("auth.log.2.gz", gzip.compress, "gzip"),
+                                                ("auth.log.3.bz2", bz2.compress, "bz2"),
+                                                ("auth.log.4", lzma.compress, "xz"),
+                                                ("auth.log.1", bytes, None)):
+                path = os.path.join(temp_dir, name)
+                Path(path).write_bytes(compress(data))
+                assert compression_of(path) == compression
+                with open_log(path) as f:
+                    assert list(ChunkedLineReader(f, chunk_size=64)) == data.split(b"\n")[:-1]
+
+
+class TestLogWorkerPool:
+    """Test concurrent reading and batched matching"""
+    
+    LINES = [
+        b"Jan 1 sshd[1]: Failed password for root from 192.168.1.100 port 22 ssh2",
+        b"Jan 1 sshd[1]: Accepted publickey for deploy from 10.0.0.5",
+        b"10.0.0.9 GET /index.php?id=1 UNION SELECT password FROM users--",
+        b"Jan 1 sshd[1]: Invalid user oracle from 192.168.1.101",
+    ]
+    
+    @staticmethod
+    def _summary(events):
+        return [(e.event_type, e.source_ip, e.username, e.details) for e in events]
+    
+    def test_batch_matches_single_lines(self):
+        """Test matching a batch gives the same events, in order, as line by line"""
+        matcher = LogPatternMatcher()
+        single = [e for line in self.LINES for e in matcher.match_patterns(line, "/var/log/auth.log")]
+        batched = matcher.match_lines(self.LINES, "/var/log/auth.log")
+        assert self._summary(batched) == self._summary(single)
+        
+        stats = matcher.get_prefilter_stats()
+        assert stats["SSH Invalid User"]['matched'] == 2
+        matcher.reset_prefilter_stats()
+        assert matcher.get_prefilter_stats()["SSH Invalid User"]['matched'] == 0
+    
+    def test_map_runs_files_concurrently_in_order(self):
+        """Test every path is handled on the pool and results keep path order"""
+        pool = LogWorkerPool(max_threads=3)
+        barrier = threading.Barrier(3, timeout=5)
+        
+        def handle(path):
+            barrier.wait()  # Deadlocks unless all three run at once
+            return path.upper()
+        
+        try:
+            assert pool.map(handle, ["a", "b", "c"]) == ["A", "B", "C"]
+        finally:
+            pool.close()
+    
+    def test_process_matching_matches_threads(self):
+        """Test offloading matching to processes keeps events and counters"""
+        matcher = LogPatternMatcher()
+        expected = self._summary(matcher.match_lines(self.LINES * 3, "/var/log/auth.log"))
+        
+        matcher = LogPatternMatcher()
+        pool = LogWorkerPool(max_threads=1, match_processes=2)
+        try:
+            batches = [self.LINES, self.LINES, self.LINES]
+            events = pool.match_batches(matcher, batches, "/var/log/auth.log")
+        finally:
+            pool.close()
+        
+        assert self._summary(events) == expected
+        assert matcher.get_prefilter_stats()["SSH Failed Login"] == \
+               {'evaluated': 3, 'prefiltered': 9, 'matched': 3}
+    
+    def test_shard_ranges_follow_line_boundaries(self):
+        """Test shards cover the whole file and only cut after a newline"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "big.log"
+            data = b"".join(b"line %d %s\n" % (i, b"x" * (i % 37)) for i in range(500)) + b"tail"
+            path.write_bytes(data)
+            
+            ranges = shard_ranges(str(path), shard_size=100)
+            assert len(ranges) > 10
+            assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+            for (_, end), (start, _) in zip(ranges, ranges[1:]):
+                assert end == start and data[end - 1:end] == b"\n"
+    
+    def test_sharded_scan_matches_whole_file(self):
+        """Test a file scanned in shards by processes gives the same events in order"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "auth.log"
+            path.write_bytes(b"\n".join(self.LINES * 50))  # No trailing newline
+            
+            expected = self._summary(LogPatternMatcher().match_lines(self.LINES * 50, str(path)))
+            pool = LogWorkerPool(max_threads=1, match_processes=2)
+            try:
+                [events] = pool.scan_files(LogPatternMatcher(), [str(path)], shard_size=256)
+            finally:
+                pool.close()
+            assert self._summary(events) == expected
+            
+            pool = LogWorkerPool(max_threads=2)
+            try:
+                [events, missing] = pool.scan_files(LogPatternMatcher(), [str(path), "/nonexistent.log"])
+            finally:
+                pool.close()
+            assert self._summary(events) == expected and missing == []
+    
+    def test_mapped_scan_matches_line_scan(self):
+        """Test scanning through a memory map finds the same events and counts the same lines"""
+        lines = self.LINES + [
+            "Jan 1 sshd[1]: ınvalid user guest from 192.168.1.102".encode(),  # Only matches by case folding
+            b"Jan 1 sshd[1]: FAILED PASSWORD FOR admin FROM 192.168.1.103 port 22\r",
+        ]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "auth.log"
+            path.write_bytes(b"\n".join(lines * 40))  # No trailing newline
+            
+            expected_matcher = LogPatternMatcher()
+            expected = self._summary(expected_matcher.match_lines(lines * 40, str(path)))
+            assert len(expected) == 40 * 6
+            
+            for processes in (0, 2):
+                matcher = LogPatternMatcher()
+                pool = LogWorkerPool(max_threads=1, match_processes=processes)
+                try:
+                    [events] = pool.scan_files(matcher, [str(path)], shard_size=512, mapped=True)
+                finally:
+                    pool.close()
+                assert self._summary(events) == expected
+                assert matcher.get_prefilter_stats() == expected_matcher.get_prefilter_stats()
+    
+    def test_backfill_rotation_set(self):
+        """Test a mixed plain and compressed rotation set is scanned oldest first"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            base = os.path.join(temp_dir, "auth.log")
+            files = [(base + ".3.gz", gzip.compress), (base + ".2.xz", lzma.compress),
+                     (base + ".1", bytes), (base, bytes)]
+            for age, (path, compress) in enumerate(reversed(files)):
+                Path(path).write_bytes(compress(b"\n".join(self.LINES)))
+                os.utime(path, (1_700_000_000 - age * 86400,) * 2)
+            
+            paths = rotation_set([base + "*", base])
+            assert paths == [path for path, _ in files]
+            
+            for processes in (0, 2):
+                pool = LogWorkerPool(max_threads=2, match_processes=processes)
+                try:
+                    per_file = pool.scan_files(LogPatternMatcher(), paths)
+                finally:
+                    pool.close()
+                assert [len(events) for events in per_file] == [4, 4, 4, 4]
+
+
+class TestInputSources:
+    """Test journal and syslog socket input"""
+    
+    ENTRY = (b"__CURSOR=s=abc;i=1\n__REALTIME_TIMESTAMP=1767621731000000\n_HOSTNAME=bastion\n"
+             b"SYSLOG_IDENTIFIER=sshd\n_PID=42\n"
+             b"MESSAGE\n" + (56).to_bytes(8, 'little') +
+             b"Failed password for root from 203.0.113.7 port 22 ssh2\n.\n\n")
+    
+    @staticmethod
+    def _drain(group, count):
+        lines = []
+        deadline = datetime.now() + timedelta(seconds=5)
+        while len(lines) < count and datetime.now() < deadline:
+            for batches in group.drain(timeout=0.5).values():
+                lines.extend(line for batch in batches for line in batch)
+        return lines
+    
+    def test_journal_export_parser(self):
+        """Test text and binary fields are parsed however the stream is split"""
+        stream = self.ENTRY + b"__CURSOR=s=abc;i=2\nMESSAGE=second\n\n"
+        for split in (1, 7, len(stream)):
+            parser = JournalExportParser()
+            entries = []
+            for start in range(0, len(stream), split):
+                entries.extend(parser.feed(stream[start:start + split]))
+            assert [entry['MESSAGE'] for entry in entries] == [
+                b"Failed password for root from 203.0.113.7 port 22 ssh2\n.", b"second"]
+            assert entries[0]['_PID'] == b"42"
+    
+    def test_syslog_stream_framing(self):
+        """Test octet-counted and newline-delimited messages on one stream"""
+        framer = SyslogStreamFramer()
+        assert framer.feed(b"11 <13>one two<13>thr") == [b"<13>one two"]
+        assert framer.feed(b"ee\n8 <13>f") == [b"<13>three"]
+        assert framer.feed(b"our") == [b"<13>four"]
+        assert framer.feed(b"<13>tail") == [] and framer.flush() == [b"<13>tail"]
+    
+    def test_drain_is_bounded_and_keeps_order(self):
+        """Test a drain takes at most a queue's worth and the rest follow in order"""
+        with pytest.raises(TypeError):
+            InputSource("abstract")  # read() must be implemented
+        
+        group = InputSourceGroup(max_batches=2)
+        take = group.batches.get_nowait
+        refills = [("b", [b"3"])]
+        
+        def take_while_refilled():
+            item = take()
+            while refills:  # A producer refills the queue during the drain
+                group.batches.put_nowait(refills.pop())
+            return item
+        
+        group.batches.get_nowait = take_while_refilled
+        group.batches.put(("a", [b"1"]))
+        group.batches.put(("a", [b"2"]))
+        assert group.drain() == {"a": [[b"1"], [b"2"]]}
+        assert group.pending()  # b3 was taken past the limit and is carried over
+        
+        group.batches.put(("c", [b"4"]))
+        group.batches.put(("c", [b"5"]))
+        assert group.batches.full() and group.batches.qsize() == group.batches.maxsize
+        assert group.drain() == {"b": [[b"3"]], "c": [[b"4"]]}
+        assert group.drain() == {"c": [[b"5"]]}
+        assert group.drain() == {}
+        assert not group.pending()
+    
+    def test_journal_source_feeds_matcher(self):
+        """Test journal entries become lines the patterns and timestamp parser understand"""
+        script = f"import sys; sys.stdout.buffer.write({self.ENTRY!r}); sys.stdout.flush()"
+        source = JournalSource(["_SYSTEMD_UNIT=ssh.service"], command=[sys.executable, "-c", script])
+        group = InputSourceGroup()
+        group.add(source)
+        try:
+            lines = self._drain(group, 1)
+        finally:
+            group.close()
+        
+        assert len(lines) == 1 and source.cursor == b"s=abc;i=1"
+        assert source.name == "journal:_SYSTEMD_UNIT=ssh.service"
+        [event] = [e for e in LogPatternMatcher().match_lines(lines, source.name)
+                   if e.event_type == "ssh_failed_login"]
+        assert event.source_ip == "203.0.113.7" and event.username == "root"
+        assert event.timestamp == datetime.fromtimestamp(1767621731)
+        assert b" bastion sshd[42]: Failed password" in lines[0]
+    
+    def test_syslog_sockets(self):
+        """Test UDP, TCP and unix datagram listeners strip the syslog header"""
+        message = b"<38>Jan  5 14:02:11 bastion sshd[42]: Invalid user oracle from 203.0.113.9"
+        expected = message[4:]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            unix_path = os.path.join(temp_dir, "log.sock")
+            udp, tcp, unix = (SyslogSource("udp://127.0.0.1:0"), SyslogSource("tcp://127.0.0.1:0"),
+                              SyslogSource(f"unix://{unix_path}"))
+            group = InputSourceGroup()
+            for source in (udp, tcp, unix):
+                group.add(source)
+            try:
+                with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sender:
+                    sender.sendto(message, udp.address)
+                with socket.create_connection(tcp.address) as sender:
+                    sender.sendall(b"%d %s%s\n" % (len(message), message, message))
+                with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sender:
+                    sender.sendto(message + b"\n", unix_path)
+                lines = self._drain(group, 4)
+            finally:
+                group.close()
+            assert lines == [expected] * 4
+            assert not os.path.exists(unix_path)
+    
+    def test_full_queue_blocks_sources(self):
+        """Test a source waits for the monitoring loop instead of buffering without bound"""
+        message = b"<38>Jan  5 14:02:11 bastion sshd[42]: Invalid user oracle from 203.0.113.9\n"
+        source = SyslogSource("tcp://127.0.0.1:0")
+        group = InputSourceGroup(max_batches=1)
+        group.add(source)
+        try:
+            with socket.create_connection(source.address) as sender:
+                for _ in range(3):
+                    sender.sendall(message)
+                    threading.Event().wait(0.5)  # One batch per flush interval
+                threading.Event().wait(0.5)
+                assert group.batches.qsize() == 1
+                lines = self._drain(group, 3)
+        finally:
+            group.close()
+        assert len(lines) == 3
+    
+    def test_syslog_listens_locally_by_default(self):
+        """Test a syslog URL without a host binds to localhost, not every interface"""
+        assert SyslogSource("udp://:514").bind_address == ("127.0.0.1", 514)
+        assert SyslogSource("tcp://:6514").bind_address == ("127.0.0.1", 6514)
+        assert SyslogSource("udp://0.0.0.0:514").bind_address == ("0.0.0.0", 514)
+        assert SyslogSource("tcp://[::1]:514").bind_address == ("::1", 514)
+    
+    def test_unknown_source_is_reported(self):
+        """Test a bad input source spec is logged and skipped"""
+        group = InputSourceGroup(["ftp://example.com:21", "udp://127.0.0.1"])
+        assert len(group) == 0
+
+
 if __name__ == "__main__":
     pytest.main([__file__])